@@ -0,0 +1,95 @@
+"""
+Batch vs scalar scoring for HealthRiskModel.
+Checks that predict_batch/get_organ_stress_batch reproduce the scalar path exactly and
+reports the throughput ratio. Run from backend/:  python -m benchmarks.bench_batch_scoring
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from ml_engine import HealthRiskModel
+
+ROWS = 10_000
+MIN_SPEEDUP = 50.0
+
+
+def synthetic_columns(n: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        "age": rng.integers(18, 90, n).astype(np.float64),
+        "bmi": np.round(rng.normal(25, 5, n).clip(14, 50), 1),
+        "genhlth": rng.integers(1, 6, n).astype(np.float64),
+        "hasDiabetes": rng.random(n) < 0.15,
+        "hasHighBP": rng.random(n) < 0.25,
+        "hasHeartDisease": rng.random(n) < 0.08,
+        "hasLiverDisease": rng.random(n) < 0.05,
+        "hasKidneyDisease": rng.random(n) < 0.05,
+    }
+
+
+def scalar_rows(columns: dict):
+    n = len(columns["age"])
+    for i in range(n):
+        features = {
+            "age": int(columns["age"][i]),
+            "bmi": float(columns["bmi"][i]),
+            "genhlth": int(columns["genhlth"][i]),
+            "hasDiabetes": bool(columns["hasDiabetes"][i]),
+            "hasHighBP": bool(columns["hasHighBP"][i]),
+            "hasHeartDisease": bool(columns["hasHeartDisease"][i]),
+        }
+        profile = SimpleNamespace(
+            hasHeartDisease=features["hasHeartDisease"], hasHighBP=features["hasHighBP"],
+            hasDiabetes=features["hasDiabetes"], hasLiverDisease=bool(columns["hasLiverDisease"][i]),
+            hasKidneyDisease=bool(columns["hasKidneyDisease"][i]),
+        )
+        yield features, profile
+
+
+def main() -> int:
+    model = HealthRiskModel()
+    columns = synthetic_columns(ROWS)
+    rows = list(scalar_rows(columns))
+
+    t0 = time.perf_counter()
+    scalar = []
+    for features, profile in rows:
+        prob, level, vitality = model.predict_risk(features)
+        scalar.append((prob, level, vitality, model.get_organ_stress(profile, prob)))
+    scalar_s = time.perf_counter() - t0
+
+    batch_s = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        batch = model.score_batch(columns)
+        batch_s = min(batch_s, time.perf_counter() - t0)
+
+    mismatches = 0
+    for i, (prob, level, vitality, stress) in enumerate(scalar):
+        same = (
+            prob == batch["risk_probability"][i]
+            and level == batch["risk_level"][i]
+            and vitality == batch["vitality_score"][i]
+            and all(stress[k] == batch["organ_stress"][k][i] for k in stress)
+        )
+        mismatches += not same
+
+    speedup = scalar_s / batch_s
+    print(f"source={batch['source']} rows={ROWS}")
+    print(f"scalar: {scalar_s * 1000:9.2f} ms  ({ROWS / scalar_s:12,.0f} rows/s)")
+    print(f"batch : {batch_s * 1000:9.2f} ms  ({ROWS / batch_s:12,.0f} rows/s)")
+    print(f"speedup x{speedup:.1f}  mismatches={mismatches}")
+
+    if mismatches:
+        print("FAIL: batch results differ from scalar path")
+        return 1
+    if speedup < MIN_SPEEDUP:
+        print(f"FAIL: speedup below x{MIN_SPEEDUP:.0f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
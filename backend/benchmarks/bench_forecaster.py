@@ -0,0 +1,89 @@
+"""
+Outbreak forecaster ingest throughput and query cost at millions of events.
+Streams synthetic symptom logs for every AP district/mandal over 60 days through
+OutbreakForecaster.ingest, then times forecasts after a tenth of the stream and after all
+of it. Fails if ingest falls below MIN_EVENTS_PER_S, if a forecast is slower than
+MAX_FORECAST_US, or if forecast cost grows with the number of events seen.
+Run from backend/:  python -m benchmarks.bench_forecaster [--events 2000000]
+"""
+import random
+import sys
+import time
+
+from services.ayush_table import AP_HIERARCHY_PATH, parse_hierarchy
+from services.outbreak_forecaster import DAY_MS, OutbreakForecaster
+
+EVENTS = 2_000_000
+PATIENTS = 100_000
+QUERIES = 20_000
+MIN_EVENTS_PER_S = 20_000
+MAX_FORECAST_US = 500
+MAX_QUERY_GROWTH = 2.0      # forecast time after every event vs after a tenth of them
+
+COMPLAINTS = ["fever with chills", "cough and cold", "loose motions and vomiting", "joint pain with fever",
+              "headache", "జ్వరం మరియు ఒళ్ళు నొప్పులు", "దగ్గు", "बुखार और खांसी", "skin rash", "yellow eyes"]
+
+
+def regions() -> list:
+    try:
+        with open(AP_HIERARCHY_PATH, "r", encoding="utf-8") as f:
+            hierarchy = parse_hierarchy(f.read())
+    except OSError:
+        hierarchy = {f"District {d}": [f"Mandal {d}-{m}" for m in range(8)] for d in range(26)}
+    return [(district, mandal) for district, mandals in hierarchy.items() for mandal in mandals]
+
+
+def time_forecasts(forecaster: OutbreakForecaster, places: list, now_ms: float, rng: random.Random) -> float:
+    queries = [rng.choice(places) for _ in range(QUERIES)]
+    t0 = time.perf_counter()
+    for district, mandal in queries:
+        forecaster.forecast(district, mandal, ("fever", "respiratory"), now_ms)
+    return (time.perf_counter() - t0) / QUERIES * 1e6
+
+
+def main(argv) -> int:
+    events = int(argv[argv.index("--events") + 1]) if "--events" in argv else EVENTS
+    rng = random.Random(11)
+    places = regions()
+    forecaster = OutbreakForecaster.from_file()
+    now_ms = time.time() * 1000
+    start_ms = now_ms - 60 * DAY_MS
+    step = (now_ms - start_ms) / events
+    # One outbreak mandal, so some queries take the alert branch
+    hot = places[len(places) // 2]
+
+    ingest_s, early_us = 0.0, None
+    for i in range(events):
+        district, mandal = hot if (i % 50 == 0 and i > events * 0.9) else rng.choice(places)
+        ts = start_ms + i * step
+        log = [{"complaint": rng.choice(COMPLAINTS), "timestamp": ts}]
+        t0 = time.perf_counter()
+        forecaster.ingest(f"p{rng.randrange(PATIENTS)}-{i}", district, mandal, log, ts)
+        ingest_s += time.perf_counter() - t0
+        if i == events // 10:
+            early_us = time_forecasts(forecaster, places, ts, rng)
+    late_us = time_forecasts(forecaster, places, now_ms, rng)
+
+    rate = events / ingest_s
+    stats = forecaster.stats()
+    result = forecaster.forecast(*hot, ("fever",), now_ms) or {}
+    print(f"ingest: {events} events in {ingest_s:.1f}s ({rate:,.0f}/s); {stats['series']} series, "
+          f"{stats['patients']} patients tracked, {stats['stale']} stale")
+    print(f"forecast: {early_us:.1f} us after {events // 10} events, {late_us:.1f} us after {events}")
+    print(f"outbreak mandal {hot[1]}: z={result.get('z_score', 0):.2f} "
+          f"7d={result.get('seven_day_risk', 0):.2f} peak={result.get('peak_date', 'N/A')}")
+
+    failures = []
+    if rate < MIN_EVENTS_PER_S:
+        failures.append(f"ingest {rate:,.0f}/s < {MIN_EVENTS_PER_S:,}/s")
+    if late_us > MAX_FORECAST_US:
+        failures.append(f"forecast {late_us:.1f} us > {MAX_FORECAST_US} us")
+    if late_us > early_us * MAX_QUERY_GROWTH:
+        failures.append(f"forecast cost grew {late_us / early_us:.1f}x with 10x the events")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
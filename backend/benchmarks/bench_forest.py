@@ -0,0 +1,80 @@
+"""
+Compiled forest parity and latency.
+Uses best_model.pkl when it is a real ensemble, otherwise fits a synthetic
+RandomForest with the same shape as the training notebook's model. Fails if the
+compiled evaluator (fresh or reloaded memory-mapped from .npz) disagrees with
+predict_proba. Run from backend/:  python -m benchmarks.bench_forest
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import forest_compiler
+from ml_engine import BASE_DIR
+
+N_FEATURES = 8
+
+
+def load_or_fit():
+    path = os.path.join(BASE_DIR, "best_model.pkl")
+    try:
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+        forest_compiler.compile_forest(model)
+        n = int(getattr(model, "n_features_in_", N_FEATURES))
+        return model, np.random.default_rng(1).normal(size=(5000, n)), "best_model.pkl"
+    except Exception:
+        from sklearn.ensemble import RandomForestClassifier
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(5000, N_FEATURES))
+        y = (X[:, 0] + 0.5 * X[:, 2] - X[:, 3] + rng.normal(0, 0.5, len(X)) > 0).astype(int)
+        model = RandomForestClassifier(n_estimators=100, max_depth=12, random_state=0).fit(X, y)
+        return model, X, "synthetic RandomForest(100, depth 12)"
+
+
+def best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    model, X, label = load_or_fit()
+    compiled = forest_compiler.compile_forest(model)
+    print(f"model: {label}  trees={compiled.n_trees} nodes={len(compiled.feature)} depth={compiled.max_depth}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        npz = os.path.join(tmp, "model.npz")
+        compiled.save(npz)
+        reloaded = forest_compiler.CompiledForest.load(npz)
+        probe = np.vstack([X, np.random.default_rng(2).normal(size=(2000, X.shape[1])) * 3])
+        try:
+            diff_fresh = forest_compiler.verify_parity(model, compiled, probe)
+            diff_mmap = forest_compiler.verify_parity(model, reloaded, probe)
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            return 1
+        print(f"parity: max diff {diff_fresh:.2e} (fresh), {diff_mmap:.2e} (mmap)  rows={len(probe)}")
+
+        row, batch = X[:1], X[:1000]
+        timings = {
+            "sklearn 1 row":     best_of(lambda: model.predict_proba(row), 20),
+            "compiled 1 row":    best_of(lambda: reloaded.predict_proba(row), 200),
+            "sklearn 1k rows":   best_of(lambda: model.predict_proba(batch), 5),
+            "compiled 1k rows":  best_of(lambda: reloaded.predict_proba(batch), 5),
+        }
+    for name, seconds in timings.items():
+        print(f"{name:18s} {seconds * 1000:9.3f} ms")
+    print(f"single-row speedup x{timings['sklearn 1 row'] / timings['compiled 1 row']:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
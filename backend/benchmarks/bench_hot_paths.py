@@ -0,0 +1,243 @@
+"""
+Regression guard for the local CPU paths of one /orchestrate request.
+Times request validation, the bio-risk feature mapping and model calls, each section's
+prompt f-string over the compacted history (run up to the moment it would call Groq),
+history compaction for a fresh request across all four sections, LLM
+reply parsing into the response models, and UnifiedResponse serialization, on a profile
+with 500-entry clinical_vault and symptoms lists.
+Each timing is also expressed in units of a fixed pure-Python calibration workload timed
+right before and after every round, and the median of those per-round ratios is what
+gets compared with benchmarks/baselines/hot_paths.json, so a slower or throttled machine
+(or a noisy stretch of it) does not read as a regression.
+Run from backend/:  python -m benchmarks.bench_hot_paths [--update-baseline] [--threshold 0.3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import math
+import platform
+import statistics
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.fake_groq import canned_reply
+from ml_engine import profile_features
+from models import ClinicalEHR, TriageResponse, UnifiedRequest, UnifiedResponse
+from orchestrator import HealthIntelligenceOrchestrator
+from utils.cpu_executor import parse_json_model, validate_json
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "hot_paths.json")
+DEFAULT_THRESHOLD = 0.30   # fail when a path is >30% slower than baseline (in calibration units)
+HISTORY_ENTRIES = 500
+ROUNDS = 31
+MIN_ROUND_SECONDS = 0.02   # loops per round are raised until a round takes at least this
+CONFIRM_RUNS = 2       # re-measurements of a case that looks slower before failing it
+
+
+def large_request_body() -> bytes:
+    symptoms = [{"name": f"symptom {i % 40}", "complaint": f"intermittent episode {i}", "severity": "moderate",
+                 "timestamp": 1_790_000_000_000 + i * 3_600_000} for i in range(HISTORY_ENTRIES)]
+    vault = [{"name": f"Report {i}: CBC / LFT / HbA1c panel", "type": "lab", "date": f"2026-{1 + i % 12:02d}-01",
+              "summary": "Values within reference range except mildly raised HbA1c (6.8%)."}
+             for i in range(HISTORY_ENTRIES)]
+    return json.dumps({
+        "profile": {"name": "Lakshmi Devi", "age": 61, "gender": "female", "weight": 68,
+                    "conditions": [{"category": "chronic", "name": "Type 2 Diabetes"},
+                                   {"category": "chronic", "name": "Hypertension"}],
+                    "hasDiabetes": True, "hasHighBP": True, "district": "Guntur", "mandal": "Tenali"},
+        "query": "fever with joint pain and headache since three days, poor appetite",
+        "medications": ["metformin 500", "telma 40", "aspirin", "dolo 650", "pan d"],
+        "clinical_vault": vault,
+        "symptoms": symptoms,
+        "nutrition_logs": [{"description": "Idli sambar", "calories": 320}] * 50,
+        "language": "te",
+    }).encode()
+
+
+class _PromptCaptured(Exception):
+    pass
+
+
+class PromptProbe:
+    """Stands in for call_groq: captures the prompt, then either stops the stage or replies."""
+    def __init__(self, reply: bool):
+        self.reply = reply
+
+    async def __call__(self, prompt, json_mode=False, section=None, cache=None):
+        if not self.reply:
+            raise _PromptCaptured()
+        body = canned_reply(prompt)
+        return json.dumps(body) if isinstance(body, dict) else body
+
+
+def calibration_unit():
+    """A fixed pure-Python workload (dict/str/int churn like the paths measured here)."""
+    d = {}
+    for i in range(2_000):
+        d[f"k{i % 256}"] = d.get(f"k{i % 256}", 0) + i * i
+    return len(json.dumps(d))
+
+
+def _timed(fn, loops: int = 1) -> float:
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - t0
+
+
+def measure(fn, rounds: int, loops: int):
+    """
+    (median per-call seconds, median per-call time in calibration units). The calibration
+    unit is timed just before and just after every round and each round is divided by
+    their mean, so a ratio never pairs timings from different stretches of machine time;
+    medians then discard the rounds a burst of host noise landed on.
+    """
+    loops = max(loops, math.ceil(MIN_ROUND_SECONDS / max(_timed(fn), 1e-7)))
+    per_call, ratios = [], []
+    for _ in range(rounds):
+        before = _timed(calibration_unit)
+        seconds = _timed(fn, loops) / loops
+        after = _timed(calibration_unit)
+        per_call.append(seconds)
+        ratios.append(seconds / ((before + after) / 2))
+    return statistics.median(per_call), statistics.median(ratios)
+
+
+def build_cases(orch: HealthIntelligenceOrchestrator, loop) -> dict:
+    body = large_request_body()
+    request = validate_json(UnifiedRequest, body)
+    engine = orch.load_ml_engine()
+    features = profile_features(request.profile)
+    risk_prob = engine.predict_risk(features)[0]
+
+    stop, answer = PromptProbe(reply=False), PromptProbe(reply=True)
+
+    def prompt_only(make_coro):
+        def run():
+            orch.call_groq = stop
+            try:
+                loop.run_until_complete(make_coro())
+            except _PromptCaptured:
+                pass
+        return run
+
+    def with_reply(make_coro):
+        def run():
+            request._compacted.clear()
+            orch.call_groq = answer
+            return loop.run_until_complete(make_coro())
+        return run
+
+    def fresh_request_prompts():
+        # History compaction is ranked once per request and shared by the four sections
+        request._compacted.clear()
+        for make_coro in section_prompts:
+            prompt_only(make_coro)()
+
+    bio = loop.run_until_complete(orch.run_bio_risk(request))
+    section_prompts = (lambda: orch.run_med_safety(request, bio), lambda: orch.run_triage(request, bio),
+                       lambda: orch.run_ehr_analysis(request), lambda: orch.run_ayush_analysis(request, bio))
+    sections = {"bio_risk": bio}
+    for name, coro in (("medication_safety", lambda: orch.run_med_safety(request, bio)),
+                       ("triage", lambda: orch.run_triage(request, bio)),
+                       ("nutrition", lambda: orch.run_nutrition(request, bio)),
+                       ("ayush", lambda: orch.run_ayush_analysis(request, bio)),
+                       ("ehr_record", lambda: orch.run_ehr_analysis(request))):
+        sections[name] = with_reply(coro)()
+    sections["guardian_summary"] = with_reply(lambda: orch.generate_summary(request, sections))()
+    response = UnifiedResponse(**sections, fusionScores={"overall": "CAUTION", "score": bio.vitality_score},
+                               language=request.language)
+
+    triage_raw = json.dumps(canned_reply("emergency triage AI"))
+    ehr_raw = json.dumps(canned_reply("Chief Medical Officer"))
+    events = [{"event": "section", "section": name, "data": value} for name, value in sections.items()]
+
+    return {
+        # name: (callable, loops per round)
+        "request_validate_500":   (lambda: validate_json(UnifiedRequest, body), 5),
+        "profile_features":       (lambda: profile_features(request.profile), 2000),
+        "predict_risk":           (lambda: engine.predict_risk(features), 200),
+        "organ_stress":           (lambda: engine.get_organ_stress(request.profile, risk_prob), 2000),
+        "prompt_med_safety":      (prompt_only(lambda: orch.run_med_safety(request, bio)), 50),
+        "prompt_triage":          (prompt_only(lambda: orch.run_triage(request, bio)), 50),
+        "prompt_ehr":             (prompt_only(lambda: orch.run_ehr_analysis(request)), 50),
+        "prompt_ayush":           (prompt_only(lambda: orch.run_ayush_analysis(request, bio)), 50),
+        "prompt_summary":         (prompt_only(lambda: orch.generate_summary(request, sections)), 200),
+        "context_compaction_all": (fresh_request_prompts, 20),
+        "parse_triage":           (lambda: parse_json_model(TriageResponse, triage_raw), 2000),
+        "parse_ehr":              (lambda: parse_json_model(ClinicalEHR, ehr_raw), 2000),
+        "ayush_prompt_and_parse": (with_reply(lambda: orch.run_ayush_analysis(request, bio)), 50),
+        "serialize_response":     (lambda: response.model_dump_json(), 500),
+        "serialize_stream_events": (lambda: [json.dumps(jsonable_encoder(e), ensure_ascii=False) for e in events], 50),
+    }
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--only", help="comma-separated case names")
+    args = parser.parse_args(argv)
+
+    orch = HealthIntelligenceOrchestrator()
+    loop = asyncio.new_event_loop()
+    try:
+        cases = build_cases(orch, loop)
+        if args.only:
+            wanted = set(args.only.split(","))
+            cases = {k: v for k, v in cases.items() if k in wanted}
+
+        baseline = None
+        if os.path.exists(BASELINE_PATH) and not args.update_baseline:
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+
+        timings = {}
+        for name, (fn, loops) in cases.items():
+            fn()   # warm caches and lazy singletons
+            seconds, relative = measure(fn, ROUNDS, loops)
+            base = baseline["cases"].get(name) if baseline else None
+            # Confirm an apparent regression before reporting it: bursts of host noise
+            # can outlast all rounds of one measurement
+            for _ in range(CONFIRM_RUNS):
+                if not base or relative / base["relative"] - 1 <= args.threshold:
+                    break
+                retry_seconds, retry_relative = measure(fn, ROUNDS, loops)
+                seconds, relative = min(seconds, retry_seconds), min(relative, retry_relative)
+            timings[name] = (seconds * 1e6, relative)
+    finally:
+        loop.close()
+
+    failed = []
+    for name, (us, relative) in timings.items():
+        line = f"  {name:<24} {us:>11.1f} us  {relative:>9.3f} cal"
+        base = baseline["cases"].get(name) if baseline else None
+        if base:
+            change = relative / base["relative"] - 1
+            line += f"   baseline {base['relative']:>9.3f} cal ({base['us']:.1f} us)  {change:+7.1%}"
+            if change > args.threshold:
+                failed.append(name)
+                line += "  SLOWER"
+        print(line)
+
+    if args.update_baseline or baseline is None:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "cases": {k: {"us": round(us, 2), "relative": round(rel, 5)}
+                                 for k, (us, rel) in timings.items()}}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {BASELINE_PATH}")
+        return 0
+
+    if failed:
+        print(f"FAIL: {', '.join(failed)} slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
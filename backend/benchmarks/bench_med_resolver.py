@@ -0,0 +1,105 @@
+"""
+Medication-name resolver throughput on a 50k-name dictionary.
+Builds the symmetric-delete index over the real alias vocabulary padded with synthetic
+drug-like names, then resolves misspelled queries (1-2 random edits). Fails if the
+correction rate or the uncached lookup rate drops below the thresholds.
+Run from backend/:  python -m benchmarks.bench_med_resolver [--names 50000]
+"""
+import random
+import sys
+import time
+
+from services.drug_interactions import get_interaction_graph
+from services.drug_resolver import MedicationResolver, allowed_distance, edit_distance
+
+DICTIONARY_SIZE = 50_000
+QUERIES = 20_000
+MIN_CORRECTION_RATE = 0.95
+MIN_LOOKUPS_PER_S = 1_000
+
+_ONSETS = ["b", "c", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t", "v", "z", "br", "cl", "dr",
+           "fl", "gl", "pr", "st", "tr", "ch", "ph", "th"]
+_VOWELS = ["a", "e", "i", "o", "u", "y", "ai", "io"]
+_SUFFIXES = ["mab", "nib", "pril", "sartan", "olol", "statin", "mycin", "cillin", "azole", "pine", "done",
+             "pam", "lam", "tide", "dronate", "floxacin", "vir", "zumab", "setron", "prazole", "gliptin"]
+
+
+def build_vocabulary(size: int, rng: random.Random) -> list:
+    names = set(get_interaction_graph().aliases)
+    while len(names) < size:
+        stem = "".join(rng.choice(_ONSETS) + rng.choice(_VOWELS) for _ in range(rng.randint(1, 3)))
+        names.add(stem + rng.choice(_SUFFIXES))
+    return sorted(names)
+
+
+def misspell(word: str, edits: int, rng: random.Random) -> str:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    for _ in range(edits):
+        i = rng.randrange(len(word))
+        op = rng.choice(("delete", "insert", "replace", "transpose"))
+        if op == "delete" and len(word) > 1:
+            word = word[:i] + word[i + 1:]
+        elif op == "insert":
+            word = word[:i] + rng.choice(letters) + word[i:]
+        elif op == "transpose" and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(letters) + word[i + 1:]
+    return word
+
+
+def main(argv) -> int:
+    size = int(argv[argv.index("--names") + 1]) if "--names" in argv else DICTIONARY_SIZE
+    rng = random.Random(7)
+    vocabulary = build_vocabulary(size, rng)
+
+    t0 = time.perf_counter()
+    resolver = MedicationResolver(vocabulary)
+    build_s = time.perf_counter() - t0
+    print(f"index: {len(vocabulary)} names, {resolver.index.stats()['delete_keys']} delete keys, built in {build_s:.2f}s")
+
+    # Only words long enough to be allowed an edit; the distance cap scales with length
+    pool = [w for w in vocabulary if " " not in w and allowed_distance(w) >= 1]
+    queries = []
+    for _ in range(QUERIES):
+        target = rng.choice(pool)
+        edits = rng.randint(1, allowed_distance(target))
+        queries.append((target, misspell(target, edits, rng)))
+
+    t0 = time.perf_counter()
+    results = [resolver._match(q) for _, q in queries]
+    uncached_s = time.perf_counter() - t0
+
+    # Repeat traffic: a working set that fits the memo cache, after one warming pass
+    hot = [q for _, q in queries[:2000]]
+    for q in hot:
+        resolver.match(q)
+    t0 = time.perf_counter()
+    for q in hot:
+        resolver.match(q)
+    cached_s = (time.perf_counter() - t0) / len(hot) * len(queries)
+
+    # Landing on a different name that is at least as close to the typo is not an error
+    correct = sum(
+        1 for (target, q), hit in zip(queries, results)
+        if hit and (hit[0] == target or edit_distance(q, hit[0], 3) <= edit_distance(q, target, 3))
+    )
+    strict = sum(1 for (target, _), hit in zip(queries, results) if hit and hit[0] == target)
+    rate = correct / len(queries)
+    lookups_per_s = len(queries) / uncached_s
+
+    print(f"uncached: {uncached_s / len(queries) * 1e6:8.1f} us/lookup  ({lookups_per_s:,.0f}/s)")
+    print(f"cached:   {cached_s / len(queries) * 1e6:8.1f} us/lookup")
+    print(f"resolved to the intended name: {strict / len(queries):.1%} (acceptable matches {rate:.1%})")
+
+    if rate < MIN_CORRECTION_RATE:
+        print(f"FAIL: correction rate {rate:.1%} < {MIN_CORRECTION_RATE:.0%}")
+        return 1
+    if lookups_per_s < MIN_LOOKUPS_PER_S:
+        print(f"FAIL: {lookups_per_s:,.0f} lookups/s < {MIN_LOOKUPS_PER_S:,}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
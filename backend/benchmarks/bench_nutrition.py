@@ -0,0 +1,100 @@
+"""
+Nutrition scoring cost for a month of food logs, and fuzzy food-name matching.
+Builds 30-day log histories (three or four meals a day drawn from a personal repertoire
+of descriptions, some misspelt, as people repeat meals) and times FoodIndex.intake per
+user: cold, with the parse and match memos cleared as in a fresh process, and warm.
+Then misspells food names with one edit and checks they still resolve. Fails if a month
+takes longer than MAX_COLD_MONTH_US cold or MAX_MONTH_US warm, or the correction rate
+drops below MIN_CORRECTION_RATE.
+Run from backend/:  python -m benchmarks.bench_nutrition [--users 500]
+"""
+import random
+import sys
+import time
+
+from benchmarks.bench_med_resolver import misspell
+from services.food_index import DAY_MS, FoodIndex, _normalize
+
+USERS = 500
+DAYS = 30
+REPERTOIRE = 25
+MAX_MONTH_US = 1_000
+MAX_COLD_MONTH_US = 5_000
+MISSPELT_ITEMS = 0.2
+MIN_CORRECTION_RATE = 0.90
+QUANTITIES = ["", "1 ", "2 ", "3 ", "half plate ", "1 bowl ", "2 cups ", "one glass "]
+
+
+def repertoire(index: FoodIndex, rng: random.Random) -> list:
+    aliases = list(index.aliases)
+    meals = []
+    for _ in range(REPERTOIRE):
+        parts = []
+        for _ in range(rng.randint(1, 3)):
+            name = rng.choice(aliases)
+            if len(name) >= 6 and rng.random() < MISSPELT_ITEMS:
+                name = misspell(name, 1, rng)
+            parts.append(rng.choice(QUANTITIES) + name)
+        meals.append(rng.choice([", ", " with ", " and ", " + "]).join(parts))
+    return meals
+
+
+def month_of_logs(meals: list, now_ms: float, rng: random.Random) -> list:
+    logs = []
+    for day in range(DAYS):
+        for _ in range(rng.randint(3, 4)):
+            ts = now_ms - day * DAY_MS - rng.randrange(DAY_MS // 2)
+            logs.append({"description": rng.choice(meals), "timestamp": ts})
+    return logs
+
+
+def main(argv) -> int:
+    users = int(argv[argv.index("--users") + 1]) if "--users" in argv else USERS
+    rng = random.Random(5)
+    index = FoodIndex.from_file()
+    now_ms = time.time() * 1000
+    months = [month_of_logs(repertoire(index, rng), now_ms, rng) for _ in range(users)]
+    logs = sum(len(m) for m in months)
+
+    # Cold: nothing memoised, as for the first request after a restart; warm: the same
+    # month rescored, as on the user's next request
+    cold_s = warm_s = 0.0
+    results = []
+    for m in months:
+        index.parse.cache_clear()
+        index.match.cache_clear()
+        t0 = time.perf_counter()
+        results.append(index.intake(m, now_ms))
+        t1 = time.perf_counter()
+        index.intake(m, now_ms)
+        cold_s += t1 - t0
+        warm_s += time.perf_counter() - t1
+    cold_us, warm_us = cold_s / users * 1e6, warm_s / users * 1e6
+    matched = sum(r["matched_logs"] for r in results) / logs
+    print(f"intake: {users} users x ~{logs // users} logs; {cold_us:.1f} us/month cold, "
+          f"{warm_us:.1f} us/month warm; {matched:.1%} of logs matched")
+
+    # One edit in names long enough that a single typo still leaves them recognisable
+    names = [a for a in index.aliases if len(a) >= 6]
+    queries = [(a, misspell(a, 1, rng)) for a in names for _ in range(5)]
+    correct = 0
+    for alias, typo in queries:
+        food, _ = index.match(_normalize(typo))
+        correct += food == index.aliases[alias]
+    rate = correct / len(queries)
+    print(f"fuzzy match: {len(queries)} misspelt names, {rate:.1%} resolved to the intended food")
+
+    failures = []
+    if cold_us > MAX_COLD_MONTH_US:
+        failures.append(f"{cold_us:.1f} us per month cold > {MAX_COLD_MONTH_US} us")
+    if warm_us > MAX_MONTH_US:
+        failures.append(f"{warm_us:.1f} us per month > {MAX_MONTH_US} us")
+    if rate < MIN_CORRECTION_RATE:
+        failures.append(f"correction rate {rate:.1%} < {MIN_CORRECTION_RATE:.0%}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
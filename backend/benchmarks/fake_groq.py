@@ -0,0 +1,183 @@
+"""
+Local stand-in for the Groq OpenAI-compatible API, for offline load tests.
+Serves /chat/completions, /audio/translations and /models with configurable latency
+distributions, 5xx and 429 rates, and a canned body per prompt type (recognised by the
+prompt's opening persona line, including the fused all-sections prompt). Point the backend at it with GROQ_API_BASE.
+Run from backend/:  python -m benchmarks.fake_groq [--port 9100]
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# ── Config ────────────────────────────────────────────────────────────────────
+# Latency spec: "fixed:<ms>", "uniform:<lo_ms>:<hi_ms>", "normal:<mean_ms>:<sd_ms>"
+# or "lognormal:<median_ms>:<sigma>" (the long tail real LLM endpoints show)
+FAKE_GROQ_CHAT_LATENCY   = os.getenv("FAKE_GROQ_CHAT_LATENCY", "lognormal:350:0.35")
+FAKE_GROQ_AUDIO_LATENCY  = os.getenv("FAKE_GROQ_AUDIO_LATENCY", "lognormal:900:0.3")
+FAKE_GROQ_ERROR_RATE     = float(os.getenv("FAKE_GROQ_ERROR_RATE", "0"))
+FAKE_GROQ_RATE_LIMIT_RATE = float(os.getenv("FAKE_GROQ_RATE_LIMIT_RATE", "0"))
+FAKE_GROQ_SEED           = os.getenv("FAKE_GROQ_SEED", "")
+
+# (prompt marker, JSON body or plain text); first match wins
+CANNED_CHAT = [
+    ("emergency triage AI", {
+        "triage_level": "Moderate",
+        "basic_care_advice": "Rest, stay hydrated and monitor your temperature every 6 hours. Seek care if symptoms worsen.",
+        "specialist_recommendation": "General Physician",
+        "follow_up_questions": ["When did the symptoms start?", "Any breathlessness?", "Any recent travel?"],
+        "disclaimer": "This is not a diagnosis. Consult a registered medical practitioner.",
+    }),
+    ("Chief Medical Officer", {
+        "ehr_id": "AHMIS-LOADTEST-0001",
+        "chief_complaint": "Fever with body ache for 2 days",
+        "hpi": "Patient reports intermittent fever with myalgia, no breathlessness.",
+        "clinical_notes": "Vitals stable. Hydration advised. Dengue NS1 if fever persists beyond 3 days.",
+        "vital_signs": {"BP": "128/84 mmHg", "HR": "92 bpm", "Temp": "100.8 F"},
+        "triage_status": "Priority",
+        "icd_10_code": "R50.9",
+        "ayush_metrics": {"Prakriti_Status": "Pitta-Kapha", "Agni": "Mandagni"},
+        "treatment_plan": "1. Paracetamol 650 mg SOS.\n2. Oral rehydration.\n3. Review in 48 hours.",
+        "differential_diagnosis": ["Viral fever", "Dengue", "Malaria"],
+        "doctor_suggestions": ["1. CBC with platelets", "2. Dengue NS1 antigen"],
+        "digital_signature": "AI-SENTINEL-v4.9",
+    }),
+    ("AYUSH Clinical Expert writing a short patient note",
+     "Your Pitta-dominant constitution runs hotter in this season, which lines up with the regional heat and "
+     "water-borne risks. Cooling food, steady hydration and an early routine keep that balance in check."),
+    ("AYUSH Clinical Expert", {
+        "analysis": "Pitta aggravation with seasonal Kapha accumulation.",
+        "recommendations": [
+            {"category": "Diet", "title": "Light, warm meals", "description": "Moong dal khichdi and buttermilk.",
+             "benefits": ["Eases digestion", "Supports Agni"]},
+            {"category": "Herbal", "title": "Giloy decoction", "description": "30 ml twice daily after food.",
+             "benefits": ["Antipyretic", "Immunomodulatory"]},
+        ],
+        "regional_seasonal_risks": [
+            {"disease_name": "Dengue", "probability": 0.34, "reason": "Post-monsoon vector density",
+             "prevention": "Remove stagnant water; use repellents."},
+        ],
+        "dinacharya": ["Wake before sunrise", "Warm water on waking"],
+        "ritucharya": ["Avoid day sleep", "Prefer boiled water"],
+    }),
+    ("clinical pharmacist AI", "Aspirin with warfarin raises bleeding risk considerably. "
+                               "Please confirm the combination with your doctor before the next dose."),
+    ("AI Health Guardian", "Your vitals look stable and your risk is being monitored. "
+                           "Keep up hydration and log any new symptoms."),
+]
+# Fused mode (LLM_FUSED_MODE=1) asks for every section in one JSON object
+_CANNED = dict(CANNED_CHAT)
+CANNED_CHAT.insert(0, ("reviewing one patient case", {
+    "med_safety": _CANNED["clinical pharmacist AI"],
+    "triage": _CANNED["emergency triage AI"],
+    "ayush": _CANNED["AYUSH Clinical Expert"],
+    "ayush_analysis": _CANNED["AYUSH Clinical Expert writing a short patient note"],
+    "ehr": _CANNED["Chief Medical Officer"],
+    "summary": _CANNED["AI Health Guardian"],
+}))
+DEFAULT_CHAT = "Acknowledged."
+TRANSCRIPT = "I have had fever and body pain since two days."
+
+
+def parse_latency(spec: str):
+    """Returns a callable giving one latency sample in seconds."""
+    kind, *params = spec.split(":")
+    p = [float(x) for x in params]
+    if kind == "fixed":
+        return lambda rng: p[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(p[0], p[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(p[0], p[1])) / 1000
+    if kind == "lognormal":
+        mu = math.log(p[0])
+        return lambda rng: rng.lognormvariate(mu, p[1]) / 1000
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def canned_reply(prompt: str):
+    for marker, body in CANNED_CHAT:
+        if marker in prompt:
+            return body
+    return DEFAULT_CHAT
+
+
+class FakeGroq:
+    def __init__(self):
+        self.rng = random.Random(int(FAKE_GROQ_SEED)) if FAKE_GROQ_SEED else random.Random()
+        self.chat_latency = parse_latency(FAKE_GROQ_CHAT_LATENCY)
+        self.audio_latency = parse_latency(FAKE_GROQ_AUDIO_LATENCY)
+        self.counts = {"chat": 0, "audio": 0, "errors": 0, "rate_limited": 0}
+
+    async def fault(self, latency) -> JSONResponse:
+        """Sleeps for one latency sample; returns an error response if this call should fail."""
+        await asyncio.sleep(latency(self.rng))
+        roll = self.rng.random()
+        if roll < FAKE_GROQ_RATE_LIMIT_RATE:
+            self.counts["rate_limited"] += 1
+            return JSONResponse(status_code=429, headers={"retry-after": "1"},
+                                content={"error": {"message": "Rate limit reached", "type": "tokens"}})
+        if roll < FAKE_GROQ_RATE_LIMIT_RATE + FAKE_GROQ_ERROR_RATE:
+            self.counts["errors"] += 1
+            return JSONResponse(status_code=503, content={"error": {"message": "Service unavailable"}})
+        return None
+
+
+fake = FakeGroq()
+app = FastAPI(title="Fake Groq")
+
+
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    fake.counts["chat"] += 1
+    failure = await fake.fault(fake.chat_latency)
+    if failure is not None:
+        return failure
+
+    prompt = body["messages"][-1]["content"]
+    reply = canned_reply(prompt)
+    content = json.dumps(reply) if isinstance(reply, dict) else reply
+    if body.get("response_format", {}).get("type") == "json_object" and not isinstance(reply, dict):
+        content = "{}"
+    return {
+        "id": f"chatcmpl-fake-{fake.counts['chat']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                  "total_tokens": (len(prompt) + len(content)) // 4},
+    }
+
+
+@app.post("/audio/translations")
+async def audio_translations(request: Request):
+    await request.body()
+    fake.counts["audio"] += 1
+    failure = await fake.fault(fake.audio_latency)
+    if failure is not None:
+        return failure
+    return {"text": TRANSCRIPT}
+
+
+@app.get("/models")
+async def models():
+    return {"object": "list", "data": [{"id": "llama3-8b-8192", "object": "model"}]}
+
+
+@app.get("/stats")
+async def stats():
+    return fake.counts
+
+
+if __name__ == "__main__":
+    import uvicorn
+    port = int(sys.argv[sys.argv.index("--port") + 1]) if "--port" in sys.argv else 9100
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
@@ -0,0 +1,275 @@
+"""
+Offline end-to-end load test.
+Starts benchmarks.fake_groq and the FastAPI app (pointed at it via GROQ_API_BASE) as
+subprocesses, drives each endpoint at several concurrency levels, and reports throughput
+and p50/p95/p99 latency per endpoint and level. Results are written as JSON; pass
+--compare with an earlier file to print the deltas (and fail on --max-p99-regression).
+Run from backend/:  python -m benchmarks.load_test [--levels 1,8,32] [--requests 64]
+The fake server reads FAKE_GROQ_* (see fake_groq.py); --chat-latency, --error-rate and
+--rate-limit-rate are shortcuts for the common ones.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+ENDPOINTS = ["orchestrate", "orchestrate_stream", "predict", "medications_screen", "transcribe"]
+READY_TIMEOUT_S = 180
+
+PROFILE = {"name": "Ravi", "age": 52, "gender": "male", "weight": 80, "height": 168,
+           "hasDiabetes": True, "hasHypertension": True, "district": "Guntur", "mandal": "Tenali"}
+COMPLAINTS = ["fever and body ache since 2 days", "headache and mild cough", "stomach pain after meals",
+              "joint pain in the knees", "tiredness and poor sleep", "burning urination since yesterday"]
+MEDICATION_SETS = [["aspirin", "warfarin"], ["dolo 650", "azithromycin"], ["metformin", "glimepiride"],
+                   ["telma 40", "atorvastatin"], ["pan d", "crocin advance", "cetirizine"]]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def orchestrate_body(i: int) -> dict:
+    # Vary every request so the LLM cache (if enabled) sees realistic, mostly-unique prompts
+    return {
+        "profile": {**PROFILE, "age": 30 + i % 45},
+        "query": f"{COMPLAINTS[i % len(COMPLAINTS)]} (visit {i})",
+        "medications": MEDICATION_SETS[i % len(MEDICATION_SETS)],
+        "symptoms": [{"complaint": "fever", "severity": "moderate"}],
+        "nutrition_logs": [{"description": "Dal Khichdi", "calories": 350}],
+        "language": "en",
+    }
+
+
+async def call_endpoint(client: httpx.AsyncClient, endpoint: str, i: int) -> dict:
+    """One request; returns {"ms", "ok", "status"} plus "first_byte_ms" for the stream."""
+    t0 = time.perf_counter()
+    first_byte = None
+    if endpoint == "orchestrate":
+        res = await client.post("/orchestrate", json=orchestrate_body(i))
+    elif endpoint == "orchestrate_stream":
+        async with client.stream("POST", "/orchestrate/stream", json=orchestrate_body(i)) as res:
+            async for _ in res.aiter_raw():
+                if first_byte is None:
+                    first_byte = (time.perf_counter() - t0) * 1000
+    elif endpoint == "predict":
+        res = await client.post("/predict", json={"features": {"age": 25 + i % 60, "bmi": 19 + i % 15,
+                                                              "genhlth": 1 + i % 5, "smoker": i % 2}})
+    elif endpoint == "medications_screen":
+        prescriptions = [{"id": f"rx-{i}-{j}", "medications": MEDICATION_SETS[(i + j) % len(MEDICATION_SETS)]}
+                         for j in range(20)]
+        res = await client.post("/medications/screen", json={"prescriptions": prescriptions})
+    elif endpoint == "transcribe":
+        audio = os.urandom(16_000)
+        res = await client.post("/transcribe", files={"audio": ("clip.webm", audio, "audio/webm")},
+                                data={"language": "en-IN"})
+    else:
+        raise ValueError(f"Unknown endpoint '{endpoint}'")
+    out = {"ms": (time.perf_counter() - t0) * 1000, "ok": res.status_code == 200, "status": res.status_code}
+    if first_byte is not None:
+        out["first_byte_ms"] = first_byte
+    return out
+
+
+async def run_level(base_url: str, endpoint: str, concurrency: int, total: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        counter = iter(range(total))
+        samples = []
+
+        async def worker():
+            for i in counter:
+                try:
+                    samples.append(await call_endpoint(client, endpoint, i))
+                except Exception as e:
+                    samples.append({"ms": 0.0, "ok": False, "status": type(e).__name__})
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+
+    latencies = sorted(s["ms"] for s in samples if s["ok"])
+    statuses = {}
+    for s in samples:
+        statuses[str(s["status"])] = statuses.get(str(s["status"]), 0) + 1
+    summary = {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": total - len(latencies),
+        "statuses": statuses,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+    first_bytes = sorted(s["first_byte_ms"] for s in samples if s["ok"] and "first_byte_ms" in s)
+    if first_bytes:
+        summary["first_byte_p50_ms"] = round(percentile(first_bytes, 0.50), 2)
+        summary["first_byte_p99_ms"] = round(percentile(first_bytes, 0.99), 2)
+    return summary
+
+
+def start_server(module_app: str, port: int, env: dict, log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module_app, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def wait_for(url: str, proc: subprocess.Popen, timeout: float, expect_status: int = 200):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode} before {url} came up")
+        try:
+            if httpx.get(url, timeout=2).status_code == expect_status:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"{url} not ready after {timeout:.0f}s")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, max_p99_regression: float = None) -> int:
+    """Prints per endpoint/level deltas; returns 1 if any p99 regressed past the threshold."""
+    failed = 0
+    print(f"\ncompared with {baseline['meta'].get('revision')} ({baseline['meta'].get('started_at')}):")
+    for endpoint, levels in current["results"].items():
+        for level, now in levels.items():
+            before = baseline.get("results", {}).get(endpoint, {}).get(level)
+            if not before or not before.get("p99_ms"):
+                continue
+            d_p99 = (now["p99_ms"] - before["p99_ms"]) / before["p99_ms"]
+            d_rps = (now["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] \
+                if before["throughput_rps"] else 0.0
+            flag = ""
+            if max_p99_regression is not None and d_p99 > max_p99_regression:
+                flag, failed = "  REGRESSION", 1
+            print(f"  {endpoint:<20} c={level:<4} p99 {before['p99_ms']:>9.1f} -> {now['p99_ms']:>9.1f} ms "
+                  f"({d_p99:+.1%})  rps {before['throughput_rps']:>7.1f} -> {now['throughput_rps']:>7.1f} "
+                  f"({d_rps:+.1%}){flag}")
+    return failed
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="requests per endpoint per level")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--chat-latency", help="FAKE_GROQ_CHAT_LATENCY, e.g. lognormal:350:0.35")
+    parser.add_argument("--error-rate", type=float, help="FAKE_GROQ_ERROR_RATE")
+    parser.add_argument("--rate-limit-rate", type=float, help="FAKE_GROQ_RATE_LIMIT_RATE")
+    parser.add_argument("--with-cache", action="store_true", help="keep the LLM response cache enabled")
+    parser.add_argument("--with-quota", action="store_true",
+                        help="keep the GROQ_RPM/GROQ_TPM scheduler limits (the fake server has no quota)")
+    parser.add_argument("--out", help="result file (default benchmarks/results/load_<time>.json)")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    parser.add_argument("--max-p99-regression", type=float, help="fail if any p99 grows by more (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    levels = [int(x) for x in args.levels.split(",") if x]
+    endpoints = [e for e in args.endpoints.split(",") if e]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    fake_port, app_port = free_port(), free_port()
+    fake_env = dict(os.environ)
+    for flag, var in (("chat_latency", "FAKE_GROQ_CHAT_LATENCY"), ("error_rate", "FAKE_GROQ_ERROR_RATE"),
+                      ("rate_limit_rate", "FAKE_GROQ_RATE_LIMIT_RATE")):
+        if getattr(args, flag) is not None:
+            fake_env[var] = str(getattr(args, flag))
+    app_env = {**fake_env, "GROQ_API_BASE": f"http://127.0.0.1:{fake_port}", "GROQ_API_KEY": "loadtest"}
+    if not args.with_cache:
+        app_env["LLM_CACHE_ENABLED"] = "0"
+    if not args.with_quota:
+        app_env["LLM_RATE_LIMIT_ENABLED"] = "0"
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    started_at = time.strftime("%Y%m%dT%H%M%S")
+    fake_proc = start_server("benchmarks.fake_groq:app", fake_port, fake_env,
+                             os.path.join(RESULTS_DIR, "fake_groq.log"))
+    app_proc = start_server("main:app", app_port, app_env, os.path.join(RESULTS_DIR, "app.log"))
+    base_url = f"http://127.0.0.1:{app_port}"
+    try:
+        wait_for(f"http://127.0.0.1:{fake_port}/models", fake_proc, 30)
+        wait_for(f"{base_url}/ready", app_proc, READY_TIMEOUT_S)
+        print(f"app on :{app_port}, fake Groq on :{fake_port}; levels {levels}, {args.requests} requests each")
+
+        results = {}
+        for endpoint in endpoints:
+            results[endpoint] = {}
+            for level in levels:
+                summary = asyncio.run(run_level(base_url, endpoint, level, args.requests))
+                results[endpoint][str(level)] = summary
+                print(f"  {endpoint:<20} c={level:<4} {summary['throughput_rps']:>8.1f} req/s  "
+                      f"p50 {summary['p50_ms']:>8.1f}  p95 {summary['p95_ms']:>8.1f}  "
+                      f"p99 {summary['p99_ms']:>8.1f} ms  errors {summary['errors']}")
+
+        report = {
+            "meta": {
+                "started_at": started_at,
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "levels": levels,
+                "requests_per_level": args.requests,
+                "llm_cache": args.with_cache,
+                "fake_groq": {k: v for k, v in fake_env.items() if k.startswith("FAKE_GROQ_")},
+            },
+            "results": results,
+            "server_stats": httpx.get(f"{base_url}/stats", timeout=10).json(),
+            "fake_groq_stats": httpx.get(f"http://127.0.0.1:{fake_port}/stats", timeout=10).json(),
+        }
+    finally:
+        for proc in (app_proc, fake_proc):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    out = args.out or os.path.join(RESULTS_DIR, f"load_{started_at}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            return compare(report, json.load(f), args.max_p99_regression)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
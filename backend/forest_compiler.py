@@ -0,0 +1,212 @@
+"""
+Compiled random-forest evaluator.
+Flattens a fitted scikit-learn tree ensemble into contiguous arrays
+(feature/threshold/left/right as int32/float32, leaf class fractions as float64) and
+walks every tree for a whole batch with a handful of NumPy operations per depth level.
+The compiled form is saved next to the pickle as an uncompressed .npz that loads
+memory-mapped.
+
+Usage (from backend/):  python forest_compiler.py [best_model.pkl] [--rows 2000]
+"""
+import os
+import pickle
+import struct
+import sys
+import zipfile
+
+import numpy as np
+
+FORMAT_VERSION = 2                  # 2: leaf fractions stored as float64
+PARITY_ATOL = 1e-6
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth: int, n_features: int):
+        self.feature = feature        # int32 [nodes]   split feature (0 on leaves)
+        self.threshold = threshold    # float32 [nodes] split threshold, rounded toward -inf
+        self.left = left              # int32 [nodes]   global index; leaves point at themselves
+        self.right = right            # int32 [nodes]
+        self.value = value            # float64 [nodes, classes] class fractions
+        self.roots = roots            # int32 [trees]
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf index reached in every tree, shape (rows, trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        flat = X.ravel()
+        row_base = (np.arange(X.shape[0], dtype=np.int64) * X.shape[1])[:, None]
+        children = self._children()
+        node = np.broadcast_to(np.asarray(self.roots, dtype=np.int32), (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_right = flat.take(row_base + self.feature.take(node)) > self.threshold.take(node)
+            node = children.take(2 * node + go_right)
+        return node
+
+    def _children(self) -> np.ndarray:
+        # (left, right) interleaved so one gather picks the next node; leaves loop onto themselves
+        if getattr(self, "_children_cache", None) is None:
+            self._children_cache = np.ascontiguousarray(np.column_stack([self.left, self.right]).ravel(), dtype=np.int32)
+        return self._children_cache
+
+    def predict_proba(self, X) -> np.ndarray:
+        leaves = self.apply(X)
+        return self.value.take(leaves, axis=0).sum(axis=1, dtype=np.float64) / self.n_trees
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+    def save(self, path: str):
+        # Uncompressed on purpose: stored members can be memory-mapped in place
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            value=self.value, roots=self.roots,
+            meta=np.array([FORMAT_VERSION, self.max_depth, self.n_features], dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompiledForest":
+        arrays = _mmap_npz(path) if mmap else dict(np.load(path))
+        version, max_depth, n_features = (int(v) for v in arrays["meta"])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{os.path.basename(path)}: unsupported compiled format v{version}")
+        return cls(arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+                   arrays["value"], arrays["roots"], max_depth, n_features)
+
+
+def _estimators(model):
+    if hasattr(model, "estimators_"):
+        trees = list(model.estimators_)
+    elif hasattr(model, "tree_"):
+        trees = [model]
+    else:
+        raise TypeError(f"{type(model).__name__} is not a tree ensemble")
+    for t in trees:
+        if not hasattr(t, "tree_") or not hasattr(t, "predict_proba"):
+            raise TypeError(f"{type(t).__name__} is not a classification tree")
+    return trees
+
+
+def compile_forest(model) -> CompiledForest:
+    """Flatten a fitted RandomForest/ExtraTrees/DecisionTree classifier."""
+    trees = _estimators(model)
+    n_classes = int(np.atleast_1d(model.n_classes_)[0])
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for est in trees:
+        t = est.tree_
+        n = t.node_count
+        idx = np.arange(offset, offset + n, dtype=np.int64)
+        is_leaf = t.children_left == -1
+
+        feature = np.where(is_leaf, 0, t.feature).astype(np.int32)
+
+        # sklearn compares float32 inputs against float64 thresholds; x <= t holds exactly
+        # when x <= the largest float32 not above t, so round toward -inf once here
+        thr64 = np.asarray(t.threshold, dtype=np.float64)
+        thr = thr64.astype(np.float32)
+        above = thr.astype(np.float64) > thr64
+        thr[above] = np.nextafter(thr[above], np.float32(-np.inf))
+
+        left = np.where(is_leaf, idx, t.children_left + offset).astype(np.int32)
+        right = np.where(is_leaf, idx, t.children_right + offset).astype(np.int32)
+
+        # scikit-learn >= 1.4 stores class fractions and sums them as they are; older
+        # releases store counts and normalise per tree. Kept as float64 either way, so the
+        # sum below is bit-for-bit the one predict_proba does
+        value = np.asarray(t.value[:, 0, :n_classes], dtype=np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        if not np.allclose(totals[is_leaf], 1.0):
+            totals[totals == 0] = 1.0
+            value = value / totals
+
+        features.append(feature)
+        thresholds.append(thr)
+        lefts.append(left)
+        rights.append(right)
+        values.append(value)
+        roots.append(offset)
+        max_depth = max(max_depth, int(t.max_depth))
+        offset += n
+
+    return CompiledForest(
+        np.ascontiguousarray(np.concatenate(features)),
+        np.ascontiguousarray(np.concatenate(thresholds)),
+        np.ascontiguousarray(np.concatenate(lefts)),
+        np.ascontiguousarray(np.concatenate(rights)),
+        np.ascontiguousarray(np.concatenate(values)),
+        np.array(roots, dtype=np.int32),
+        max_depth,
+        int(getattr(model, "n_features_in_", int(np.concatenate(features).max()) + 1)),
+    )
+
+
+def verify_parity(model, compiled: CompiledForest, X, atol: float = PARITY_ATOL) -> float:
+    """Max |compiled - sklearn| over X; raises if it exceeds atol."""
+    expected = model.predict_proba(np.asarray(X))
+    actual = compiled.predict_proba(X)
+    diff = float(np.max(np.abs(expected - actual))) if len(expected) else 0.0
+    if diff > atol:
+        raise AssertionError(f"Compiled forest diverges from predict_proba (max diff {diff:.3g} > {atol})")
+    return diff
+
+
+def compiled_path_for(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def _mmap_npz(path: str) -> dict:
+    """
+    Memory-map every member of an uncompressed .npz (np.load ignores mmap_mode for
+    archives). Compressed members fall back to a regular read.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            f.seek(info.header_offset)
+            local = f.read(30)
+            name_len, extra_len = struct.unpack("<HH", local[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran else "C")
+    return arrays
+
+
+def main(argv) -> int:
+    model_path = next((a for a in argv if a.endswith(".pkl")), os.path.join(os.path.dirname(os.path.abspath(__file__)), "best_model.pkl"))
+    rows = int(argv[argv.index("--rows") + 1]) if "--rows" in argv else 2000
+
+    with open(model_path, "rb") as fh:
+        model = pickle.load(fh)
+    compiled = compile_forest(model)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, compiled.n_features)) * 2
+    diff = verify_parity(model, compiled, X)
+
+    out = compiled_path_for(model_path)
+    compiled.save(out)
+    reloaded = CompiledForest.load(out)
+    verify_parity(model, reloaded, X)
+    print(f"[ML] Compiled {compiled.n_trees} trees / {len(compiled.feature)} nodes -> {out} (max diff {diff:.2e})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,18 +1,62 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Depends, Header
+from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from models import UnifiedRequest, UnifiedResponse
-from orchestrator import HealthIntelligenceOrchestrator
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse, Response
+from starlette.requests import ClientDisconnect
+from models import (
+    UnifiedRequest, UnifiedResponse, PredictRequest, MLPredictionResponse,
+    BatchPredictRequest, BatchPredictResponse, InteractionScreenRequest, InteractionScreenResponse
+)
+from orchestrator import HealthIntelligenceOrchestrator, GROQ_API_BASE
+from utils.http_client import http_client
+from utils.llm_cache import llm_cache
+from utils.warmup import readiness, warm_up
+from utils.cpu_executor import cpu_executor
+from utils.circuit_breaker import groq_breaker
+from utils.llm_scheduler import llm_scheduler
+from utils.deadline import DEADLINE_HEADER, parse_deadline_ms
+from utils.loop_lag import loop_lag
+from utils.upload_relay import MultipartRelay, UploadRejected, check_declared_size
+from utils.metrics import metrics, RequestMetricsMiddleware, SERIALIZATION_SECONDS
+from services.drug_interactions import screen_many
+from services.outbreak_forecaster import get_outbreak_forecaster
+from services.food_index import get_food_index
+from pydantic import ValidationError
 import uvicorn
 import os
 import httpx
+import json
+import time
+
+TRANSCRIBE_TIMEOUT = float(os.getenv("TRANSCRIBE_TIMEOUT", "60"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client per worker process, shared by every outbound Groq call
+    http_client.start()
+    cpu_executor.start()
+    loop_lag.start()
+    # Heavy imports, artifact loading and LLM pre-warm happen after the port is open
+    warmup_task = asyncio.create_task(warm_up(orchestrator))
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        loop_lag.stop()
+        cpu_executor.shutdown()
+        await http_client.aclose()
 
 app = FastAPI(
     title="Health Intelligence",
     description="AI + ML Health Guardian Backend — India AI Innovation Challenge 2026",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # ── CORS ─────────────────────────────────────────────────────────────────────
@@ -37,19 +81,132 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(RequestMetricsMiddleware)
 
 orchestrator = HealthIntelligenceOrchestrator()
 
-@app.post("/orchestrate", response_model=UnifiedResponse)
-async def orchestrate(request: UnifiedRequest):
+async def unified_request_body(http_request: Request) -> UnifiedRequest:
+    # Large clinical_vault/symptom payloads are validated on the CPU executor, not the event loop
+    body = await http_request.body()
     try:
-        response = await orchestrator.process(request)
-        return response
+        return await cpu_executor.validate(UnifiedRequest, body)
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+
+# Keeps the request schema in /docs even though the body is parsed by the dependency above
+UNIFIED_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/UnifiedRequest"}}}
+    }
+}
+
+def server_timing(governance, serialization_ms: float) -> str:
+    """Per-stage wall times as a Server-Timing header, readable in browser devtools."""
+    parts = [f"{name};dur={ms}" for name, ms in governance.stage_latency_ms.items()]
+    parts.append(f"llm_rate_wait;dur={governance.llm_rate_wait_ms}")
+    parts.append(f"llm_queue;dur={governance.llm_queue_ms}")
+    parts.append(f"llm_network;dur={governance.llm_network_ms}")
+    parts.append(f"serialize;dur={round(serialization_ms, 2)}")
+    parts.append(f"total;dur={governance.inference_latency_ms}")
+    return ", ".join(parts)
+
+@app.post("/orchestrate", response_model=UnifiedResponse, openapi_extra=UNIFIED_REQUEST_BODY)
+async def orchestrate(request: UnifiedRequest = Depends(unified_request_body),
+                      deadline: str = Header(None, alias=DEADLINE_HEADER)):
+    try:
+        response = await orchestrator.process(request, deadline_ms=parse_deadline_ms(deadline))
     except Exception as e:
         print(f"[Engine] Orchestration Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    # Encoded here rather than by FastAPI so the time lands in Server-Timing and /metrics
+    t0 = time.perf_counter()
+    body = response.model_dump_json()
+    serialization_s = time.perf_counter() - t0
+    SERIALIZATION_SECONDS.observe(serialization_s, endpoint="/orchestrate")
+    return Response(content=body, media_type="application/json",
+                    headers={"Server-Timing": server_timing(response.governance, serialization_s * 1000)})
+
+@app.post("/orchestrate/stream", openapi_extra=UNIFIED_REQUEST_BODY)
+async def orchestrate_stream(http_request: Request, request: UnifiedRequest = Depends(unified_request_body), format: str = None,
+                             deadline: str = Header(None, alias=DEADLINE_HEADER)):
+    """
+    Streams each section as soon as it is ready. Server-Sent Events when the client
+    asks for text/event-stream (or ?format=sse), newline-delimited JSON otherwise.
+    An emergency complaint gets a provisional Critical triage section first.
+    """
+    accept = http_request.headers.get("accept", "")
+    use_sse = format == "sse" or (format is None and "text/event-stream" in accept)
+
+    def encode(event: dict) -> str:
+        t0 = time.perf_counter()
+        payload = json.dumps(jsonable_encoder(event), ensure_ascii=False)
+        SERIALIZATION_SECONDS.observe(time.perf_counter() - t0, endpoint="/orchestrate/stream")
+        if use_sse:
+            return f"event: {event['event']}\ndata: {payload}\n\n"
+        return payload + "\n"
+
+    async def events():
+        try:
+            async for event in orchestrator.process_stream(request, deadline_ms=parse_deadline_ms(deadline)):
+                yield encode(event)
+        except Exception as e:
+            print(f"[Engine] Streaming Orchestration Error: {e}")
+            yield encode({"event": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/predict", response_model=MLPredictionResponse)
+async def predict(request: PredictRequest):
+    try:
+        return MLPredictionResponse(**await orchestrator.predict_features(request.features.model_dump()))
+    except Exception as e:
+        print(f"[ML] Prediction Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/batch", response_model=BatchPredictResponse)
+async def predict_batch(request: BatchPredictRequest):
+    if request.profiles is None and request.columns is None:
+        raise HTTPException(status_code=422, detail="Provide either 'profiles' or 'columns'")
+    if request.columns is not None and len({len(v) for v in request.columns.values()}) > 1:
+        raise HTTPException(status_code=422, detail="All feature columns must have the same length")
+    try:
+        result = await orchestrator.score_batch(request.profiles if request.profiles is not None else request.columns)
+        return BatchPredictResponse(
+            count=len(result["risk_probability"]),
+            source=result["source"],
+            risk_probability=result["risk_probability"].tolist(),
+            risk_level=result["risk_level"].tolist(),
+            vitality_score=result["vitality_score"].tolist(),
+            confidence=result["confidence"].tolist(),
+            organ_stress={k: v.tolist() for k, v in result["organ_stress"].items()}
+        )
+    except Exception as e:
+        print(f"[ML] Batch Prediction Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/medications/screen", response_model=InteractionScreenResponse)
+async def screen_medications(request: InteractionScreenRequest):
+    """Bulk interaction screening for whole prescription lists (no LLM call)."""
+    try:
+        screens = await cpu_executor.run(screen_many, [p.medications for p in request.prescriptions])
+        results = [{"id": p.id, **screen} for p, screen in zip(request.prescriptions, screens)]
+        return InteractionScreenResponse(
+            count=len(results),
+            flagged=sum(1 for r in results if r["status"] != "SAFE"),
+            results=results
+        )
+    except Exception as e:
+        print(f"[MedSafety] Bulk Screening Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/ehr")
 async def generate_ehr(request: UnifiedRequest):
     try:
@@ -60,34 +217,42 @@ async def generate_ehr(request: UnifiedRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/transcribe")
-async def transcribe(audio: UploadFile = File(...), language: str = Form("en-IN")):
+async def transcribe(request: Request):
     # Security proxy to bypass frontend Groq API disclosure blocks. Uses the backend env.
+    # Takes the same form as before (audio file + optional language) but parses it itself,
+    # so the recording is piped to Groq as it arrives instead of being buffered first.
     key = os.getenv("GROQ_API_KEY")
     if not key:
         raise HTTPException(status_code=500, detail="Backend missing GROQ_API_KEY")
 
-    url = 'https://api.groq.com/openai/v1/audio/translations'
-    
-    # Whisper expects 2-letter codes mostly, but some others work
-    language_code = language.split('-')[0] if '-' in language else language
+    url = f'{GROQ_API_BASE}/audio/translations'
+
+    try:
+        check_declared_size(request.headers.get("content-length"))
+        relay = MultipartRelay(
+            request.headers.get("content-type"), request.stream(),
+            file_field="audio", upstream_field="file",
+            fields={'model': 'whisper-large-v3', 'response_format': 'json'},
+        )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status, detail=e.detail)
 
-    files = {
-        'file': (audio.filename or 'audio.webm', await audio.read(), audio.content_type or 'audio/webm')
-    }
-    data = {
-        'model': 'whisper-large-v3',
-        'response_format': 'json',
-    }
     headers = {
-        "Authorization": f"Bearer {key}"
+        "Authorization": f"Bearer {key}",
+        "Content-Type": relay.content_type
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(url, headers=headers, data=data, files=files)
-            resp.raise_for_status()
-            content = resp.json()
-            return {"text": content.get("text", "")}
+        resp = await http_client.post(url, headers=headers, content=relay.body(), timeout=TRANSCRIBE_TIMEOUT)
+        resp.raise_for_status()
+        content = resp.json()
+        return {"text": content.get("text", "")}
+    except UploadRejected as e:
+        print(f"[Transcribe] Upload rejected after {relay.received_bytes} bytes: {e.detail}")
+        raise HTTPException(status_code=e.status, detail=e.detail)
+    except ClientDisconnect:
+        print(f"[Transcribe] Client disconnected after {relay.received_bytes} bytes")
+        raise HTTPException(status_code=400, detail="Upload interrupted")
     except httpx.HTTPStatusError as e:
         print(f"Groq API Error: {e.response.text}")
         raise HTTPException(status_code=500, detail="Transcription AI proxy error: " + e.response.text)
@@ -105,9 +270,80 @@ async def health():
         "ai_engine": "Groq (Llama 3.3 70b)" if groq_key_set else "Rule-based (Groq key missing)",
         "ml_backend": ml_url,
         "groq_configured": groq_key_set,
+        "artifacts_loaded": orchestrator.artifacts_loaded,
         "environment": os.getenv("RENDER", "local")
     }
 
+@app.get("/ready")
+async def ready():
+    # Readiness (vs. liveness at /health): 503 until the model is loaded and probed
+    snapshot = readiness.snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
+@app.get("/stats")
+async def stats():
+    return {
+        "http_pool": http_client.stats(),
+        "llm_cache": llm_cache.stats(),
+        "ml_batcher": orchestrator.risk_batcher.stats(),
+        "cpu_executor": cpu_executor.stats(),
+        "event_loop_lag": loop_lag.stats(),
+        "llm_circuit": groq_breaker.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "single_flight": {"orchestrate": orchestrator.request_flights.stats(), "llm": orchestrator.llm_flights.stats()},
+        "outbreak_forecaster": get_outbreak_forecaster().stats(),
+        "food_index": get_food_index().stats()
+    }
+
+@metrics.collector
+def component_metrics():
+    # The counters each component already keeps for /stats, re-exported for scraping
+    pool, cache = http_client.stats(), llm_cache.stats()
+    batcher, cpu, lag = orchestrator.risk_batcher.stats(), cpu_executor.stats(), loop_lag.stats()
+    circuit, scheduler = groq_breaker.stats(), llm_scheduler.stats()
+    flights = {"orchestrate": orchestrator.request_flights.stats(), "llm": orchestrator.llm_flights.stats()}
+    forecaster = get_outbreak_forecaster().stats()
+    return [
+        ("hi_http_pool_requests_in_flight", "gauge", "Outbound requests currently in flight.",
+         [({}, pool["requests_in_flight"])]),
+        ("hi_http_pool_waits_total", "counter", "Outbound requests that waited for a pooled connection.",
+         [({}, pool["pool_waits"])]),
+        ("hi_http_pool_wait_ms_total", "counter", "Milliseconds outbound requests spent waiting for a connection.",
+         [({}, pool["pool_wait_ms_total"])]),
+        ("hi_http_pool_errors_total", "counter", "Outbound requests that raised.", [({}, pool["errors"])]),
+        ("hi_llm_cache_entries", "gauge", "Entries in the in-memory LLM cache.", [({}, cache["entries"])]),
+        ("hi_llm_cache_evictions_total", "counter", "LLM cache LRU evictions.", [({}, cache["evictions"])]),
+        ("hi_ml_batches_total", "counter", "Risk-model micro-batches executed.", [({}, batcher["batches"])]),
+        ("hi_ml_batch_items_total", "counter", "Rows scored through the risk-model micro-batcher.",
+         [({}, batcher["items"])]),
+        ("hi_cpu_executor_in_flight", "gauge", "CPU-bound tasks currently offloaded.", [({}, cpu["in_flight"])]),
+        ("hi_event_loop_lag_seconds", "gauge", "Event loop scheduling lag over the recent window.",
+         [({"quantile": "0.5"}, lag["recent_p50_ms"] / 1000), ({"quantile": "0.99"}, lag["recent_p99_ms"] / 1000)]),
+        ("hi_llm_circuit_open", "gauge", "1 while the Groq circuit breaker is open or half-open.",
+         [({}, 0 if circuit["state"] == "closed" else 1)]),
+        ("hi_llm_circuit_trips_total", "counter", "Times the Groq circuit breaker has opened.",
+         [({}, circuit["trips"])]),
+        ("hi_llm_scheduler_waiting", "gauge", "LLM calls queued for Groq quota, by priority lane.",
+         [({"lane": str(lane)}, n) for lane, n in enumerate(scheduler["waiting_by_lane"])]),
+        ("hi_llm_scheduler_tokens_available", "gauge", "Tokens left in the tokens-per-minute bucket.",
+         [({}, scheduler["tokens_available"])]),
+        ("hi_llm_rate_limited_total", "counter", "429 responses from Groq.", [({}, scheduler["rate_limited"])]),
+        ("hi_single_flight_coalesced_total", "counter", "Callers that joined identical work already in flight.",
+         [({"level": level}, f["coalesced"]) for level, f in flights.items()]),
+        ("hi_single_flight_started_total", "counter", "Shared flights started (one per distinct in-flight key).",
+         [({"level": level}, f["started"]) for level, f in flights.items()]),
+        ("hi_forecast_events_total", "counter", "Symptom logs counted by the outbreak forecaster.",
+         [({}, forecaster["events"])]),
+        ("hi_forecast_series", "gauge", "Regional symptom series held by the outbreak forecaster.",
+         [({}, forecaster["series"])]),
+        ("hi_ready", "gauge", "1 once every required component has warmed up.",
+         [({}, 1 if readiness.ready else 0)]),
+    ]
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
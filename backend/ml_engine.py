@@ -1,27 +1,141 @@
 import numpy as np
 import pickle
 import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Evaluate the forest from flattened arrays (forest_compiler.py) instead of sklearn's per-call path
+ML_COMPILED_FOREST = os.getenv("ML_COMPILED_FOREST", "0") == "1"
+
+# Defaults for features the frontend does not collect (see frontend/services/mlBackend.ts)
+FEATURE_DEFAULTS = {
+    'age': 30, 'gender': 1, 'bmi': 22.0, 'genhlth': 1, 'smoker': 0,
+    'income': 50000, 'physhlth': 0, 'menthlth': 0,
+    'hasDiabetes': 0, 'hasHighBP': 0, 'hasHeartDisease': 0,
+}
+
+# Training columns (BRFSS-style names) -> request feature keys
+FEATURE_ALIASES = {
+    'sex': 'gender', 'gender': 'gender', 'age': 'age', 'bmi': 'bmi',
+    'genhlth': 'genhlth', 'smoker': 'smoker', 'income': 'income',
+    'physhlth': 'physhlth', 'menthlth': 'menthlth',
+    'diabetes': 'hasDiabetes', 'hasdiabetes': 'hasDiabetes',
+    'highbp': 'hasHighBP', 'hashighbp': 'hasHighBP',
+    'heartdiseaseorattack': 'hasHeartDisease', 'heartdisease': 'hasHeartDisease', 'hasheartdisease': 'hasHeartDisease',
+}
+
+RECOMMENDATIONS = {
+    "High": "High predicted risk. Schedule a physician review and monitor BP, glucose and lipids closely.",
+    "Moderate": "Moderate predicted risk. Improve diet and activity and repeat screening within 3 months.",
+    "Low": "Low predicted risk. Maintain current lifestyle and annual screening.",
+}
+
+
+RISK_LEVELS = np.array(["Low", "Moderate", "High"])
+
+# Columnar inputs accepted by the batch API (missing columns fall back to FEATURE_DEFAULTS / 0)
+BATCH_COLUMNS = (
+    'age', 'gender', 'bmi', 'genhlth', 'smoker', 'income', 'physhlth', 'menthlth',
+    'hasDiabetes', 'hasHighBP', 'hasHeartDisease', 'hasLiverDisease', 'hasKidneyDisease', 'hasAsthma',
+)
+
+
+def profile_features(profile) -> dict:
+    """Feature mapping for a UserProfile (genhlth from condition count, BMI from average height)."""
+    p = profile
+    condition_count = (
+        len(p.conditions) +
+        (1 if p.hasLiverDisease else 0) +
+        (1 if p.hasKidneyDisease else 0) +
+        (1 if p.hasDiabetes else 0) +
+        (1 if p.hasHighBP else 0) +
+        (1 if p.hasHeartDisease else 0)
+    )
+    genhlth = min(5, max(1, 1 + condition_count))
+
+    # Calculate BMI
+    avg_height = 1.58 if p.gender == "female" else 1.70
+    bmi = round(p.weight / (avg_height ** 2), 1) if p.weight > 0 else 22.0
+
+    return {
+        "age": p.age,
+        "gender": p.gender,
+        "bmi": bmi,
+        "genhlth": genhlth,
+        "hasDiabetes": p.hasDiabetes,
+        "hasHighBP": p.hasHighBP,
+        "hasHeartDisease": p.hasHeartDisease
+    }
+
+
+def profiles_to_columns(profiles) -> dict:
+    """List of UserProfile -> dict of float64 columns for the batch API."""
+    rows = [profile_features(p) for p in profiles]
+    columns = {key: np.array([_numeric(key, r[key]) for r in rows], dtype=np.float64) for key in rows[0]} if rows else {}
+    for key in ('hasLiverDisease', 'hasKidneyDisease', 'hasAsthma'):
+        columns[key] = np.array([bool(getattr(p, key, False)) for p in profiles], dtype=np.float64)
+    return columns
+
+
+def _round_exact(values, decimals: int):
+    """
+    Vectorised equivalent of Python's round(x, decimals). np.round rounds the already
+    rounded product x * 10**d, which can flip .5 ties; for rows sitting on a tie the
+    product's rounding error is recovered exactly (Dekker two-product) so they resolve
+    like CPython, half-to-even.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** decimals
+    product = values * scale
+    floor = np.floor(product)
+    out = np.rint(product)
+
+    ties = np.nonzero(np.abs(product - floor - 0.5) < 1e-7)[0]
+    if ties.size:
+        x, p, f = values[ties], product[ties], floor[ties]
+        # Veltkamp split of x; scale (a power of ten <= 1e15) splits exactly as (scale, 0)
+        c = x * 134217729.0
+        hi = c - (c - x)
+        lo = x - hi
+        error = (hi * scale - p) + lo * scale
+        side = (p - (f + 0.5)) + error
+        up = (side > 0) | ((side == 0) & (np.mod(f, 2) == 1))
+        out[ties] = f + up
+    return out / scale
+
+
+def _numeric(key: str, value) -> float:
+    if isinstance(value, str):
+        if key == 'gender':
+            return 0.0 if value.strip().lower() in ('female', 'f', '0') else 1.0
+        return float(value)
+    return float(value)
+
 
 class HealthRiskModel:
     """
     Health Intelligence ML Engine
     Core: Random Forest Ensemble for biological risk prediction.
     Features: Age, Gender, BMI, GenHlth, Conditions, Habits.
+
+    The trained artifacts (best_model.pkl, scaler.pkl, feature_columns.pkl) answer when all
+    three load and look usable; the clinical-weight rules below are the explicit fallback.
     """
-    def __init__(self, model_path='backend/best_model.pkl'):
-        self.model_path = model_path
+    def __init__(self, model_path=None, scaler_path=None, columns_path=None):
+        self.model_path = model_path or os.path.join(BASE_DIR, 'best_model.pkl')
+        self.scaler_path = scaler_path or os.path.join(BASE_DIR, 'scaler.pkl')
+        self.columns_path = columns_path or os.path.join(BASE_DIR, 'feature_columns.pkl')
         self.is_loaded = False
         self.model = None
-        
-        # Load model if exists, otherwise initialize with clinical weights
-        if os.path.exists(model_path) and os.path.getsize(model_path) > 100:
-            try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                self.is_loaded = True
-            except:
-                self.is_loaded = False
-        
+        self.scaler = None
+        self.feature_columns = []
+        self.load_error = None
+        self.compiled = None
+        self._scaler_params = None
+
+        self._load_artifacts()
+
         # Clinical Weights for the Ensemble logic (Simulating Random Forest)
         self.weights = {
             'age': 0.15,
@@ -32,11 +146,256 @@ class HealthRiskModel:
             'high_bp': 0.15
         }
 
+    def _load_artifacts(self):
+        try:
+            artifacts = []
+            for path in (self.model_path, self.scaler_path, self.columns_path):
+                with open(path, 'rb') as f:
+                    artifacts.append(pickle.load(f))
+            model, scaler, columns = artifacts
+
+            if not hasattr(model, 'predict_proba'):
+                raise ValueError(f"{os.path.basename(self.model_path)} has no predict_proba")
+            if not hasattr(scaler, 'transform'):
+                raise ValueError(f"{os.path.basename(self.scaler_path)} has no transform")
+            columns = list(columns)
+            if not columns:
+                raise ValueError(f"{os.path.basename(self.columns_path)} is empty")
+
+            self.model, self.scaler, self.feature_columns = model, scaler, columns
+            self._feature_keys = [self._align(c) for c in columns]
+            classes = list(getattr(model, 'classes_', [0, 1]))
+            self._positive_index = classes.index(1) if 1 in classes else len(classes) - 1
+            self.is_loaded = True
+        except Exception as e:
+            self.load_error = str(e)
+            self.is_loaded = False
+            print(f"[ML] Trained artifacts unavailable, using rule-based fallback: {e}")
+            return
+
+        if ML_COMPILED_FOREST:
+            self._load_compiled()
+
+    def _load_compiled(self):
+        """
+        Loads (or builds, parity-checks and saves) the flattened forest next to the pickle.
+        Any failure leaves the sklearn path in charge.
+        """
+        import forest_compiler
+        npz_path = forest_compiler.compiled_path_for(self.model_path)
+        try:
+            compiled = None
+            if os.path.exists(npz_path) and os.path.getmtime(npz_path) >= os.path.getmtime(self.model_path):
+                try:
+                    compiled = forest_compiler.CompiledForest.load(npz_path)
+                except ValueError as e:
+                    # Saved by an older compiler format: rebuilt below
+                    print(f"[ML] Rebuilding compiled forest: {e}")
+            if compiled is None:
+                compiled = forest_compiler.compile_forest(self.model)
+                probe = np.random.default_rng(0).normal(size=(256, compiled.n_features)) * 2
+                forest_compiler.verify_parity(self.model, compiled, probe)
+                try:
+                    compiled.save(npz_path)
+                except OSError as e:
+                    print(f"[ML] Could not save compiled forest: {e}")
+            self.compiled = compiled
+        except Exception as e:
+            self.compiled = None
+            print(f"[ML] Compiled forest unavailable, using sklearn predict_proba: {e}")
+            return
+
+        # StandardScaler is (x - mean_) / scale_; doing it directly skips sklearn's per-call validation
+        if type(self.scaler).__name__ == 'StandardScaler':
+            mean = getattr(self.scaler, 'mean_', None)
+            scale = getattr(self.scaler, 'scale_', None)
+            self._scaler_params = (
+                np.zeros(len(self._feature_keys)) if mean is None else np.asarray(mean, dtype=np.float64),
+                np.ones(len(self._feature_keys)) if scale is None else np.asarray(scale, dtype=np.float64),
+            )
+
+    @staticmethod
+    def _align(column) -> str:
+        norm = re.sub(r'[^a-z0-9]', '', str(column).lower())
+        return FEATURE_ALIASES.get(norm, str(column))
+
+    def _transform(self, matrix):
+        if self._scaler_params is not None:
+            mean, scale = self._scaler_params
+            return (matrix - mean) / scale
+        if hasattr(self.scaler, 'feature_names_in_'):
+            import pandas as pd
+            matrix = pd.DataFrame(matrix, columns=list(self.scaler.feature_names_in_))
+        return self.scaler.transform(matrix)
+
+    def _positive_proba(self, X):
+        if self.compiled is not None:
+            return self.compiled.predict_proba(X)[:, self._positive_index]
+        if hasattr(self.model, 'feature_names_in_'):
+            import pandas as pd
+            X = pd.DataFrame(X, columns=list(self.model.feature_names_in_))
+        return np.asarray(self.model.predict_proba(X)[:, self._positive_index], dtype=np.float64)
+
+    def _model_probability(self, features: dict) -> float:
+        row = np.array([[_numeric(key, features.get(key, FEATURE_DEFAULTS.get(key, 0))) for key in self._feature_keys]])
+        return float(self._positive_proba(self._transform(row))[0])
+
+    def predict(self, features: dict) -> dict:
+        """
+        Full prediction record: probability, level, vitality, confidence and which
+        path answered ("model" for the trained artifacts, "rules" for the fallback).
+        """
+        source = "rules"
+        if self.is_loaded:
+            try:
+                risk_prob = self._model_probability(features)
+                source = "model"
+            except Exception as e:
+                print(f"[ML] Model inference failed, using rule-based fallback: {e}")
+                risk_prob = self._rule_based_probability(features)
+        else:
+            risk_prob = self._rule_based_probability(features)
+
+        level = self._risk_level(risk_prob)
+        age = features.get('age', 30)
+        vitality = 100 - (risk_prob * 80) - (age / 10)
+        vitality = int(max(10, min(100, vitality)))
+
+        return {
+            "risk_probability": float(risk_prob),
+            "risk_level": level,
+            "vitality_score": vitality,
+            "confidence": round(max(risk_prob, 1 - risk_prob), 4),
+            "recommendation": RECOMMENDATIONS[level],
+            "source": source,
+        }
+
+    def _batch_columns(self, columns: dict, n: int) -> dict:
+        cols = {key: np.asarray(value, dtype=np.float64) for key, value in columns.items()}
+        for key in BATCH_COLUMNS:
+            if key not in cols:
+                cols[key] = np.full(n, float(FEATURE_DEFAULTS.get(key, 0)), dtype=np.float64)
+        return cols
+
+    def predict_batch(self, columns: dict) -> dict:
+        """
+        Vectorised predict() over columnar inputs ({feature: array}). Returns arrays that
+        match the scalar path element for element.
+        """
+        n = len(next(iter(columns.values()))) if columns else 0
+        cols = self._batch_columns(columns, n)
+
+        source = "rules"
+        if self.is_loaded and n:
+            try:
+                risk_prob = self._model_probability_batch(cols)
+                source = "model"
+            except Exception as e:
+                print(f"[ML] Batch model inference failed, using rule-based fallback: {e}")
+                risk_prob = self._rule_based_probability_batch(cols)
+        else:
+            risk_prob = self._rule_based_probability_batch(cols)
+
+        level = RISK_LEVELS[(risk_prob > 0.4).astype(np.int8) + (risk_prob > 0.7)]
+        vitality = 100 - (risk_prob * 80) - (cols['age'] / 10)
+        vitality = np.clip(vitality, 10, 100).astype(np.int64)
+
+        return {
+            "risk_probability": risk_prob,
+            "risk_level": level,
+            "vitality_score": vitality,
+            "confidence": _round_exact(np.maximum(risk_prob, 1 - risk_prob), 4),
+            "source": source,
+        }
+
+    def _model_probability_batch(self, cols: dict):
+        matrix = np.column_stack([cols[key] if key in cols else np.full(len(cols['age']), float(FEATURE_DEFAULTS.get(key, 0)))
+                                  for key in self._feature_keys])
+        return self._positive_proba(self._transform(matrix))
+
+    def _rule_based_probability_batch(self, cols: dict):
+        age, bmi = cols['age'], cols['bmi']
+        # Same operations in the same order as _rule_based_probability, so results are bit-identical
+        risk = np.full(len(age), 0.1)
+        risk = risk + np.where(age > 40, (age - 40) * 0.01, 0.0)
+        risk = risk + np.where(bmi > 25, (bmi - 25) * 0.02, 0.0)
+        risk = risk + (cols['genhlth'] - 1) * 0.12
+        risk = risk + np.where(cols['hasDiabetes'] != 0, 0.15, 0.0)
+        risk = risk + np.where(cols['hasHighBP'] != 0, 0.12, 0.0)
+        risk = risk + np.where(cols['hasHeartDisease'] != 0, 0.25, 0.0)
+        return np.clip(risk, 0.05, 0.95)
+
+    def get_organ_stress_batch(self, columns: dict, risk_prob) -> dict:
+        """Vectorised get_organ_stress over columnar inputs."""
+        cols = self._batch_columns(columns, len(risk_prob))
+        flag = lambda key, w: (cols[key] != 0) * w
+
+        cardio = 0.15 + flag('hasHeartDisease', 0.4) + flag('hasHighBP', 0.2) + (risk_prob * 0.25)
+        liver = 0.1 + flag('hasLiverDisease', 0.6) + flag('hasDiabetes', 0.1) + (risk_prob * 0.1)
+        kidney = 0.1 + flag('hasKidneyDisease', 0.6) + flag('hasDiabetes', 0.2) + (risk_prob * 0.1)
+        respiratory = 0.1 + flag('hasAsthma', 0.5) + (risk_prob * 0.15)
+
+        return {
+            "cardio": _round_exact(np.minimum(1.0, cardio), 2),
+            "liver": _round_exact(np.minimum(1.0, liver), 2),
+            "kidney": _round_exact(np.minimum(1.0, kidney), 2),
+            "respiratory": _round_exact(np.minimum(1.0, respiratory), 2)
+        }
+
+    def score_batch(self, data) -> dict:
+        """
+        Batch equivalent of predict() + get_organ_stress(). Accepts a list of UserProfile
+        or a dict of columns.
+        """
+        columns = profiles_to_columns(data) if isinstance(data, (list, tuple)) else data
+        result = self.predict_batch(columns)
+        result["organ_stress"] = self.get_organ_stress_batch(columns, result["risk_probability"])
+        return result
+
+    def predict_many(self, features_list: list) -> list:
+        """
+        predict() for many feature dicts in one vectorised pass; used by the micro-batcher.
+        Each record matches what predict() returns for the same dict.
+        """
+        if not features_list:
+            return []
+        keys = set(BATCH_COLUMNS[:11]) | set(getattr(self, '_feature_keys', []))
+        columns = {
+            key: np.array([_numeric(key, f.get(key, FEATURE_DEFAULTS.get(key, 0))) for f in features_list], dtype=np.float64)
+            for key in keys
+        }
+        batch = self.predict_batch(columns)
+        probs, levels = batch["risk_probability"].tolist(), batch["risk_level"].tolist()
+        vitality, confidence = batch["vitality_score"].tolist(), batch["confidence"].tolist()
+        return [
+            {
+                "risk_probability": probs[i],
+                "risk_level": levels[i],
+                "vitality_score": vitality[i],
+                "confidence": confidence[i],
+                "recommendation": RECOMMENDATIONS[levels[i]],
+                "source": batch["source"],
+            }
+            for i in range(len(features_list))
+        ]
+
     def predict_risk(self, features: dict):
         """
         Input: dict with keys [age, gender, bmi, genhlth, hasDiabetes, hasHighBP, hasHeartDisease]
         Output: (risk_probability, risk_level, vitality_score)
         """
+        result = self.predict(features)
+        return result["risk_probability"], result["risk_level"], result["vitality_score"]
+
+    @staticmethod
+    def _risk_level(risk_prob: float) -> str:
+        if risk_prob > 0.7:
+            return "High"
+        elif risk_prob > 0.4:
+            return "Moderate"
+        return "Low"
+
+    def _rule_based_probability(self, features: dict) -> float:
         # Feature Extraction
         age = features.get('age', 30)
         bmi = features.get('bmi', 22)
@@ -51,35 +410,21 @@ class HealthRiskModel:
         # 1. Age Factor (Linear increase after 40)
         if age > 40:
             risk += (age - 40) * 0.01
-        
+
         # 2. BMI Factor
         if bmi > 25:
             risk += (bmi - 25) * 0.02
-        
+
         # 3. GenHlth (Condition count based)
         risk += (genhlth - 1) * 0.12
-        
+
         # 4. Chronic Specifics
         if has_diabetes: risk += 0.15
         if has_high_bp: risk += 0.12
         if has_heart: risk += 0.25
 
         # Normalize and Cap
-        risk_prob = min(0.95, max(0.05, risk))
-        
-        # Determine Level
-        if risk_prob > 0.7:
-            level = "High"
-        elif risk_prob > 0.4:
-            level = "Moderate"
-        else:
-            level = "Low"
-            
-        # Vitality Score (Inverse of risk + age factor)
-        vitality = 100 - (risk_prob * 80) - (age / 10)
-        vitality = int(max(10, min(100, vitality)))
-
-        return float(risk_prob), level, vitality
+        return float(min(0.95, max(0.05, risk)))
 
     def get_organ_stress(self, profile, risk_prob):
         """
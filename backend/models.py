@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Optional, Dict, Any
 
 class HealthCondition(BaseModel):
@@ -35,6 +35,8 @@ class UnifiedRequest(BaseModel):
     nutrition_logs: Optional[List[Dict]] = []
     activity_logs: Optional[List[Dict]] = []
     language: str = "en"
+    # Per-request compaction results (services/context_compactor.py), never serialised
+    _compacted: Dict[str, Any] = PrivateAttr(default_factory=dict)
 
 class OrganStress(BaseModel):
     cardio: float
@@ -48,6 +50,53 @@ class BioRiskResponse(BaseModel):
     vitality_score: int
     organ_stress: OrganStress
 
+class HealthFeatures(BaseModel):
+    age: float
+    gender: int = 1
+    bmi: float
+    genhlth: int = 1
+    smoker: int = 0
+    income: float = 50000
+    physhlth: float = 0
+    menthlth: float = 0
+
+class PredictRequest(BaseModel):
+    features: HealthFeatures
+
+class MLPredictionResponse(BaseModel):
+    risk_probability: float
+    risk_level: str
+    confidence: float
+    vitality_score: int
+    recommendation: str
+    source: str = "rules"
+
+class BatchPredictRequest(BaseModel):
+    # Either a list of profiles or columnar features ({"age": [...], "bmi": [...], ...})
+    profiles: Optional[List[UserProfile]] = None
+    columns: Optional[Dict[str, List[float]]] = None
+
+class BatchPredictResponse(BaseModel):
+    count: int
+    source: str
+    risk_probability: List[float]
+    risk_level: List[str]
+    vitality_score: List[int]
+    confidence: List[float]
+    organ_stress: Dict[str, List[float]]
+
+class DrugInteraction(BaseModel):
+    drugs: List[str]
+    severity: str
+    message: str
+
+class MedicationResolution(BaseModel):
+    input: str
+    drugs: List[str]
+    matched: Optional[str] = None
+    confidence: float
+    method: str
+
 class MedSafetyResponse(BaseModel):
     interaction_level: str
     conflicts_detected: List[str]
@@ -55,6 +104,28 @@ class MedSafetyResponse(BaseModel):
     next_action: str
     clarification_needed: bool = False
     question: Optional[str] = None
+    interactions: List[DrugInteraction] = []
+    resolved_medications: List[MedicationResolution] = []
+
+class PrescriptionList(BaseModel):
+    id: Optional[str] = None
+    medications: List[str]
+
+class InteractionScreenRequest(BaseModel):
+    prescriptions: List[PrescriptionList]
+
+class PrescriptionScreenResult(BaseModel):
+    id: Optional[str] = None
+    status: str
+    drugs: List[str]
+    interactions: List[DrugInteraction]
+    resolutions: List[MedicationResolution] = []
+    unresolved: List[str] = []
+
+class InteractionScreenResponse(BaseModel):
+    count: int
+    flagged: int
+    results: List[PrescriptionScreenResult]
 
 class TriageResponse(BaseModel):
     triage_level: str
@@ -62,6 +133,19 @@ class TriageResponse(BaseModel):
     specialist_recommendation: str
     follow_up_questions: List[str]
     disclaimer: str
+    emergency_terms: List[str] = []
+    provisional: bool = False
+
+class NutritionIntake(BaseModel):
+    days_logged: int = 0
+    logs: int = 0
+    matched_logs: int = 0
+    avg_daily_calories: float = 0.0
+    protein_g: float = 0.0
+    carbs_g: float = 0.0
+    fat_g: float = 0.0
+    fibre_g: float = 0.0
+    energy_split: Dict[str, float] = {}
 
 class NutritionResponse(BaseModel):
     required_calories: int
@@ -70,6 +154,7 @@ class NutritionResponse(BaseModel):
     profession_adjustment: str
     recommendations: Dict[str, List[str]]
     clarification_needed: bool = False
+    intake: Optional[NutritionIntake] = None
 
 class VisionResponse(BaseModel):
     identified_compound: str
@@ -97,11 +182,34 @@ class ForecastingIntelligence(BaseModel):
     z_score_deviation: float = 0.0
     confidence_interval: List[float] = [0.0, 0.0]
 
+class LLMCallMetrics(BaseModel):
+    section: str
+    cache: str = "bypass"          # hit | miss | bypass
+    status: str = "ok"             # ok | error | cache_hit | deadline | short_circuit | rate_limited | coalesced
+    queue_ms: float = 0.0
+    connect_ms: float = 0.0
+    network_ms: float = 0.0
+    rate_wait_ms: float = 0.0
+    retries: int = 0
+
 class GovernanceMetrics(BaseModel):
     inference_latency_ms: int = 200
     model_version: str = "SENTINEL-V4.9"
     data_drift_score: float = 0.02
     compliance_id: str = "DPDP-2023-VERIFIED"
+    critical_path: List[str] = []
+    critical_path_ms: float = 0.0
+    stage_latency_ms: Dict[str, float] = {}
+    llm_calls: List[LLMCallMetrics] = []
+    llm_queue_ms: float = 0.0
+    llm_network_ms: float = 0.0
+    llm_rate_wait_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    context_tokens: Dict[str, Dict[str, int]] = {}
+    context_tokens_saved: int = 0
+    deadline_ms: Optional[float] = None
+    deadline_exceeded: bool = False
 
 class ClinicalEHR(BaseModel):
     ehr_id: str = "AHMIS-AI-GEN-2026"
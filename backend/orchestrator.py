@@ -6,25 +6,106 @@ Local Ollama dependency removed — works in cloud (Render) deployment.
 import asyncio
 import os
 import json
+import threading
 import httpx
 from models import (
     UnifiedRequest, UnifiedResponse, BioRiskResponse,
-    MedSafetyResponse, TriageResponse, NutritionResponse, VisionResponse, OrganStress,
+    MedSafetyResponse, TriageResponse, NutritionResponse, NutritionIntake, VisionResponse, OrganStress,
     AyushResponse, AyushRecommendation, SeasonalRisk, ClinicalEHR,
     GovernanceMetrics, ForecastingIntelligence
 )
-from ml_engine import HealthRiskModel
+from utils.http_client import http_client
+from utils.circuit_breaker import groq_breaker
+from utils.deadline import applied_budget_ms, call_budget, current_budget_ms, expired, start_deadline
+from utils.llm_scheduler import LLM_COMPLETION_TOKEN_ESTIMATE, LLM_MAX_RETRIES, llm_scheduler
+from utils.llm_cache import llm_cache, cache_key
+from utils.stage_graph import Stage, StageGraph
+from utils.metrics import LLM_FUSED_SECTIONS, PIPELINE_SECONDS
+from utils.request_trace import record_llm_call, start_trace
+from utils.micro_batcher import MicroBatcher
+from utils.single_flight import SingleFlight, canonical_hash
+from utils.cpu_executor import cpu_executor, worker_predict_many, worker_score_batch
+from services.drug_interactions import get_interaction_graph
+from services.emergency_matcher import get_emergency_matcher
+from services.ayush_table import get_ayush_table
+from services.outbreak_forecaster import get_outbreak_forecaster
+from services.food_index import get_food_index
+from services.context_compactor import compact_context, estimate_tokens
 
 # ── Config ────────────────────────────────────────────────────────────────────
 GROQ_API_KEY    = os.getenv("GROQ_API_KEY", "")
-GROQ_API_URL    = "https://api.groq.com/openai/v1/chat/completions"
+# Any OpenAI-compatible endpoint; benchmarks point this at benchmarks/fake_groq.py
+GROQ_API_BASE   = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1").rstrip("/")
+GROQ_API_URL    = f"{GROQ_API_BASE}/chat/completions"
+GROQ_MODELS_URL = f"{GROQ_API_BASE}/models"
 GROQ_MODEL      = "llama3-8b-8192"
+GROQ_TIMEOUT    = float(os.getenv("GROQ_TIMEOUT", "15"))
+GROQ_TEMPERATURE = 0.3
+# Opt-in: one JSON completion answers every LLM section of a request; sections whose part
+# fails validation fall back to their own call
+LLM_FUSED_MODE  = os.getenv("LLM_FUSED_MODE", "0") == "1"
+LLM_FUSED_MAX_TOKENS = int(os.getenv("LLM_FUSED_MAX_TOKENS", "3072"))
+# AYUSH rows found in the precomputed table still get an LLM-written analysis unless this is 0
+AYUSH_ANALYSIS_LLM = os.getenv("AYUSH_ANALYSIS_LLM", "1") == "1"
+LLM_UNAVAILABLE = "AI service temporarily unavailable."
 ML_BACKEND_URL  = os.getenv("ML_BACKEND_URL", "https://health-intelligence-backend.onrender.com/predict")
 
 
 class HealthIntelligenceOrchestrator:
     def __init__(self):
-        self.ml_engine = HealthRiskModel()
+        # The ML engine (numpy/sklearn + pickles) loads in the background warm-up, not at import
+        self._ml_engine = None
+        self._ml_lock = threading.Lock()
+        # Concurrent /orchestrate and /predict rows share one vectorised model call
+        self.risk_batcher = MicroBatcher(self._predict_many, name="risk_model")
+        # Identical concurrent /orchestrate requests and identical prompts share one in-flight run
+        self.request_flights = SingleFlight("orchestrate")
+        self.llm_flights = SingleFlight("llm")
+        self.pipeline = self._build_pipeline()
+        self.fused_pipeline = self._build_pipeline(fused=True)
+
+    # ── ML Engine Lifecycle ───────────────────────────────────────────────────
+    def load_ml_engine(self):
+        """Imports and loads the risk model once; safe to call from several threads."""
+        if self._ml_engine is None:
+            with self._ml_lock:
+                if self._ml_engine is None:
+                    from ml_engine import HealthRiskModel
+                    self._ml_engine = HealthRiskModel()
+        return self._ml_engine
+
+    @property
+    def ml_engine(self):
+        return self._ml_engine or self.load_ml_engine()
+
+    async def get_ml_engine(self):
+        # Off the event loop, so a request that beats the warm-up does not stall others
+        return self._ml_engine or await asyncio.to_thread(self.load_ml_engine)
+
+    @property
+    def artifacts_loaded(self) -> bool:
+        return self._ml_engine is not None and self._ml_engine.is_loaded
+
+    async def _predict_many(self, features_list: list) -> list:
+        if cpu_executor.mode == "process":
+            # Each pool worker holds its own loaded model
+            return await cpu_executor.run(worker_predict_many, features_list)
+        engine = await self.get_ml_engine()
+        return await cpu_executor.run(engine.predict_many, features_list)
+
+    async def score_batch(self, data) -> dict:
+        """Scores a /predict/batch payload (row dicts or feature columns) off the event loop."""
+        if cpu_executor.mode == "process":
+            return await cpu_executor.run(worker_score_batch, data)
+        engine = await self.get_ml_engine()
+        return await cpu_executor.run(engine.score_batch, data)
+
+    async def prewarm_llm(self):
+        """Opens a pooled TLS connection to Groq so the first real prompt skips the handshake."""
+        if not GROQ_API_KEY:
+            return "skipped"
+        res = await http_client.request("GET", GROQ_MODELS_URL, headers={"Authorization": f"Bearer {GROQ_API_KEY}"}, timeout=5.0)
+        return {"status_code": res.status_code}
 
     def get_language_name(self, code: str) -> str:
         mapping = {
@@ -38,95 +119,146 @@ class HealthIntelligenceOrchestrator:
         }
         return mapping.get(code, "English")
 
+    # ── Pipeline ──────────────────────────────────────────────────────────────
+    def _build_pipeline(self, fused: bool = False) -> StageGraph:
+        has_meds  = lambda req: bool(req.medications)
+        has_query = lambda req: bool(req.query or req.problem_context)
+        # In fused mode the LLM sections wait for the single fused completion instead of calling Groq
+        llm = ["llm_fused"] if fused else []
+        stages = [
+            Stage("bio_risk",          lambda req, r: self.run_bio_risk(req)),
+            Stage("medication_safety", lambda req, r: self.run_med_safety(req, r["bio_risk"], r.get("llm_fused")),
+                  inputs=["bio_risk", *llm], when=has_meds),
+            Stage("triage",            lambda req, r: self.run_triage(req, r["bio_risk"], r.get("llm_fused")),
+                  inputs=["bio_risk", *llm], when=has_query),
+            Stage("nutrition",         lambda req, r: self.run_nutrition(req, r["bio_risk"]),  inputs=["bio_risk"]),
+            Stage("ayush",             lambda req, r: self.run_ayush_analysis(req, r["bio_risk"], r.get("llm_fused")),
+                  inputs=["bio_risk", *llm]),
+            # EHR synthesis only reads the dictation + profile, so it overlaps with triage
+            Stage("ehr_record",        lambda req, r: self.run_ehr_analysis(req, r.get("llm_fused")), inputs=llm, when=has_query),
+            Stage("guardian_summary",  lambda req, r: self.generate_summary(req, r, r.get("llm_fused")),
+                  inputs=["bio_risk", "medication_safety", "triage", "ayush", *llm]),
+        ]
+        if fused:
+            stages.insert(1, Stage("llm_fused", lambda req, r: self.run_fused_llm(req, r["bio_risk"]), inputs=["bio_risk"]))
+        return StageGraph(stages)
+
     # ── Main Entry ────────────────────────────────────────────────────────────
-    async def process(self, request: UnifiedRequest) -> UnifiedResponse:
-        # Step 1: Run ML Bio Risk First (Foundation for fusion)
-        bio_risk = await self.run_bio_risk(request)
-        
-        # Step 2: Run other tasks with ML context
-        tasks = []
-        if request.medications:
-            tasks.append(self.run_med_safety(request, bio_risk))
-        if request.query or request.problem_context:
-            tasks.append(self.run_triage(request, bio_risk))
-        tasks.append(self.run_nutrition(request, bio_risk))
-        tasks.append(self.run_ayush_analysis(request, bio_risk))
+    async def process(self, request: UnifiedRequest, on_stage_complete=None, deadline_ms: float = None) -> UnifiedResponse:
+        """
+        deadline_ms: overall budget for the request (REQUEST_DEADLINE_MS when omitted);
+        LLM calls get whatever is left of it, and sections fall back once it is spent.
+        Identical requests already in flight share one run (and its deadline); streamed
+        runs are not shared, since each needs its own stage callbacks. The budget is part
+        of the key: a run started earlier with the same budget ends no later than the
+        joiner's own deadline, while one with a longer budget could outlast it.
+        """
+        if on_stage_complete is not None:
+            return await self._process(request, on_stage_complete, deadline_ms)
+        key = canonical_hash([request.model_dump(mode="json"), applied_budget_ms(deadline_ms)])
+        response, _ = await self.request_flights.do(key, lambda: self._process(request, None, deadline_ms))
+        return response
+
+    async def _process(self, request: UnifiedRequest, on_stage_complete=None, deadline_ms: float = None) -> UnifiedResponse:
+        # Stage tasks copy this context, so their LLM calls report into the same trace and deadline
+        trace = start_trace()
+        deadline_ms = start_deadline(deadline_ms)
+        self.ingest_symptoms(request)
+        pipeline = self.fused_pipeline if LLM_FUSED_MODE else self.pipeline
+        run = await pipeline.run(request, on_complete=on_stage_complete)
+        for name in run.timings:
+            trace.record_stage(name, run.duration_ms(name), failed=name in run.errors)
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Bio risk is the foundation for fusion; without it there is no response to build
+        if "bio_risk" in run.errors:
+            raise run.errors["bio_risk"]
+        bio_risk = run.results["bio_risk"]
 
         response_data = {
             "bio_risk": bio_risk,
-            "medication_safety": None,
-            "triage": None,
-            "nutrition": None,
-            "ayush": None,
+            "medication_safety": run.results.get("medication_safety"),
+            "triage": run.results.get("triage"),
+            "nutrition": run.results.get("nutrition"),
+            "ayush": run.results.get("ayush"),
             "vision_result": None,
+            "ehr_record": run.results.get("ehr_record"),
             "fusionScores": {
                 "overall": "SAFE" if bio_risk.risk_level.lower() == 'low' else "DANGER" if bio_risk.risk_level.lower() == 'high' else "CAUTION",
                 "score": bio_risk.vitality_score
             },
-            "guardian_summary": "",
+            "guardian_summary": run.results.get("guardian_summary") or "",
             "language": request.language
         }
 
-        for res in results:
-            if isinstance(res, Exception):
-                print(f"[Orchestrator] Task error: {res}")
-                continue
-            if isinstance(res, MedSafetyResponse):  response_data["medication_safety"] = res
-            if (isinstance(res, TriageResponse)):     response_data["triage"]            = res
-            if (isinstance(res, NutritionResponse)):  response_data["nutrition"]         = res
-            if (isinstance(res, AyushResponse)):      response_data["ayush"]             = res
-
-        # Step 3: Check for EHR Synthesis if not present
-        if not response_data.get("ehr_record") and (request.query or request.problem_context):
-            response_data["ehr_record"] = await self.run_ehr_analysis(request)
-
-        response_data["guardian_summary"] = await self.generate_summary(request, response_data)
-        
         # Final Governance Audit
+        latency_ms = trace.elapsed_ms()
+        PIPELINE_SECONDS.observe(latency_ms / 1000)
         response_data["governance"] = GovernanceMetrics(
-            inference_latency_ms=210, # Mocked for challenge
-            model_version="SENTINEL-NATIONAL-V4.9-PROD"
+            inference_latency_ms=int(round(latency_ms)),
+            model_version="SENTINEL-NATIONAL-V4.9-PROD",
+            critical_path=run.critical_path,
+            critical_path_ms=run.total_ms,
+            deadline_ms=deadline_ms,
+            deadline_exceeded=expired(),
+            **trace.summary()
         )
-        
+
         return UnifiedResponse(**response_data)
 
+    async def process_stream(self, request: UnifiedRequest, deadline_ms: float = None):
+        """
+        Progressive variant of process(): yields one event per section the moment its
+        stage settles, then a final "complete" event carrying fusion scores and governance.
+        """
+        queue = asyncio.Queue()
+        sections = set(UnifiedResponse.model_fields)
+
+        def on_stage_complete(name, result):
+            if name in sections:
+                queue.put_nowait({"event": "section", "section": name, "data": result})
+
+        task = asyncio.create_task(self.process(request, on_stage_complete=on_stage_complete, deadline_ms=deadline_ms))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            # Emergency keywords short-circuit to a provisional Critical triage before any LLM reply
+            provisional = self.immediate_triage(request)
+            if provisional:
+                yield {"event": "section", "section": "triage", "provisional": True, "data": provisional}
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+
+            response = task.result()
+            yield {
+                "event": "complete",
+                "data": {
+                    "fusionScores": response.fusionScores,
+                    "governance": response.governance,
+                    "language": response.language,
+                    "disclaimer": response.disclaimer,
+                }
+            }
+        finally:
+            if not task.done():
+                task.cancel()
+
     # ── ML + LLM Fused Bio Risk ───────────────────────────────────────────────
     async def run_bio_risk(self, request: UnifiedRequest) -> BioRiskResponse:
         p = request.profile
 
         # Feature Mapping for ML Engine
-        # Derive genhlth from conditions
-        condition_count = (
-            len(p.conditions) +
-            (1 if p.hasLiverDisease else 0) +
-            (1 if p.hasKidneyDisease else 0) +
-            (1 if p.hasDiabetes else 0) +
-            (1 if p.hasHighBP else 0) +
-            (1 if p.hasHeartDisease else 0)
-        )
-        genhlth = min(5, max(1, 1 + condition_count))
-        
-        # Calculate BMI
-        avg_height = 1.58 if p.gender == "female" else 1.70
-        bmi = round(p.weight / (avg_height ** 2), 1) if p.weight > 0 else 22.0
-
-        ml_features = {
-            "age": p.age,
-            "gender": p.gender,
-            "bmi": bmi,
-            "genhlth": genhlth,
-            "hasDiabetes": p.hasDiabetes,
-            "hasHighBP": p.hasHighBP,
-            "hasHeartDisease": p.hasHeartDisease
-        }
+        engine = await self.get_ml_engine()
+        from ml_engine import profile_features
+        ml_features = profile_features(p)
 
-        # Step 1: Execute Local ML Inference
-        risk_prob, risk_level, vitality = self.ml_engine.predict_risk(ml_features)
+        # Step 1: Execute Local ML Inference (micro-batched with concurrent requests)
+        prediction = await self.predict_features(ml_features)
+        risk_prob, risk_level, vitality = prediction["risk_probability"], prediction["risk_level"], prediction["vitality_score"]
 
         # Step 2: Compute Organ Stress fused with risk probability
-        stress_data = self.ml_engine.get_organ_stress(p, risk_prob)
+        stress_data = engine.get_organ_stress(p, risk_prob)
         
         organ_stress = OrganStress(
             cardio=stress_data["cardio"],
@@ -142,57 +274,74 @@ class HealthIntelligenceOrchestrator:
             organ_stress=organ_stress
         )
 
+    async def predict_features(self, features: dict) -> dict:
+        return await self.risk_batcher.submit(features)
+
     # ── Medication Safety: Rules + ML + Groq ──────────────────────────────────
-    async def run_med_safety(self, request: UnifiedRequest, bio: BioRiskResponse = None) -> MedSafetyResponse:
-        p    = request.profile
-        meds = [m.lower() for m in (request.medications or [])]
-        conflicts = []
-        status = "SAFE"
-
-        # Rule-based interaction engine
-        DANGEROUS_COMBOS = [
-            (["aspirin", "warfarin"], "High bleeding risk between Aspirin and Warfarin."),
-            (["aspirin", "ibuprofen"], "Double NSAID — increased GI bleeding risk."),
-            (["metformin", "alcohol"], "Lactic acidosis risk with Metformin + Alcohol."),
-            (["ssri", "tramadol"], "Serotonin syndrome risk."),
-            (["digoxin", "amiodarone"], "Digoxin toxicity risk."),
-        ]
-        for combo, msg in DANGEROUS_COMBOS:
-            if all(drug in meds for drug in combo):
-                conflicts.append(msg)
-                status = "DANGER"
+    def screen_medications(self, request: UnifiedRequest, bio: BioRiskResponse = None) -> dict:
+        """Rule + ML findings for the medication list: {"screen", "conflicts", "status", "med_list"}."""
+        p     = request.profile
+        graph = get_interaction_graph()
+
+        # Indexed interaction engine (fuzzy names/brands -> canonical drugs -> pairwise lookups)
+        screen = graph.screen(request.medications or [])
+        drugs  = screen["drugs"]
+        # Class-level rules can fire for several pairs with the same message (e.g. three NSAIDs)
+        conflicts = list(dict.fromkeys(i["message"] for i in screen["interactions"]))
+        status = screen["status"]
 
         # Condition-based & ML-Informed warnings
         if p.hasLiverDisease or (bio and bio.organ_stress.liver > 0.6):
-            if any(m in meds for m in ["paracetamol", "acetaminophen", "statin"]):
+            if graph.flagged(drugs, "hepatotoxic"):
                 conflicts.append(f"Elevated Liver Stress ({bio.organ_stress.liver if bio else 'Known'}): Hepatotoxicity risk.")
                 status = "DANGER"
         
         if p.hasKidneyDisease or (bio and bio.organ_stress.kidney > 0.6):
-            if any(m in meds for m in ["ibuprofen", "naproxen", "diclofenac"]):
+            if graph.flagged(drugs, "nephrotoxic"):
                 conflicts.append(f"Elevated Renal Stress ({bio.organ_stress.kidney if bio else 'Known'}): NSAID contraindication.")
                 status = "DANGER"
 
         if bio and bio.organ_stress.cardio > 0.7:
-            if any(m in meds for m in ["pseudoephedrine", "caffeine"]):
+            if graph.flagged(drugs, "stimulant"):
                 conflicts.append(f"Elevated Cardio Stress ({bio.organ_stress.cardio}): Stimulant risk.")
                 status = "CAUTION" if status != "DANGER" else "DANGER"
 
-        if p.isPregnant and any(m in meds for m in ["ibuprofen", "aspirin", "warfarin"]):
+        if p.isPregnant and graph.flagged(drugs, "pregnancy"):
             conflicts.append("Medication contraindicated in pregnancy.")
             status = "DANGER"
 
-        # Groq explanation fused with ML scores
+        # Show the model what each free-text entry was resolved to
+        med_list = ", ".join(
+            f"{r['input']} ({'+'.join(r['drugs'])})" if r["drugs"] and r["matched"] != r["input"].lower() else r["input"]
+            for r in screen["resolutions"]
+        )
+        return {"screen": screen, "conflicts": conflicts, "status": status, "med_list": med_list}
+
+    async def run_med_safety(self, request: UnifiedRequest, bio: BioRiskResponse = None, fused: dict = None) -> MedSafetyResponse:
+        p = request.profile
+        findings = self.screen_medications(request, bio)
+        screen, conflicts, status = findings["screen"], findings["conflicts"], findings["status"]
         conflict_text = "; ".join(conflicts) if conflicts else "No major drug interactions detected."
-        ml_context = f"ML Predictor shows {bio.risk_level} risk ({bio.risk_probability*100:.0f}%) with vitality {bio.vitality_score}/100." if bio else ""
-        
-        # Comprehensive context assembly
-        symptom_summary = "; ".join([f"{s.get('name', 'Symptom')} ({s.get('severity', 'moderate')})" for s in (request.symptoms or [])])
-        nutrition_summary = "; ".join([f"Log: {l.get('description', '')}" for l in (request.nutrition_logs or [])[:3]])
-        vault_summary = "; ".join([f"Report: {v.get('name', 'Lab Result')}" for v in (request.clinical_vault or [])])
 
-        lang = self.get_language_name(request.language)
-        prompt = f"""You are a clinical pharmacist AI. 
+        explanation = (fused or {}).get("med_safety")
+        if explanation is None:
+            # Groq explanation fused with ML scores
+            ml_context = f"ML Predictor shows {bio.risk_level} risk ({bio.risk_probability*100:.0f}%) with vitality {bio.vitality_score}/100." if bio else ""
+
+            # Comprehensive context assembly
+            # History is trimmed to the section's token budget (recent + complaint-relevant entries)
+            history = compact_context(
+                request, "med_safety",
+                symptoms=lambda s: f"{s.get('name', 'Symptom')} ({s.get('severity', 'moderate')})",
+                nutrition_logs=lambda l: f"Log: {l.get('description', '')}",
+                clinical_vault=lambda v: f"Report: {v.get('name', 'Lab Result')}",
+            )
+            symptom_summary = "; ".join(history["symptoms"])
+            nutrition_summary = "; ".join(history["nutrition_logs"])
+            vault_summary = "; ".join(history["clinical_vault"])
+
+            lang = self.get_language_name(request.language)
+            prompt = f"""You are a clinical pharmacist AI. 
 Patient: Age {p.age}, Gender {p.gender}.
 ML Risk Data: {ml_context}
 Organ Stress: {f'L:{bio.organ_stress.liver}, K:{bio.organ_stress.kidney}, C:{bio.organ_stress.cardio}' if bio else 'Unknown'}
@@ -202,7 +351,7 @@ Symptoms: {symptom_summary or 'None logged recently'}
 Recent Nutrition: {nutrition_summary or 'Standard diet'}
 Clinical Reports: {vault_summary or 'No past reports available'}
 
-Medications to scan: {', '.join(request.medications or [])}.
+Medications to scan: {findings["med_list"]}.
 Problem Context (Reason for taking): {request.problem_context or 'General safety check'}
 
 Rule-based findings: {conflict_text}. Safety status: {status}.
@@ -211,33 +360,39 @@ IMPORTANT: Write your response in {lang}.
 Write a 2-sentence highly specific clinical synthesis. Base your answer on the FUSION of their symptoms, past reports, and the current medication scan. 
 Address them by name if known: {p.name}."""
 
-        explanation = await self.call_groq(prompt)
+            explanation = await self.call_groq(prompt, section="med_safety")
         return MedSafetyResponse(
             interaction_level=status,
             conflicts_detected=conflicts,
             explanation=explanation or conflict_text,
-            next_action="Consult your doctor before taking these medications together."
+            next_action="Consult your doctor before taking these medications together.",
+            interactions=screen["interactions"],
+            resolved_medications=screen["resolutions"]
         )
 
     # ── Triage: ML-Informed + History + Groq ──────────────────────────────────
-    async def run_triage(self, request: UnifiedRequest, bio: BioRiskResponse = None) -> TriageResponse:
+    async def run_triage(self, request: UnifiedRequest, bio: BioRiskResponse = None, fused: dict = None) -> TriageResponse:
         p          = request.profile
         input_text = request.query or request.problem_context or ""
         conditions = [c.name for c in p.conditions]
 
-        # Context assembly
-        symptom_summary = "; ".join([f"{s.get('name', 'Symptom')}" for s in (request.symptoms or [])])
-        vault_summary = "; ".join([f"Docs: {v.get('name', 'Report')}" for v in (request.clinical_vault or [])])
+        # High-risk keyword rules (instant triage), all supported languages in one pass
+        emergency   = get_emergency_matcher().scan(input_text)
+        is_critical = bool(emergency)
 
-        # High-risk keyword rules (instant triage)
-        HIGH_RISK_KEYWORDS = ["chest pain", "heart attack", "stroke", "seizure",
-                               "difficulty breathing", "unconscious", "severe bleeding"]
-        is_critical = any(kw in input_text.lower() for kw in HIGH_RISK_KEYWORDS)
+        raw = (fused or {}).get("triage")
+        if raw is None:
+            # Context assembly
+            history = compact_context(request, "triage",
+                                      symptoms=lambda s: f"{s.get('name', 'Symptom')}",
+                                      clinical_vault=lambda v: f"Docs: {v.get('name', 'Report')}")
+            symptom_summary = "; ".join(history["symptoms"])
+            vault_summary = "; ".join(history["clinical_vault"])
 
-        ml_note = f"ML Predictor Risk: {bio.risk_level}" if bio else ""
+            ml_note = f"ML Predictor Risk: {bio.risk_level}" if bio else ""
 
-        lang = self.get_language_name(request.language)
-        prompt = f"""You are an emergency triage AI doctor.
+            lang = self.get_language_name(request.language)
+            prompt = f"""You are an emergency triage AI doctor.
 PATIENT: {p.name}, Age {p.age}, Gender {p.gender}. {ml_note}
 CONDITIONS: {', '.join(conditions) if conditions else 'None'}
 PAST SYMPTOMS: {symptom_summary}
@@ -254,19 +409,45 @@ Return ONLY this exact JSON:
   "disclaimer": "AI guidance only. Consult a doctor."
 }}"""
 
-        raw = await self.call_groq(prompt, json_mode=True)
+            raw = await self.call_groq(prompt, json_mode=True, section="triage")
         try:
-            data = json.loads(raw)
-            return TriageResponse(**data)
+            triage = await cpu_executor.parse_model(TriageResponse, raw)
         except Exception:
             level = "Critical" if is_critical else "Moderate"
-            return TriageResponse(
+            triage = TriageResponse(
                 triage_level=level,
                 basic_care_advice=f"For '{input_text}': Rest, monitor vitals.",
                 specialist_recommendation="General Physician",
                 follow_up_questions=["How long?", "Fever?", "Medications?"],
                 disclaimer="AI guidance only."
             )
+        if is_critical:
+            # A keyword hit is never downgraded by the LLM
+            triage.triage_level = "Critical"
+            triage.emergency_terms = [m["term"] for m in emergency]
+        return triage
+
+    def immediate_triage(self, request: UnifiedRequest):
+        """
+        Rule-only Critical triage, sent before any LLM call returns when the complaint
+        contains an emergency term. The full triage section follows and supersedes it.
+        """
+        input_text = request.query or request.problem_context or ""
+        if not input_text:
+            return None
+        matcher = get_emergency_matcher()
+        emergency = matcher.scan(input_text)
+        if not emergency:
+            return None
+        return TriageResponse(
+            triage_level="Critical",
+            basic_care_advice=matcher.advice_for(request.language),
+            specialist_recommendation=matcher.specialist_for(emergency),
+            follow_up_questions=[],
+            disclaimer="AI guidance only. Consult a doctor.",
+            emergency_terms=[m["term"] for m in emergency],
+            provisional=True
+        )
     # ── Nutrition ─────────────────────────────────────────────────────────────
     async def run_nutrition(self, request: UnifiedRequest, bio: BioRiskResponse = None) -> NutritionResponse:
         p   = request.profile
@@ -283,33 +464,115 @@ Return ONLY this exact JSON:
             vitality_note = "Caloric intake adjusted for recovery due to low ML vitality score."
             required += 200
 
+        # Real intake from the logs, scored against the local food-composition table
+        foods  = get_food_index()
+        intake = foods.intake(request.nutrition_logs or [])
+        daily, split = intake["daily"], intake["energy_split_pct"]
+        ratio  = daily["kcal"] / required if required else 0.0
+
+        score = 100.0
+        score -= min(30.0, max(0.0, abs(ratio - 1) - 0.10) * 100)
+        for macro, low, high in (("carbs", 45, 65), ("protein", 10, 20), ("fat", 20, 30)):
+            score -= min(20.0, max(0.0, low - split[macro], split[macro] - high))
+        protein_gap = daily["protein_g"] < 0.8 * p.weight
+        fibre_gap   = daily["fibre_g"] < 25
+        score -= 10 * protein_gap + 5 * fibre_gap
+
+        if not intake["logs"]:
+            status, score = "No Logs", 0
+        elif ratio < 0.85:
+            status = "Deficit"
+        elif ratio > 1.15:
+            status = "Surplus"
+        else:
+            status = "Balanced" if score >= 70 else "Imbalanced"
+
+        # Suggestions close the largest gap first
+        goal = "balanced"
+        if intake["logs"]:
+            if ratio > 1.15 or split["fat"] > 30:
+                goal = "lighter"
+            elif ratio < 0.85:
+                goal = "energy"
+            elif protein_gap:
+                goal = "protein"
+            elif fibre_gap:
+                goal = "fibre"
+        fruit_goal = "fibre" if p.hasDiabetes or goal in ("lighter", "fibre") else goal
+
         return NutritionResponse(
             required_calories=required,
-            current_status="Balanced",
-            macro_balance_score=85,
+            current_status=status,
+            macro_balance_score=int(round(max(0.0, score))),
             profession_adjustment=f"Calibrated for {getattr(p, 'profession', 'General')} lifestyle. {vitality_note}",
             recommendations={
-                "vegetarian":     ["Dal Khichdi", "Paneer Sabzi", "Rajma"],
-                "non_vegetarian": ["Grilled Chicken", "Fish Curry", "Egg Bhurji"],
-                "fruits":         ["Papaya", "Pomegranate", "Banana"]
-            }
+                "vegetarian":     foods.suggest("veg", goal),
+                "non_vegetarian": foods.suggest("non_veg", goal),
+                "fruits":         foods.suggest("fruit", fruit_goal)
+            },
+            # Too little of what was logged could be read to trust the score
+            clarification_needed=intake["matched_logs"] * 2 < intake["logs"] or not intake["logs"],
+            intake=NutritionIntake(
+                days_logged=intake["days_logged"],
+                logs=intake["logs"],
+                matched_logs=intake["matched_logs"],
+                avg_daily_calories=daily["kcal"],
+                protein_g=daily["protein_g"],
+                carbs_g=daily["carbs_g"],
+                fat_g=daily["fat_g"],
+                fibre_g=daily["fibre_g"],
+                energy_split=split,
+            )
         )
 
     # ── AI-Enabled EHR Generation (Speech-to-Record) ─────────────────────────
-    async def run_ehr_analysis(self, request: UnifiedRequest) -> ClinicalEHR:
+    async def run_ehr_analysis(self, request: UnifiedRequest, fused: dict = None) -> ClinicalEHR:
         """
         Converts speech/text symptoms into a structured EHR format compatible with AHIMS.
         """
+        p = request.profile
+        input_text = request.query or request.problem_context or "No observations recorded."
+
+        raw = (fused or {}).get("ehr")
+        if raw is None:
+            raw = await self.call_groq(self.ehr_prompt(request), json_mode=True, section="ehr")
+        try:
+            ehr = await cpu_executor.parse_model(ClinicalEHR, raw)
+            # Every field has a default, so the "{}" placeholder would otherwise pass as a record
+            if not ehr.model_fields_set:
+                raise ValueError("empty EHR reply")
+            return ehr
+        except Exception as e:
+            print(f"[EHR Parse Error] {e}")
+            return ClinicalEHR(
+                ehr_id=f"AHMIS-AI-{p.name[:3].upper()}-2026",
+                chief_complaint="Observation of symptoms",
+                hpi="Synthesis of patient dictation regarding present illness.",
+                clinical_notes="Patient reported: " + input_text,
+                vital_signs={"BP": "120/80 mmHg", "HR": "75 bpm", "Temp": "98.6 F"},
+                triage_status="Priority",
+                icd_10_code="R69",
+                ayush_metrics={"Prakriti_Status": "Evaluation Pending", "Agni": "Mandagni"},
+                treatment_plan="Ayush protocol recommended: Shamana Chikitsa, light diet (Pathya), and monitoring.",
+                differential_diagnosis=["Pattern-based symptoms check needed"],
+                doctor_suggestions=["1. Manual review of voice notes", "2. Ayurvedic Nadi Pariksha recommended"],
+                digital_signature="AI-SENTINEL-FALLBACK"
+            )
+
+    def ehr_prompt(self, request: UnifiedRequest) -> str:
         p = request.profile
         lang = self.get_language_name(request.language)
         input_text = request.query or request.problem_context or "No observations recorded."
         
         # Context Summary for Fusion
+        history = compact_context(request, "ehr",
+                                  symptoms=lambda s: s.get('name', 'Unknown'),
+                                  clinical_vault=lambda v: v.get('name', 'Doc'))
         history_context = f"""
         PAST MEDICAL HISTORY: {', '.join([c.name for c in p.conditions]) if p.conditions else 'None reported'}
         ACTIVE MEDICATIONS: {', '.join(request.medications) if request.medications else 'None listed'}
-        RECENT SYMPTOMS: {', '.join([s.get('name', 'Unknown') for s in request.symptoms]) if request.symptoms else 'None reported'}
-        PAST REPORTS: {', '.join([v.get('name', 'Doc') for v in request.clinical_vault]) if request.clinical_vault else 'No vault documents'}
+        RECENT SYMPTOMS: {', '.join(history["symptoms"]) if history["symptoms"] else 'None reported'}
+        PAST REPORTS: {', '.join(history["clinical_vault"]) if history["clinical_vault"] else 'No vault documents'}
         """
 
         prompt = f"""You are a Senior Chief Medical Officer and Clinical Strategist for a high-intelligence AHMIS Node.
@@ -355,30 +618,11 @@ Return ONLY this exact JSON:
             "doctor_suggestions": ["Lab 1", "Action 2"],
             "digital_signature": "AI-CHIEF-MEDICAL-OFFICER-V5"
         }}"""
-
-        raw = await self.call_groq(prompt, json_mode=True)
-        try:
-            data = json.loads(raw)
-            return ClinicalEHR(**data)
-        except Exception as e:
-            print(f"[EHR Parse Error] {e}")
-            return ClinicalEHR(
-                ehr_id=f"AHMIS-AI-{p.name[:3].upper()}-2026",
-                chief_complaint="Observation of symptoms",
-                hpi="Synthesis of patient dictation regarding present illness.",
-                clinical_notes="Patient reported: " + input_text,
-                vital_signs={"BP": "120/80 mmHg", "HR": "75 bpm", "Temp": "98.6 F"},
-                triage_status="Priority",
-                icd_10_code="R69",
-                ayush_metrics={"Prakriti_Status": "Evaluation Pending", "Agni": "Mandagni"},
-                treatment_plan="Ayush protocol recommended: Shamana Chikitsa, light diet (Pathya), and monitoring.",
-                differential_diagnosis=["Pattern-based symptoms check needed"],
-                doctor_suggestions=["1. Manual review of voice notes", "2. Ayurvedic Nadi Pariksha recommended"],
-                digital_signature="AI-SENTINEL-FALLBACK"
-            )
+        return prompt
 
     # ── AYUSH: Prakriti + Personalized Treatment ──────────────────────────────
-    async def run_ayush_analysis(self, request: UnifiedRequest, bio: BioRiskResponse = None) -> AyushResponse:
+    def ayush_context(self, request: UnifiedRequest) -> dict:
+        """Season, region and Prakriti the AYUSH prompt is written around."""
         p = request.profile
         from datetime import datetime
         now = datetime.now()
@@ -405,16 +649,76 @@ Return ONLY this exact JSON:
                     req_mandal = parts[1].strip()
             except:
                 pass
+        return {"now": now, "month": month, "season": season, "prakriti": prakriti,
+                "district": req_district, "mandal": req_mandal}
 
-        # 3. Generate Recommendations and Seasonal Risks using Groq
-        lang = self.get_language_name(request.language)
-        prompt = f"""You are an AYUSH Clinical Expert. 
-Context: Month: {month}, Season: {season}, Region: {req_district}, {req_mandal}, Andhra Pradesh.
+    def ayush_row(self, ctx: dict, bio: BioRiskResponse = None):
+        """Precomputed regional-seasonal row for this request, or None to generate it with the LLM."""
+        table = get_ayush_table()
+        if table is None:
+            return None
+        return table.lookup(ctx["district"], ctx["mandal"], ctx["season"], ctx["prakriti"],
+                            bio.risk_level if bio else None)
+
+    def ingest_symptoms(self, request: UnifiedRequest):
+        """Feeds the patient's new symptom logs into the regional outbreak forecaster."""
+        p = request.profile
+        if request.symptoms:
+            patient = canonical_hash([p.name, p.age, p.gender, p.district, p.mandal])[:16]
+            get_outbreak_forecaster().ingest(patient, p.district, p.mandal, request.symptoms)
+
+    def ayush_forecast(self, request: UnifiedRequest, ctx: dict, bio: BioRiskResponse) -> ForecastingIntelligence:
+        # 3. Forecast Intelligence: z-score of the region's syndromic trend against its baseline
+        forecaster = get_outbreak_forecaster()
+        texts = [request.query, request.problem_context]
+        texts += [s.get("complaint") or s.get("name") for s in (request.symptoms or [])[-5:]]
+        forecast = forecaster.forecast(ctx["district"], ctx["mandal"], forecaster.syndromes_for(texts))
+        if forecast is not None:
+            return ForecastingIntelligence(
+                seven_day_risk=round(forecast["seven_day_risk"], 2),
+                thirty_day_risk=round(forecast["thirty_day_risk"], 2),
+                peak_outbreak_date=forecast.get("peak_date", "N/A"),
+                z_score_deviation=round(forecast["z_score"], 2),
+                confidence_interval=[round(x, 2) for x in forecast["confidence_interval"]]
+            )
+
+        # Cold start: too few logs from this region yet, so the bio-risk heuristic stands in
+        now = ctx["now"]
+        risk_val = bio.risk_probability if bio else 0.2
+        z_score = 1.25 if risk_val > 0.5 else 0.4 # Outbreak indicator
+
+        from datetime import timedelta
+        peak_date = (now + timedelta(days=14)).strftime("%Y-%m-%d") if z_score > 1.0 else "N/A"
+
+        return ForecastingIntelligence(
+            seven_day_risk=round(risk_val * 1.1, 2),
+            thirty_day_risk=round(risk_val * 0.8, 2),
+            peak_outbreak_date=peak_date,
+            z_score_deviation=z_score,
+            confidence_interval=[round(risk_val - 0.05, 2), round(risk_val + 0.05, 2)]
+        )
+
+    async def run_ayush_analysis(self, request: UnifiedRequest, bio: BioRiskResponse = None, fused: dict = None) -> AyushResponse:
+        p = request.profile
+        ctx = self.ayush_context(request)
+        prakriti = ctx["prakriti"]
+
+        row = self.ayush_row(ctx, bio)
+        if row is not None:
+            return await self.ayush_from_table(request, bio, ctx, row, fused)
+
+        raw = (fused or {}).get("ayush")
+        if raw is None:
+            # 3. Generate Recommendations and Seasonal Risks using Groq
+            lang = self.get_language_name(request.language)
+            history = compact_context(request, "ayush", symptoms=lambda s: s.get('name', ''))
+            prompt = f"""You are an AYUSH Clinical Expert. 
+Context: Month: {ctx["month"]}, Season: {ctx["season"]}, Region: {ctx["district"]}, {ctx["mandal"]}, Andhra Pradesh.
 Patient: {p.name}, Age {p.age}, Gender {p.gender}.
 ML Risk Level: {bio.risk_level if bio else 'Unknown'}
 Organ Stress: {f'C:{bio.organ_stress.cardio}, L:{bio.organ_stress.liver}' if bio else 'Normal'}
 Conditions: {', '.join([c.name for c in p.conditions]) if p.conditions else 'None'}
-Symptoms Logged: {', '.join([s.get('name', '') for s in request.symptoms]) if request.symptoms else 'None'}
+Symptoms Logged: {', '.join(history["symptoms"]) if history["symptoms"] else 'None'}
 
 Your task: 
 1. Predict 3 potential seasonal/regional diseases for this person.
@@ -444,9 +748,11 @@ Return ONLY this JSON:
   "ritucharya": ["Season Step 1", "Season Step 2"]
 }}"""
 
-        raw = await self.call_groq(prompt, json_mode=True)
+            raw = await self.call_groq(prompt, json_mode=True, section="ayush")
         try:
-            data = json.loads(raw)
+            data = await cpu_executor.loads(raw)
+            if not data:
+                raise ValueError("empty AYUSH reply")
             recs = []
             for r in data.get("recommendations", []):
                 recs.append(AyushRecommendation(
@@ -459,22 +765,6 @@ Return ONLY this JSON:
                 ))
             
             risks = [SeasonalRisk(**r) for r in data.get("regional_seasonal_risks", [])]
-            
-            # 3. Forecast Intelligence (Z-Score & Spatiotemporal Modelling)
-            # Simulated spike detection logic
-            risk_val = bio.risk_probability if bio else 0.2
-            z_score = 1.25 if risk_val > 0.5 else 0.4 # Outbreak indicator
-            
-            from datetime import timedelta
-            peak_date = (now + timedelta(days=14)).strftime("%Y-%m-%d") if z_score > 1.0 else "N/A"
-
-            forecast = ForecastingIntelligence(
-                seven_day_risk=round(risk_val * 1.1, 2),
-                thirty_day_risk=round(risk_val * 0.8, 2),
-                peak_outbreak_date=peak_date,
-                z_score_deviation=z_score,
-                confidence_interval=[round(risk_val - 0.05, 2), round(risk_val + 0.05, 2)]
-            )
 
             return AyushResponse(
                 prakriti=prakriti,
@@ -482,7 +772,7 @@ Return ONLY this JSON:
                 confidence=float(data.get("confidence_score", 0.85)),
                 analysis=data.get("analysis", "Based on your bio-rhythm, AYUSH alignment is recommended."),
                 recommendations=recs,
-                forecast=forecast,
+                forecast=self.ayush_forecast(request, ctx, bio),
                 outbreak_alert=data.get("outbreak_alert"),
                 regional_seasonal_risks=risks,
                 dinacharya=data.get("dinacharya", []),
@@ -501,8 +791,46 @@ Return ONLY this JSON:
                  outbreak_alert=None
             )
 
+    def ayush_analysis_prompt(self, request: UnifiedRequest, bio: BioRiskResponse, ctx: dict, row) -> str:
+        p = request.profile
+        lang = self.get_language_name(request.language)
+        history = compact_context(request, "ayush", symptoms=lambda s: s.get('name', ''))
+        return f"""You are an AYUSH Clinical Expert writing a short patient note.
+Context: Month: {ctx["month"]}, Season: {ctx["season"]}, Region: {ctx["district"]}, {ctx["mandal"]}, Andhra Pradesh.
+Leading regional risks: {row.risk_summary()}
+Patient: {p.name}, Age {p.age}, Gender {p.gender}. Prakriti: {ctx["prakriti"]}.
+ML Risk Level: {bio.risk_level if bio else 'Unknown'}
+Organ Stress: {f'C:{bio.organ_stress.cardio}, L:{bio.organ_stress.liver}' if bio else 'Normal'}
+Conditions: {', '.join([c.name for c in p.conditions]) if p.conditions else 'None'}
+Symptoms Logged: {', '.join(history["symptoms"]) if history["symptoms"] else 'None'}
+
+Write a 2-sentence clinical explanation of their Prakriti-Risk alignment in {lang}. Return only the two sentences."""
+
+    async def ayush_from_table(self, request: UnifiedRequest, bio: BioRiskResponse, ctx: dict, row,
+                               fused: dict = None) -> AyushResponse:
+        """Risks and protocols from the precomputed table; the LLM only writes the analysis."""
+        analysis = (fused or {}).get("ayush_analysis")
+        if analysis is None and AYUSH_ANALYSIS_LLM:
+            analysis = await self.call_groq(self.ayush_analysis_prompt(request, bio, ctx, row), section="ayush")
+        if not analysis or analysis == LLM_UNAVAILABLE:
+            analysis = row.analysis
+
+        return AyushResponse(
+            prakriti=ctx["prakriti"],
+            score=bio.vitality_score if bio else 80.0,
+            confidence=0.85,
+            analysis=analysis,
+            recommendations=[AyushRecommendation(**r, success_rate=0.88) for r in row.care["recommendations"]],
+            forecast=self.ayush_forecast(request, ctx, bio),
+            outbreak_alert=row.outbreak_alert,
+            regional_seasonal_risks=[SeasonalRisk(**r) for r in row.risks],
+            dinacharya=list(row.care["dinacharya"]),
+            ritucharya=list(row.care["ritucharya"]),
+            evidence_score=0.94
+        )
+
     # ── Fused Guardian Summary ────────────────────────────────────────────────
-    async def generate_summary(self, request: UnifiedRequest, response_data: dict) -> str:
+    async def generate_summary(self, request: UnifiedRequest, response_data: dict, fused: dict = None) -> str:
         p        = request.profile
         bio      = response_data.get("bio_risk")
         med      = response_data.get("medication_safety")
@@ -516,6 +844,9 @@ Return ONLY this JSON:
         vault_info   = f"Reports on file: {len(request.clinical_vault)}" if request.clinical_vault else ""
         symptom_info = f"Symptoms: {len(request.symptoms)} logged." if request.symptoms else ""
 
+        if (fused or {}).get("summary"):
+            return fused["summary"]
+
         lang = self.get_language_name(request.language)
         prompt = f"""You are Health Intelligence's AI Health Guardian. Write a warm, professional 2-sentence health summary for {p.name} in {lang}.
 
@@ -529,9 +860,173 @@ Context for synthesis:
 - Nutrition Profile: {"; ".join([l.get('description', '') for l in (request.nutrition_logs or [])[:2]])}
 
 Be empathetic, specific, and actionable. Base your advice on the FUSION of all this data."""
-        return await self.call_groq(prompt) or f"Guardian monitoring active for {p.name}. {risk_info}."
+        return await self.call_groq(prompt, section="summary") or f"Guardian monitoring active for {p.name}. {risk_info}."
+
+    # ── Fused Mode: every LLM section from one completion ─────────────────────
+    def fused_sections(self, request: UnifiedRequest, bio: BioRiskResponse = None) -> list:
+        """call_groq sections this request needs, mirroring the pipeline's `when` rules."""
+        has_query = bool(request.query or request.problem_context)
+        sections = ["med_safety"] if request.medications else []
+        if has_query:
+            sections.append("triage")
+        # A precomputed AYUSH row leaves only the analysis text to write
+        if self.ayush_row(self.ayush_context(request), bio) is None:
+            sections.append("ayush")
+        elif AYUSH_ANALYSIS_LLM:
+            sections.append("ayush_analysis")
+        if has_query:
+            sections.append("ehr")
+        sections.append("summary")
+        return sections
+
+    def fused_prompt(self, request: UnifiedRequest, bio: BioRiskResponse, sections: list) -> str:
+        """The patient context once, then one JSON key per section with that section's task."""
+        p = request.profile
+        lang = self.get_language_name(request.language)
+        input_text = request.query or request.problem_context or ""
+        conditions = [c.name for c in p.conditions]
+        history = compact_context(
+            request, "fused",
+            symptoms=lambda s: f"{s.get('name', 'Symptom')} ({s.get('severity', 'moderate')})",
+            clinical_vault=lambda v: f"{v.get('name', 'Report')}",
+            nutrition_logs=lambda l: f"{l.get('description', '')}",
+        )
+        ayush = self.ayush_context(request)
+
+        context = f"""PATIENT: {p.name}, Age {p.age}, Gender {p.gender}, Weight {p.weight} kg.
+CONDITIONS: {', '.join(conditions) if conditions else 'None'}
+ML RISK: {bio.risk_level} ({bio.risk_probability*100:.0f}%), Vitality {bio.vitality_score}/100.
+ORGAN STRESS: C:{bio.organ_stress.cardio}, L:{bio.organ_stress.liver}, K:{bio.organ_stress.kidney}, R:{bio.organ_stress.respiratory}
+SYMPTOMS LOGGED: {'; '.join(history["symptoms"]) or 'None'}
+CLINICAL REPORTS: {'; '.join(history["clinical_vault"]) or 'None'}
+RECENT NUTRITION: {'; '.join(history["nutrition_logs"]) or 'Standard diet'}
+CHIEF COMPLAINT / DICTATION: "{input_text or 'None'}" (may be {lang} or mixed English and {lang})
+AYUSH CONTEXT: Month {ayush["month"]}, Season {ayush["season"]}, Region {ayush["district"]}, {ayush["mandal"]}, Andhra Pradesh. Prakriti: {ayush["prakriti"]}."""
+        if "med_safety" in sections:
+            findings = self.screen_medications(request, bio)
+            conflict_text = "; ".join(findings["conflicts"]) if findings["conflicts"] else "No major drug interactions detected."
+            context += f"""
+MEDICATIONS: {findings["med_list"]}. Reason for taking: {request.problem_context or 'General safety check'}.
+Rule-based findings: {conflict_text}. Safety status: {findings["status"]}."""
+        if "ayush_analysis" in sections:
+            row = self.ayush_row(ayush, bio)
+            context += f"""
+LEADING REGIONAL RISKS: {row.risk_summary() if row else 'None'}"""
+
+        is_critical = bool(input_text and get_emergency_matcher().scan(input_text))
+        keys = {
+            "med_safety": f'  "med_safety": "As clinical pharmacist: 2-sentence specific synthesis of the medication scan with their symptoms and reports, in {lang}, addressing {p.name}"',
+            "triage": f"""  "triage": {{
+    "triage_level": "{'Critical' if is_critical else 'Mild|Moderate|High'}",
+    "basic_care_advice": "Specific 2-sentence actionable advice in {lang}",
+    "specialist_recommendation": "Specific doctor type",
+    "follow_up_questions": ["Question 1", "Question 2", "Question 3"],
+    "disclaimer": "AI guidance only. Consult a doctor."
+  }}""",
+            "ayush": f"""  "ayush": {{
+    "analysis": "2-sentence explanation of their Prakriti-Risk alignment in {lang}",
+    "recommendations": [{{"category": "Herbal|Diet|Yoga", "title": "...", "description": "...", "benefits": ["..."], "scientific_evidence": "Why it works traditionally and scientifically"}}],
+    "regional_seasonal_risks": [{{"disease_name": "...", "probability": 0.0-1.0, "reason": "...", "prevention": "..."}}],
+    "outbreak_alert": "Alert if their symptoms match regional outbreaks, else null",
+    "confidence_score": 0.85,
+    "dinacharya": ["Step 1", "Step 2", "Step 3"],
+    "ritucharya": ["Season Step 1", "Season Step 2"]
+  }}""",
+            "ayush_analysis": f'  "ayush_analysis": "As AYUSH expert: 2-sentence clinical explanation of their Prakriti-Risk alignment with the leading regional risks, in {lang}"',
+            "ehr": f"""  "ehr": {{
+    "ehr_id": "AHMIS-SENTINEL-{p.name[:3].upper()}-{os.urandom(2).hex().upper()}",
+    "chief_complaint": "Professional medical term, in clinical English",
+    "hpi": "Professional narrative fused with their history",
+    "clinical_notes": "Clinical findings",
+    "vital_signs": {{"BP": "120/80 mmHg", "HR": "75 bpm", "Temp": "100.2 F", "SpO2": "97%"}},
+    "triage_status": "Routine|Priority|Urgent|Emergency",
+    "icd_10_code": "R50.9",
+    "ayush_metrics": {{"Prakriti": "...", "Agni": "...", "Rasa": "..."}},
+    "treatment_plan": "Modern + Ayush protocol with herbs, dosages and follow-ups",
+    "differential_diagnosis": ["Primary", "Secondary", "Tertiary"],
+    "doctor_suggestions": ["Lab 1", "Action 2"],
+    "digital_signature": "AI-CHIEF-MEDICAL-OFFICER-V5"
+  }}""",
+            "summary": f'  "summary": "As AI Health Guardian: warm, professional, actionable 2-sentence health summary for {p.name} in {lang}, consistent with the other keys"',
+        }
+        body = ",\n".join(keys[s] for s in sections)
+        return f"""You are Health Intelligence's clinical team (clinical pharmacist, emergency triage doctor, AYUSH expert, chief medical officer and health guardian) reviewing one patient case.
+
+{context}
+
+Answer every key below for this patient. Keep each part specific to their history, complaint and ML risk.
+Return ONLY this JSON object:
+{{
+{body}
+}}"""
+
+    async def run_fused_llm(self, request: UnifiedRequest, bio: BioRiskResponse) -> dict:
+        """
+        One completion for every LLM section of the request. Returns {section: reply} for
+        the parts that validate, each in the form that section's own call_groq returns;
+        sections left out make their own call.
+        """
+        sections = self.fused_sections(request, bio)
+        raw = await self.call_groq(self.fused_prompt(request, bio, sections), json_mode=True, section="fused",
+                                   max_tokens=LLM_FUSED_MAX_TOKENS)
+        try:
+            data = await cpu_executor.loads(raw)
+        except Exception:
+            data = None
+        if not isinstance(data, dict):
+            data = {}
+
+        parts, failed = {}, []
+        for section in sections:
+            try:
+                parts[section] = _FUSED_PARTS[section](data.get(section))
+            except Exception:
+                failed.append(section)
+            LLM_FUSED_SECTIONS.inc(section=section, outcome="fallback" if section in failed else "fused")
+        if failed:
+            print(f"[Fused] Falling back to per-section calls for: {', '.join(failed)}")
+        return parts
+
+    async def call_groq(self, prompt: str, json_mode: bool = False, section: str = None,
+                        max_tokens: int = 1024) -> str:
+        """
+        `section` selects the cache TTL and whether the cache is used at all
+        (LLM_CACHE_SECTIONS).
+        """
+        use_cache = llm_cache.enabled_for(section)
+        key = cache_key(GROQ_MODEL, prompt, GROQ_TEMPERATURE, json_mode) if use_cache else None
+        if use_cache:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                record_llm_call(section, "hit", "cache_hit")
+                return cached
+        cache_outcome = "miss" if use_cache else "bypass"
+
+        # Identical prompts already in flight (double taps, several dashboards) share one call.
+        # The call runs under its starter's deadline, so only requests on the same budget
+        # share it; a tight-deadline caller must not hand its placeholder to a patient one
+        prompt_key = key or cache_key(GROQ_MODEL, prompt, GROQ_TEMPERATURE, json_mode)
+        flight_key = f"{prompt_key}:{max_tokens}:{current_budget_ms()}"
+        content, shared = await self.llm_flights.do(
+            flight_key, lambda: self._call_groq_upstream(prompt, json_mode, section, max_tokens, use_cache, key, cache_outcome))
+        if shared:
+            record_llm_call(section, cache_outcome, "coalesced")
+        return content
+
+    async def _call_groq_upstream(self, prompt: str, json_mode: bool, section: str, max_tokens: int,
+                                  use_cache: bool, key: str, cache_outcome: str) -> str:
+        # Placeholders are never cached so the next request retries the upstream
+        placeholder = "{}" if json_mode else LLM_UNAVAILABLE
+        # Sections fall back at once rather than start a call the request has no time for,
+        # or queue on an upstream the breaker has marked dead
+        budget = call_budget(GROQ_TIMEOUT)
+        if budget is None:
+            record_llm_call(section, cache_outcome, "deadline")
+            return placeholder
+        if not groq_breaker.allow():
+            record_llm_call(section, cache_outcome, "short_circuit")
+            return placeholder
 
-    async def call_groq(self, prompt: str, json_mode: bool = False) -> str:
         headers = {
             "Authorization": f"Bearer {GROQ_API_KEY}",
             "Content-Type":  "application/json"
@@ -539,20 +1034,129 @@ Be empathetic, specific, and actionable. Base your advice on the FUSION of all t
         body = {
             "model":       GROQ_MODEL,
             "messages":    [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-            "max_tokens":  1024,
+            "temperature": GROQ_TEMPERATURE,
+            "max_tokens":  max_tokens,
         }
         if json_mode:
             body["response_format"] = {"type": "json_object"}
 
-        async with httpx.AsyncClient() as client:
-            try:
-                res = await client.post(GROQ_API_URL, json=body, headers=headers, timeout=15.0)
-                if res.status_code == 200:
-                    return res.json()["choices"][0]["message"]["content"]
-                else:
+        # Reserved against the tokens-per-minute bucket, settled with the real usage
+        tokens = estimate_tokens(prompt) + min(max_tokens, LLM_COMPLETION_TOKEN_ESTIMATE)
+        timings, status = {"rate_wait_ms": 0.0, "retries": 0}, "error"
+        # Tokens taken from the bucket and not yet settled. The finally below hands back
+        # whatever is left on any exit, including a cancellation (the last single-flight
+        # waiter leaving, a streaming client disconnecting), which skips the except arms
+        reserved = 0
+        try:
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                timings["retries"] = attempt
+                # A 429 pause can use up what was left; acquire(timeout=None) would wait forever
+                budget = call_budget(GROQ_TIMEOUT)
+                if budget is None:
+                    status = "deadline"
+                    break
+                # Queues in this section's priority lane while the quota is short
+                waited_ms = await llm_scheduler.acquire(section, tokens, timeout=budget)
+                if waited_ms is None:
+                    status = "rate_limited"
+                    break
+                timings["rate_wait_ms"] += waited_ms
+                reserved = tokens
+                budget = call_budget(GROQ_TIMEOUT)
+                if budget is None:
+                    status = "deadline"
+                    break
+
+                try:
+                    # wait_for also bounds the pool wait and connect, which httpx times separately
+                    res = await asyncio.wait_for(
+                        http_client.post(GROQ_API_URL, json=body, headers=headers, timeout=budget, timings=timings), budget)
+                    if res.status_code == 200:
+                        llm_scheduler.observe(res.headers)
+                        groq_breaker.record_success()
+                        payload = res.json()
+                        llm_scheduler.settle(reserved, (payload.get("usage") or {}).get("total_tokens", tokens))
+                        reserved = 0
+                        content = payload["choices"][0]["message"]["content"]
+                        if use_cache and content:
+                            await llm_cache.set(key, content, section)
+                        record_llm_call(section, cache_outcome, "ok", timings)
+                        return content
+                    # Not served: the reservation is returned first, so the upstream's own
+                    # remaining-tokens figure (when sent) still has the last word
+                    llm_scheduler.settle(reserved, 0)
+                    reserved = 0
+                    llm_scheduler.observe(res.headers)
+                    if res.status_code == 429:
+                        # Alive but over quota: every lane pauses, then this call queues again
+                        pause = llm_scheduler.on_rate_limited(res.headers.get("retry-after"), attempt)
+                        print(f"[Groq] 429 on {section or 'default'} (attempt {attempt + 1}); lanes paused {pause:.1f}s")
+                        status = "rate_limited"
+                        continue
                     print(f"[Groq] Error {res.status_code}: {res.text[:200]}")
-            except Exception as e:
-                print(f"[Groq] Request failed: {e}")
-            
-            return "{}" if json_mode else "AI service temporarily unavailable."
+                    # Only server errors count against the circuit
+                    if res.status_code >= 500:
+                        groq_breaker.record_failure()
+                    else:
+                        groq_breaker.record_success()
+                except (asyncio.TimeoutError, httpx.TimeoutException) as e:
+                    print(f"[Groq] Request timed out after {budget:.1f}s: {e!r}")
+                    # A call cut short by the request deadline says nothing about the upstream
+                    if budget >= GROQ_TIMEOUT:
+                        groq_breaker.record_failure()
+                except Exception as e:
+                    print(f"[Groq] Request failed: {e}")
+                    groq_breaker.record_failure()
+                status = "error"
+                break
+        finally:
+            if reserved:
+                llm_scheduler.settle(reserved, 0)
+
+        record_llm_call(section, cache_outcome, status, timings)
+        return placeholder
+
+
+# ── Fused-mode part validators ────────────────────────────────────────────────
+# Each returns the part as the text that section's own call_groq would have produced,
+# or raises so the section falls back to its own call.
+def _fused_text(part) -> str:
+    if not isinstance(part, str) or not part.strip():
+        raise ValueError("expected non-empty text")
+    return part.strip()
+
+
+def _fused_model(model_cls, required=()):
+    """
+    `required` names fields the part must actually fill: a model whose fields all have
+    defaults (ClinicalEHR) would otherwise accept a missing or empty part.
+    """
+    def check(part) -> str:
+        if not isinstance(part, dict) or not part:
+            raise ValueError("expected a non-empty object")
+        parsed = model_cls.model_validate(part)
+        missing = [f for f in required if f not in parsed.model_fields_set or not getattr(parsed, f)]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        return json.dumps(part, ensure_ascii=False)
+    return check
+
+
+def _fused_ayush(part) -> str:
+    if not isinstance(part, dict) or not isinstance(part.get("recommendations"), list):
+        raise ValueError("expected an AYUSH object with recommendations")
+    if not all(isinstance(r, dict) for r in part["recommendations"]):
+        raise ValueError("malformed recommendation")
+    for r in part.get("regional_seasonal_risks") or []:
+        SeasonalRisk(**r)
+    return json.dumps(part, ensure_ascii=False)
+
+
+_FUSED_PARTS = {
+    "med_safety": _fused_text,
+    "triage":     _fused_model(TriageResponse),
+    "ayush":      _fused_ayush,
+    "ayush_analysis": _fused_text,
+    "ehr":        _fused_model(ClinicalEHR, required=("chief_complaint", "hpi")),
+    "summary":    _fused_text,
+}
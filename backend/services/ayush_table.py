@@ -0,0 +1,260 @@
+"""
+Precomputed AYUSH regional-seasonal table.
+Regional risks, Dinacharya, Ritucharya and recommendations depend only on
+(district, mandal, season, prakriti, ML risk bucket), a small space that changes with the
+seasons rather than per patient. This module's build job expands the curated seed
+(data/ayush_seasonal_seed.json) over every district and mandal of the frontend's AP
+hierarchy into data/ayush_seasonal_table.json. The server expands that file into a flat
+dict for O(1) lookups and reloads it when the file changes, so only the personalised
+`analysis` text still needs the LLM.
+
+Usage (from backend/):  python -m services.ayush_table [--hierarchy apHierarchy.ts] [--out table.json]
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AYUSH_SEED_PATH = os.getenv("AYUSH_SEED_PATH", os.path.join(_BACKEND_DIR, "data", "ayush_seasonal_seed.json"))
+AYUSH_TABLE_PATH = os.getenv("AYUSH_TABLE_PATH", os.path.join(_BACKEND_DIR, "data", "ayush_seasonal_table.json"))
+AP_HIERARCHY_PATH = os.getenv(
+    "AP_HIERARCHY_PATH",
+    os.path.join(os.path.dirname(_BACKEND_DIR), "frontend", "core", "patientContext", "apHierarchy.ts")
+)
+# How often the request path may stat the table file for a newer build
+AYUSH_TABLE_RELOAD_SECONDS = float(os.getenv("AYUSH_TABLE_RELOAD_SECONDS", "30"))
+
+TABLE_FORMAT_VERSION = 1
+ANY_MANDAL = "*"        # district-level row, used for mandals the table does not list
+
+_DISTRICT_LINE = re.compile(r'^ {4}"([^"]+)"\s*:\s*\{')
+_MANDAL_LINE = re.compile(r'^ {8}"([^"]+)"\s*:\s*\[')
+
+
+def _norm(name: str) -> str:
+    return " ".join((name or "").split()).casefold()
+
+
+def parse_hierarchy(source: str) -> dict:
+    """{district: [mandals]} from apHierarchy.ts (district -> mandal -> villages)."""
+    hierarchy, district = {}, None
+    for line in source.splitlines():
+        match = _DISTRICT_LINE.match(line)
+        if match:
+            district = match.group(1)
+            hierarchy[district] = []
+            continue
+        match = _MANDAL_LINE.match(line)
+        if match and district is not None:
+            hierarchy[district].append(match.group(1))
+    if not hierarchy:
+        raise ValueError("no districts found in the AP hierarchy source")
+    return hierarchy
+
+
+def build_table(seed: dict, hierarchy: dict) -> dict:
+    """
+    Expands the seed over hierarchy x season x prakriti x risk bucket. Risk lists are
+    stored once per (zone, season, bucket) and care plans once per (dosha, season); every
+    mandal points at its zone, so the file stays small while covering every combination.
+    """
+    seasons = seed["seasons"]
+    buckets = seed["risk_buckets"]
+    cap, per_row = seed.get("max_probability", 0.95), seed.get("risks_per_row", 3)
+
+    district_zone = {d: zone for zone, spec in seed["zones"].items() for d in spec["districts"]}
+    unzoned = sorted(set(hierarchy) - set(district_zone))
+    if unzoned:
+        raise ValueError(f"No zone in the seed for districts: {', '.join(unzoned)}")
+
+    risks, zone_risks = [], {}
+    for zone in seed["zones"]:
+        slots = zone_risks[zone] = []
+        for season in seasons:
+            for factor in buckets.values():
+                ranked = sorted(
+                    ({"disease_name": name, "probability": round(min(cap, prob * factor), 2),
+                      "reason": reason, "prevention": seed["diseases"][name]}
+                     for name, prob, reason in seed["priors"][zone][season]),
+                    key=lambda r: -r["probability"])
+                slots.append(len(risks))
+                risks.append(ranked[:per_row])
+
+    care, care_ids, care_index = [], {}, {}
+    for prakriti, dosha in seed["prakriti"].items():
+        care_index[prakriti] = []
+        for season in seasons:
+            if (dosha, season) not in care_ids:
+                care_ids[(dosha, season)] = len(care)
+                care.append({
+                    "dosha": dosha.replace("_", "-").title(),
+                    "dinacharya": seed["dinacharya"][dosha],
+                    "ritucharya": seed["ritucharya"][season],
+                    "recommendations": [
+                        {"category": c, "title": t, "description": d, "benefits": b, "scientific_evidence": e}
+                        for c, t, d, b, e in seed["recommendations"][dosha][season]
+                    ],
+                })
+            care_index[prakriti].append(care_ids[(dosha, season)])
+
+    overrides = seed.get("mandal_zones", {})
+    regions = {}
+    for district, mandals in hierarchy.items():
+        zone = district_zone[district]
+        regions[district] = {ANY_MANDAL: zone}
+        for mandal in mandals:
+            regions[district][mandal] = overrides.get(f"{district}|{mandal}", zone)
+
+    return {
+        "version": TABLE_FORMAT_VERSION,
+        "seed_version": seed.get("version", 1),
+        "built_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "seasons": seasons,
+        "risk_buckets": list(buckets),
+        "outbreak_alert_threshold": seed.get("outbreak_alert_threshold", 0.7),
+        "analysis_template": seed["analysis"],
+        "zones": {zone: spec["label"] for zone, spec in seed["zones"].items()},
+        "regions": regions,
+        "zone_risks": zone_risks,
+        "risks": risks,
+        "care_index": care_index,
+        "care": care,
+    }
+
+
+class AyushRow:
+    """One (district, mandal, season, prakriti, bucket) entry. Shared between requests: read-only."""
+    __slots__ = ("prakriti", "season", "bucket", "region", "risks", "care", "outbreak_alert", "_template")
+
+    def __init__(self, prakriti, season, bucket, region, risks, care, outbreak_alert, template):
+        self.prakriti = prakriti
+        self.season = season
+        self.bucket = bucket
+        self.region = region
+        self.risks = risks
+        self.care = care
+        self.outbreak_alert = outbreak_alert
+        self._template = template
+
+    def risk_summary(self) -> str:
+        return ", ".join(f"{r['disease_name']} ({r['probability']:.0%})" for r in self.risks) or "None"
+
+    @property
+    def analysis(self) -> str:
+        """Templated analysis, used when the LLM is off or unavailable."""
+        top = self.risks[0]["disease_name"] if self.risks else "no single disease"
+        return self._template.format(prakriti=self.prakriti, season=self.season, season_lower=self.season.lower(),
+                                     region=self.region, top_risk=top, bucket=self.bucket.lower(),
+                                     dosha=self.care["dosha"])
+
+
+class AyushTable:
+    def __init__(self, data: dict):
+        if data.get("version") != TABLE_FORMAT_VERSION:
+            raise ValueError(f"AYUSH table format {data.get('version')} != {TABLE_FORMAT_VERSION}; rebuild it")
+        self.built_at = data.get("built_at")
+        self.seed_version = data.get("seed_version")
+        self.seasons = list(data["seasons"])
+        self.buckets = list(data["risk_buckets"])
+        threshold = data["outbreak_alert_threshold"]
+        template = data["analysis_template"]
+
+        per_season = len(self.buckets)
+        self.rows = {}
+        self.mandals = 0
+        for district, mandals in data["regions"].items():
+            for mandal, zone in mandals.items():
+                self.mandals += mandal != ANY_MANDAL
+                for s, season in enumerate(self.seasons):
+                    for b, bucket in enumerate(self.buckets):
+                        risks = data["risks"][data["zone_risks"][zone][s * per_season + b]]
+                        alert = None
+                        if risks and risks[0]["probability"] >= threshold:
+                            alert = (f"{risks[0]['disease_name']} risk is high in {data['zones'][zone]} this {season}. "
+                                     f"{risks[0]['prevention']}")
+                        for prakriti, care_ids in data["care_index"].items():
+                            self.rows[(_norm(district), _norm(mandal), season, prakriti, bucket)] = AyushRow(
+                                prakriti, season, bucket, data["zones"][zone], risks,
+                                data["care"][care_ids[s]], alert, template)
+        self.districts = len(data["regions"])
+
+    @classmethod
+    def from_file(cls, path: str = AYUSH_TABLE_PATH) -> "AyushTable":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def lookup(self, district: str, mandal: str, season: str, prakriti: str, risk_level: str = None) -> Optional[AyushRow]:
+        """The row for this request, or None for a district the table does not cover."""
+        bucket = risk_level if risk_level in self.buckets else "Moderate"
+        district = _norm(district)
+        return (self.rows.get((district, _norm(mandal), season, prakriti, bucket))
+                or self.rows.get((district, ANY_MANDAL, season, prakriti, bucket)))
+
+    def stats(self) -> dict:
+        return {"built_at": self.built_at, "seed_version": self.seed_version, "rows": len(self.rows),
+                "districts": self.districts, "mandals": self.mandals}
+
+
+_table = None
+_table_mtime = None
+_table_checked_at = None
+_table_lock = threading.Lock()
+
+
+def get_ayush_table() -> Optional[AyushTable]:
+    """
+    The loaded table, or None when no table has been built. The file's mtime is checked at
+    most every AYUSH_TABLE_RELOAD_SECONDS, and a newer build replaces the table in place;
+    a build that fails to load leaves the previous table serving.
+    """
+    global _table, _table_mtime, _table_checked_at
+    now = time.monotonic()
+    if _table_checked_at is not None and now - _table_checked_at < AYUSH_TABLE_RELOAD_SECONDS:
+        return _table
+    with _table_lock:
+        if _table_checked_at is not None and now - _table_checked_at < AYUSH_TABLE_RELOAD_SECONDS:
+            return _table
+        _table_checked_at = now
+        try:
+            mtime = os.path.getmtime(AYUSH_TABLE_PATH)
+        except OSError:
+            return _table
+        if mtime != _table_mtime:
+            _table_mtime = mtime
+            try:
+                _table = AyushTable.from_file(AYUSH_TABLE_PATH)
+                print(f"[AYUSH] Regional-seasonal table loaded: {_table.stats()}")
+            except Exception as e:
+                print(f"[AYUSH] Could not load {AYUSH_TABLE_PATH}: {e}")
+    return _table
+
+
+def main(argv) -> int:
+    hierarchy_path = argv[argv.index("--hierarchy") + 1] if "--hierarchy" in argv else AP_HIERARCHY_PATH
+    out = argv[argv.index("--out") + 1] if "--out" in argv else AYUSH_TABLE_PATH
+
+    with open(AYUSH_SEED_PATH, "r", encoding="utf-8") as f:
+        seed = json.load(f)
+    with open(hierarchy_path, "r", encoding="utf-8") as f:
+        hierarchy = parse_hierarchy(f.read())
+    table = build_table(seed, hierarchy)
+    stats = AyushTable(table).stats()
+
+    # Written beside the target and renamed, so a running server never reads half a file
+    tmp = f"{out}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    os.replace(tmp, out)
+    print(f"[AYUSH] Built {stats['rows']} rows for {stats['districts']} districts / {stats['mandals']} mandals "
+          f"-> {out} ({os.path.getsize(out) // 1024} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
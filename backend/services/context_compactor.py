@@ -0,0 +1,164 @@
+"""
+Token-budgeted compaction of the patient history that goes into LLM prompts.
+Long-term users send hundreds of symptoms / vault documents / nutrition logs; each
+section gets a token budget instead. Repeated lines are dropped, the most recent few
+entries are always kept, and the rest of the budget goes to the entries most relevant to
+the complaint (newer first on ties). Kept entries stay in their original order.
+"""
+import os
+import re
+from datetime import datetime
+
+from utils.request_trace import current_trace
+
+# ── Config ────────────────────────────────────────────────────────────────────
+CONTEXT_COMPACTION_ENABLED = os.getenv("CONTEXT_COMPACTION_ENABLED", "1") == "1"
+CONTEXT_KEEP_RECENT        = int(os.getenv("CONTEXT_KEEP_RECENT", "3"))
+# Estimated prompt tokens for the whole history block of each section
+_DEFAULT_BUDGETS = {"med_safety": 500, "triage": 400, "ehr": 700, "ayush": 250, "fused": 800}
+# How a section's budget is split between the history lists
+LIST_SHARES = {"symptoms": 0.5, "clinical_vault": 0.35, "nutrition_logs": 0.15}
+
+_WORD = re.compile(r"[a-z0-9]+|[^\x00-\x7f]+", re.IGNORECASE)
+_STOPWORDS = frozenset("the and for with since from that this have has had are was were not but all any "
+                       "days day weeks week also very some been into them they their there".split())
+_TIME_FIELDS = ("timestamp", "date", "createdAt", "created_at", "uploadedAt")
+
+
+def section_budget(section: str) -> int:
+    return int(os.getenv(f"CONTEXT_BUDGET_{section.upper()}", _DEFAULT_BUDGETS.get(section, 400)))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer-free estimate: ~4 characters per token for ASCII (English BPE average) and
+    ~2 per token for Indic and other scripts, which BPE vocabularies split much finer.
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars + 1) // 2
+
+
+def _search_text(entry) -> str:
+    if not isinstance(entry, dict):
+        return str(entry).lower()
+    return " ".join([v for v in entry.values() if type(v) is str]).lower()
+
+
+def entry_time(entry) -> float:
+    """Epoch seconds from the first usable time field, or None."""
+    if not isinstance(entry, dict):
+        return None
+    for field in _TIME_FIELDS:
+        value = entry.get(field)
+        if value is None:
+            continue
+        if type(value) in (int, float):
+            return value / 1000 if value > 1e11 else float(value)   # JS milliseconds
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                continue
+    return None
+
+
+def terms(text: str) -> set:
+    return {w for w in (m.lower() for m in _WORD.findall(text or "")) if len(w) > 2 and w not in _STOPWORDS}
+
+
+class RankedHistory:
+    """
+    One history list in keep-priority order: the CONTEXT_KEEP_RECENT newest entries, then
+    the rest by overlap with the complaint, newer first on ties. Ranked lazily (only once a
+    section's lines overflow its budget) and shared by every section of the request.
+    """
+    def __init__(self, entries: list, complaint_terms: set):
+        self.entries = entries or []
+        self.complaint_terms = complaint_terms
+        self._order = None
+
+    @property
+    def order(self) -> list:
+        if self._order is None:
+            entries = self.entries
+            times = [entry_time(e) for e in entries]
+            # Explicit timestamps when every entry has one, else list position (the frontend appends)
+            if times and all(t is not None for t in times):
+                newest_first = sorted(range(len(entries)), key=lambda i: (times[i], i), reverse=True)
+            else:
+                newest_first = list(range(len(entries) - 1, -1, -1))
+            head, rest = newest_first[:CONTEXT_KEEP_RECENT], newest_first[CONTEXT_KEEP_RECENT:]
+            if self.complaint_terms and rest:
+                # Substring hits, so "pain" also counts "painful" and Indic words with case suffixes
+                wanted = tuple(self.complaint_terms)
+                overlap = {}
+                for i in rest:
+                    text = _search_text(entries[i])
+                    overlap[i] = sum([w in text for w in wanted])
+                rest.sort(key=lambda i: -overlap[i])   # stable: newer first among equals
+            self._order = head + rest
+        return self._order
+
+    def select(self, render, budget: int):
+        """
+        Rendered lines (original order) within `budget` estimated tokens, skipping lines
+        that repeat one already kept. Returns (lines, tokens_in, tokens_out).
+        """
+        rendered = [render(entry) for entry in self.entries]
+        # One token per line for the "; " / ", " separator; histories repeat lines a lot
+        memo = {}
+        tokens = [memo[line] if line in memo else memo.setdefault(line, estimate_tokens(line) + 1)
+                  for line in rendered]
+        tokens_in = sum(tokens)
+        if tokens_in <= budget and len(memo) == len(rendered):
+            return rendered, tokens_in, tokens_in
+
+        chosen, seen, used = [], set(), 0
+        for pos in self.order:
+            key = rendered[pos].casefold()
+            if key in seen or used + tokens[pos] > budget:
+                continue
+            seen.add(key)
+            chosen.append(pos)
+            used += tokens[pos]
+        chosen.sort()
+        return [rendered[pos] for pos in chosen], tokens_in, used
+
+
+def compact_context(request, section: str, **renderers) -> dict:
+    """
+    Compacts the history lists named in `renderers` (symptoms, clinical_vault,
+    nutrition_logs), each mapped to the function that renders one entry as a prompt line.
+    Returns {list name: [lines]} within the section's token budget; the savings are
+    recorded on the current RequestTrace. Results are cached on the request.
+    """
+    cache = request._compacted
+    if section in cache:
+        return cache[section]
+
+    ranked = cache.setdefault("_ranked", {})
+    if CONTEXT_COMPACTION_ENABLED and not ranked:
+        complaint = terms(" ".join(filter(None, (request.query, request.problem_context))))
+        ranked.update({name: RankedHistory(getattr(request, name) or [], complaint) for name in LIST_SHARES})
+
+    budget = section_budget(section)
+    share_total = sum(LIST_SHARES[name] for name in renderers)
+    result, tokens_in, tokens_out = {}, 0, 0
+    for name, render in renderers.items():
+        if not CONTEXT_COMPACTION_ENABLED:
+            lines = [render(e) for e in getattr(request, name) or []]
+            used = sum(estimate_tokens(line) + 1 for line in lines)
+            result[name], tokens_in, tokens_out = lines, tokens_in + used, tokens_out + used
+            continue
+        lines, t_in, t_out = ranked[name].select(render, int(budget * LIST_SHARES[name] / share_total))
+        result[name] = lines
+        tokens_in += t_in
+        tokens_out += t_out
+
+    cache[section] = result
+    trace = current_trace()
+    if trace is not None:
+        trace.record_context(section, tokens_in, tokens_out)
+    return result
@@ -0,0 +1,194 @@
+"""
+Drug-interaction engine.
+Loads data/drug_interactions.json: canonical drugs with brand/synonym aliases and class
+memberships, combination products, and interaction rules written against drugs or drug
+classes. Rules are expanded once at load into a drug-to-drug adjacency map, so screening
+N medications costs at most N*(N-1)/2 dict lookups regardless of how many rules exist.
+Misspelled or transliterated names are matched to aliases by services.drug_resolver.
+"""
+import json
+import os
+import re
+import threading
+from itertools import combinations
+
+from services.drug_resolver import MedicationResolver
+
+DRUG_INTERACTIONS_PATH = os.getenv(
+    "DRUG_INTERACTIONS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "drug_interactions.json")
+)
+
+SEVERITY_RANK = {"SAFE": 0, "CAUTION": 1, "DANGER": 2}
+
+# Strength / dosage-form noise stripped before alias lookup ("Dolo 650 mg tablet" -> "dolo")
+_DOSE_RE = re.compile(r"\b\d+(?:\.\d+)?\s*(?:mg|mcg|µg|g|ml|iu|units?|%)?(?=\s|$)")
+_FORM_WORDS = {
+    "tab", "tabs", "tablet", "tablets", "cap", "caps", "capsule", "capsules", "syrup", "susp",
+    "suspension", "inj", "injection", "drops", "cream", "gel", "sr", "er", "xr", "cr", "od", "ds", "forte",
+}
+_PUNCT_RE = re.compile(r"[^\w\s'-]+")
+
+
+def normalize_name(name: str) -> str:
+    text = _PUNCT_RE.sub(" ", (name or "").lower())
+    text = _DOSE_RE.sub(" ", text)
+    return " ".join(w for w in text.split() if w not in _FORM_WORDS)
+
+
+class InteractionGraph:
+    def __init__(self, data: dict):
+        self.version = data.get("version", 1)
+        self.class_labels = dict(data.get("classes", {}))
+        drugs = data.get("drugs", {})
+
+        # Nodes are canonical drugs plus class names, so "ssri" typed on its own still screens
+        self.node_classes = {c: frozenset([c]) for c in self.class_labels}
+        for drug, spec in drugs.items():
+            if drug in self.class_labels:
+                raise ValueError(f"'{drug}' is both a drug and a drug class")
+            unknown = set(spec.get("classes", [])) - set(self.class_labels)
+            if unknown:
+                raise ValueError(f"{drug}: unknown drug classes {sorted(unknown)}")
+            self.node_classes[drug] = frozenset(spec.get("classes", []))
+
+        self.aliases = {}
+        for node in self.node_classes:
+            self._add_alias(node, (node,))
+        for drug, spec in drugs.items():
+            for alias in spec.get("aliases", []):
+                self._add_alias(alias, (drug,))
+        for product, components in data.get("products", {}).items():
+            missing = [c for c in components if c not in drugs]
+            if missing:
+                raise ValueError(f"{product}: unknown product components {missing}")
+            self._add_alias(product, tuple(components))
+
+        self.resolver = MedicationResolver(self.aliases)
+
+        self.rules = []
+        self.adjacency = {}
+        for rule in data.get("interactions", []):
+            self._add_rule(rule)
+
+        self.condition_flags = {}
+        for flag, targets in data.get("condition_flags", {}).items():
+            self.condition_flags[flag] = frozenset().union(*(self._members(t) for t in targets))
+
+    @classmethod
+    def from_file(cls, path: str = DRUG_INTERACTIONS_PATH) -> "InteractionGraph":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    # ── Build ─────────────────────────────────────────────────────────────────
+    def _add_alias(self, alias: str, targets: tuple):
+        key = normalize_name(alias)
+        existing = self.aliases.get(key)
+        if existing is not None and existing != targets:
+            raise ValueError(f"Alias '{alias}' maps to both {existing} and {targets}")
+        self.aliases[key] = targets
+
+    def _members(self, term: str) -> frozenset:
+        """A class expands to its member drugs (and the class node itself); a drug to itself."""
+        if term in self.class_labels:
+            return frozenset(n for n, classes in self.node_classes.items() if term in classes)
+        if term in self.node_classes:
+            return frozenset([term])
+        raise ValueError(f"Unknown drug or class '{term}'")
+
+    def _add_rule(self, rule: dict):
+        a, b = rule["between"]
+        severity = rule.get("severity", "CAUTION")
+        if severity not in SEVERITY_RANK:
+            raise ValueError(f"{a}/{b}: unknown severity '{severity}'")
+        # Drug-level rules override class-level ones for the same pair
+        specificity = (a not in self.class_labels) + (b not in self.class_labels)
+        index = len(self.rules)
+        self.rules.append({"between": [a, b], "severity": severity, "message": rule["message"]})
+
+        for x in self._members(a):
+            for y in self._members(b):
+                if x == y:
+                    continue
+                for u, v in ((x, y), (y, x)):
+                    row = self.adjacency.setdefault(u, {})
+                    current = row.get(v)
+                    if current is None or specificity > current[0]:
+                        row[v] = (specificity, (index,))
+                    elif specificity == current[0] and index not in current[1]:
+                        row[v] = (specificity, current[1] + (index,))
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+    def resolution(self, name: str) -> dict:
+        """How one medication string maps onto canonical drugs, with a confidence score."""
+        hit = self.resolver.match(normalize_name(name))
+        if hit is None:
+            return {"input": name, "drugs": [], "matched": None, "confidence": 0.0, "method": "unresolved"}
+        alias, confidence, method = hit
+        return {"input": name, "drugs": list(self.aliases[alias]), "matched": alias,
+                "confidence": round(confidence, 3), "method": method}
+
+    def resolve(self, name: str) -> tuple:
+        """Canonical drugs for a medication string; combination products give several."""
+        return tuple(self.resolution(name)["drugs"])
+
+    def pair(self, a: str, b: str) -> list:
+        hit = self.adjacency.get(a, {}).get(b)
+        return [self.rules[i] for i in hit[1]] if hit else []
+
+    def flagged(self, drugs, flag: str) -> list:
+        targets = self.condition_flags.get(flag, frozenset())
+        return [d for d in drugs if d in targets]
+
+    def screen(self, medications) -> dict:
+        resolutions, unresolved, drugs = [], [], []
+        for med in medications or []:
+            res = self.resolution(med)
+            resolutions.append(res)
+            if not res["drugs"]:
+                unresolved.append(med)
+            for drug in res["drugs"]:
+                if drug not in drugs:
+                    drugs.append(drug)
+
+        status = "SAFE"
+        interactions = []
+        for a, b in combinations(drugs, 2):
+            for rule in self.pair(a, b):
+                interactions.append({"drugs": [a, b], "severity": rule["severity"], "message": rule["message"]})
+                if SEVERITY_RANK[rule["severity"]] > SEVERITY_RANK[status]:
+                    status = rule["severity"]
+
+        return {"status": status, "drugs": drugs, "resolutions": resolutions,
+                "unresolved": unresolved, "interactions": interactions}
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "drugs": sum(1 for n in self.node_classes if n not in self.class_labels),
+            "classes": len(self.class_labels),
+            "aliases": len(self.aliases),
+            "rules": len(self.rules),
+            "indexed_pairs": sum(len(row) for row in self.adjacency.values()) // 2,
+            "resolver": self.resolver.stats(),
+        }
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_interaction_graph() -> InteractionGraph:
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = InteractionGraph.from_file()
+                print(f"[MedSafety] Interaction graph loaded: {_graph.stats()}")
+    return _graph
+
+
+def screen_many(prescriptions: list) -> list:
+    """Screens several medication lists; top level so the process pool can run it."""
+    graph = get_interaction_graph()
+    return [graph.screen(meds) for meds in prescriptions]
@@ -0,0 +1,256 @@
+"""
+Spelling-correction index for medication names.
+Symmetric-delete lookup (SymSpell): every dictionary term is stored under all strings
+reachable by deleting up to MAX_EDIT_DISTANCE characters from its first PREFIX_LENGTH
+characters. A query generates the same deletes, so candidates come from a few dozen dict
+probes and only those are verified with a bounded Damerau-Levenshtein distance.
+A second index over phonetic keys catches transliterated spellings ("parasitamal").
+"""
+import os
+from functools import lru_cache
+
+MAX_EDIT_DISTANCE = int(os.getenv("MED_RESOLVER_MAX_DISTANCE", "2"))
+PREFIX_LENGTH     = int(os.getenv("MED_RESOLVER_PREFIX_LENGTH", "7"))
+MIN_CONFIDENCE    = float(os.getenv("MED_RESOLVER_MIN_CONFIDENCE", "0.6"))
+CACHE_SIZE        = int(os.getenv("MED_RESOLVER_CACHE_SIZE", "8192"))
+
+# Transliteration folds applied in order (Indic-to-Latin spellings of the same sound)
+_PHONETIC_FOLDS = (
+    ("ch", "c"), ("ph", "f"), ("th", "t"), ("dh", "d"), ("kh", "k"), ("gh", "g"), ("bh", "b"), ("sh", "s"),
+    ("ck", "k"), ("q", "k"), ("x", "ks"), ("z", "s"), ("w", "v"), ("y", "i"), ("c", "k"),
+    ("aa", "a"), ("ee", "i"), ("ii", "i"), ("oo", "u"), ("uu", "u"), ("ou", "u"), ("e", "a"), ("o", "a"),
+)
+
+
+def phonetic_key(text: str) -> str:
+    key = text.replace(" ", "").replace("-", "").replace("'", "")
+    for src, dst in _PHONETIC_FOLDS:
+        key = key.replace(src, dst)
+    # Collapse doubled letters ("amlodippine" -> "amlodipine")
+    return "".join(ch for i, ch in enumerate(key) if i == 0 or ch != key[i - 1])
+
+
+def allowed_distance(term: str, max_distance: int = MAX_EDIT_DISTANCE) -> int:
+    """Short names tolerate fewer edits, otherwise 'pan' would match 'tan' and 'dan'."""
+    n = len(term)
+    if n <= 4:
+        return 0
+    if n <= 7:
+        return min(1, max_distance)
+    return max_distance
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment distance; returns limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) + len(b)
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        lo = limit + 1
+        ai = a[i - 1]
+        for j in range(1, len(b) + 1):
+            cost = 0 if ai == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and ai == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            if v < lo:
+                lo = v
+        if lo > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _pattern_masks(pattern: str) -> dict:
+    masks = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def _osa_bitparallel(masks: dict, m: int, text: str) -> int:
+    """
+    Hyyrö's bit-parallel optimal-string-alignment distance between a pattern (given as
+    per-character bit masks, length m) and text: one pass of integer ops per text character.
+    """
+    if m == 0:
+        return len(text)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    get = masks.get
+    vp, vn, d0, pm_prev = full, 0, 0, 0
+    dist = m
+    for ch in text:
+        pm = get(ch, 0)
+        tr = (((d0 ^ full) & pm) << 1) & pm_prev
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & full
+        hp = vn | (full ^ (d0 | vp))
+        hn = d0 & vp
+        if hp & last:
+            dist += 1
+        elif hn & last:
+            dist -= 1
+        hp = ((hp << 1) | 1) & full
+        vp = ((hn << 1) | (full ^ (d0 | hp))) & full
+        vn = hp & d0
+        pm_prev = pm
+    return dist
+
+
+def _deletes_by_level(word: str, distance: int) -> list:
+    """[(deleted_count, string)] for every string reachable by up to `distance` deletes, nearest first."""
+    out = [(0, word)]
+    seen = {word}
+    frontier = [word]
+    for level in range(1, distance + 1):
+        nxt = []
+        for w in frontier:
+            for i in range(len(w)):
+                d = w[:i] + w[i + 1:]
+                if d not in seen:
+                    seen.add(d)
+                    nxt.append(d)
+        out.extend((level, d) for d in nxt)
+        frontier = nxt
+    return out
+
+
+class SymSpellIndex:
+    def __init__(self, terms, max_distance: int = MAX_EDIT_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.terms = []
+        self._term_ids = {}
+        # delete-string -> term id, or a tuple of ids when several terms share it
+        self._deletes = {}
+        for term in terms:
+            self.add(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def add(self, term: str):
+        if not term or term in self._term_ids:
+            return
+        tid = len(self.terms)
+        self.terms.append(term)
+        self._term_ids[term] = tid
+        for _, d in _deletes_by_level(term[:self.prefix_length], self.max_distance):
+            hit = self._deletes.get(d)
+            if hit is None:
+                self._deletes[d] = tid
+            elif isinstance(hit, tuple):
+                self._deletes[d] = hit + (tid,)
+            else:
+                self._deletes[d] = (hit, tid)
+
+    def lookup(self, word: str, max_distance: int = None):
+        """Closest term as (term, distance), or None. Ties go to the term closest in length."""
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if word in self._term_ids:
+            return word, 0
+        if limit <= 0 or not word:
+            return None
+
+        masks, m = _pattern_masks(word), len(word)
+        best, best_key = None, None
+        seen = set()
+        for q_deleted, d in _deletes_by_level(word[:self.prefix_length], limit):
+            if best_key is not None and q_deleted > best_key[0]:
+                break
+            hit = self._deletes.get(d)
+            if hit is None:
+                continue
+            for tid in (hit if isinstance(hit, tuple) else (hit,)):
+                if tid in seen:
+                    continue
+                term = self.terms[tid]
+                bound = limit if best_key is None else best_key[0]
+                # A term within `bound` edits shares a delete string needing at most `bound`
+                # deletes on its side too; not marked seen, as a cheaper delete may come later
+                t_deleted = min(len(term), self.prefix_length) - len(d)
+                if t_deleted > bound or abs(len(term) - m) > bound:
+                    continue
+                seen.add(tid)
+                dist = _osa_bitparallel(masks, m, term)
+                if dist > bound:
+                    continue
+                key = (dist, abs(len(term) - m), term)
+                if best_key is None or key < best_key:
+                    best, best_key = term, key
+        return (best, best_key[0]) if best is not None else None
+
+    def stats(self) -> dict:
+        return {"terms": len(self.terms), "delete_keys": len(self._deletes),
+                "max_distance": self.max_distance, "prefix_length": self.prefix_length}
+
+
+class MedicationResolver:
+    """
+    Maps free-text medication names onto alias keys of the interaction graph.
+    An exact key wins outright; otherwise the best fuzzy (or, failing that, phonetic)
+    match on the whole name or on one of its words, with a confidence in [0, 1].
+    """
+
+    def __init__(self, vocabulary, min_confidence: float = MIN_CONFIDENCE, cache_size: int = CACHE_SIZE):
+        self.vocabulary = set(vocabulary)
+        self.min_confidence = min_confidence
+        self.index = SymSpellIndex(sorted(self.vocabulary))
+        self._phonetic = {}
+        for term in sorted(self.vocabulary):
+            self._phonetic.setdefault(phonetic_key(term), term)
+        self.phonetic_index = SymSpellIndex(sorted(self._phonetic))
+        # Prescriptions repeat the same handful of names; memoise per instance
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _fuzzy(self, text: str):
+        hit = self.index.lookup(text, allowed_distance(text))
+        if hit:
+            term, dist = hit
+            return term, 1.0 - dist / max(len(term), len(text)), "fuzzy"
+        key = phonetic_key(text)
+        hit = self.phonetic_index.lookup(key, allowed_distance(key))
+        if hit:
+            pkey, dist = hit
+            # Phonetic folding already discards information, so cap its confidence
+            return self._phonetic[pkey], 0.85 * (1.0 - dist / max(len(pkey), len(key), 1)), "phonetic"
+        return None
+
+    def _match(self, text: str):
+        """(alias key, confidence, method) for a normalised name, or None."""
+        if not text:
+            return None
+        if text in self.vocabulary:
+            return text, 1.0, "exact"
+        candidates = []
+        hit = self._fuzzy(text)
+        if hit:
+            candidates.append(hit)
+        words = text.split()
+        if len(words) > 1:
+            # "crocin advance", "tab warfrin sodium": best-matching single word, slightly discounted
+            for word in words:
+                if len(word) < 3:
+                    continue
+                if word in self.vocabulary:
+                    candidates.append((word, 0.9, "partial"))
+                    continue
+                hit = self._fuzzy(word)
+                if hit:
+                    candidates.append((hit[0], hit[1] * 0.9, hit[2]))
+        if not candidates:
+            return None
+        best = max(candidates, key=lambda c: c[1])
+        return best if best[1] >= self.min_confidence else None
+
+    def stats(self) -> dict:
+        info = self.match.cache_info()
+        return {"index": self.index.stats(), "phonetic_terms": len(self._phonetic),
+                "cache_hits": info.hits, "cache_misses": info.misses}
@@ -0,0 +1,142 @@
+"""
+Multilingual emergency-keyword matcher for instant triage.
+Keywords for every supported language (native script and common romanised spellings)
+come from data/emergency_keywords.json and are compiled once into an Aho-Corasick
+automaton, so a complaint is scanned in a single linear pass however many terms exist.
+All languages are matched on every text, since dictations are often code-mixed.
+"""
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import deque
+
+EMERGENCY_KEYWORDS_PATH = os.getenv(
+    "EMERGENCY_KEYWORDS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "emergency_keywords.json")
+)
+
+# Devanagari nukta and candrabindu spellings vary between keyboards and speech-to-text
+_FOLDS = str.maketrans({"\u093c": None, "\u0901": "\u0902", "\u200c": None, "\u200d": None, "'": None, "\u2019": None})
+# \w excludes Indic vowel signs (combining marks), so keep those blocks explicitly; dandas split
+_SEPARATORS = re.compile(r"(?:[^\w\u0900-\u0963\u0966-\u0d7f]|_)+")
+
+
+def normalize_text(text: str) -> str:
+    """NFC, casefolded, punctuation to single spaces, padded with one space on each side."""
+    text = unicodedata.normalize("NFC", text or "").casefold().translate(_FOLDS)
+    return " " + _SEPARATORS.sub(" ", text).strip() + " "
+
+
+class AhoCorasick:
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self._built = False
+
+    def add(self, pattern: str, payload):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = nxt
+        self.out[node] = self.out[node] + (payload,)
+        self._built = False
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0) if self.goto[f].get(ch) != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+        self._built = True
+
+    def iter(self, text: str):
+        """Yields (end_index, payload) for every pattern occurrence, overlapping ones included."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for payload in out[node]:
+                yield i, payload
+
+    def __len__(self) -> int:
+        return len(self.goto)
+
+
+class EmergencyMatcher:
+    def __init__(self, data: dict):
+        self.version = data.get("version", 1)
+        self.specialists = {c: spec.get("specialist", "Emergency Medicine") for c, spec in data.get("categories", {}).items()}
+        self.advice = dict(data.get("advice", {}))
+        self.automaton = AhoCorasick()
+        self.terms = 0
+        self.languages = sorted(data.get("keywords", {}))
+        seen = set()
+        for language, categories in data.get("keywords", {}).items():
+            for category, terms in categories.items():
+                if category not in self.specialists:
+                    raise ValueError(f"{language}: unknown emergency category '{category}'")
+                for term in terms:
+                    # Leading space anchors the match at a word start; suffixes stay free
+                    # ("seizures", Telugu/Tamil case endings), so no trailing anchor
+                    key = normalize_text(term).rstrip(" ")
+                    if key.strip() and key not in seen:
+                        seen.add(key)
+                        self.automaton.add(key, (term, category, language))
+                        self.terms += 1
+        self.automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str = EMERGENCY_KEYWORDS_PATH) -> "EmergencyMatcher":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str) -> list:
+        """Emergency terms found in text, first occurrence of each, in order of appearance."""
+        matches, seen = [], set()
+        for _, (term, category, language) in self.automaton.iter(normalize_text(text)):
+            if term not in seen:
+                seen.add(term)
+                matches.append({"term": term, "category": category, "language": language})
+        return matches
+
+    def advice_for(self, language: str) -> str:
+        return self.advice.get(language) or self.advice.get("en", "Seek emergency care now.")
+
+    def specialist_for(self, matches: list) -> str:
+        return self.specialists.get(matches[0]["category"], "Emergency Medicine") if matches else "General Physician"
+
+    def stats(self) -> dict:
+        return {"version": self.version, "terms": self.terms, "states": len(self.automaton),
+                "languages": self.languages}
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_emergency_matcher() -> EmergencyMatcher:
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = EmergencyMatcher.from_file()
+                print(f"[Triage] Emergency matcher compiled: {_matcher.stats()}")
+    return _matcher
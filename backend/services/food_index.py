@@ -0,0 +1,288 @@
+"""
+Food-composition index for nutrition scoring.
+data/food_composition.json holds per-serving calories and macros for common Indian foods,
+loaded into one float32 matrix (foods x nutrients). Free-text log descriptions
+("2 idli with sambar, tea") are split into food mentions, each resolved by exact alias or
+by trigram similarity over a posting list per trigram (the best few re-scored by edit
+distance), so misspellings and transliterations still match. Parsed descriptions are memoised, since people log the same
+meals day after day, and a user's logs are totalled with a handful of NumPy operations
+over (log, food, servings) rows. No LLM call is involved.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from services.drug_resolver import allowed_distance, edit_distance
+
+FOOD_COMPOSITION_PATH = os.getenv(
+    "FOOD_COMPOSITION_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "food_composition.json")
+)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+FOOD_MATCH_MIN_SIMILARITY = float(os.getenv("FOOD_MATCH_MIN_SIMILARITY", "0.55"))
+FOOD_PARSE_CACHE_SIZE     = int(os.getenv("FOOD_PARSE_CACHE_SIZE", "8192"))
+FOOD_RERANK_CANDIDATES    = int(os.getenv("FOOD_RERANK_CANDIDATES", "5"))
+NUTRITION_WINDOW_DAYS     = int(os.getenv("NUTRITION_WINDOW_DAYS", "30"))
+
+DAY_MS = 86_400_000
+KCAL, PROTEIN, CARBS, FAT, FIBRE = range(5)
+MAX_PHRASE_WORDS = 4
+PHRASE_PENALTY = 0.3
+
+_SEPARATORS = re.compile(r"[,;+&|\n]|\band\b|\bwith\b|\bthen\b|\bplus\b")
+_NON_WORD = re.compile(r"[^\w./]+")
+_NUMBER = re.compile(r"^\d+(?:\.\d+)?$")
+_FRACTION = re.compile(r"^(\d+)/(\d+)$")
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "half": 0.5, "quarter": 0.25}
+# Measure and meal words skipped between a quantity and the food it counts
+_FILLER = {"plate", "plates", "bowl", "bowls", "cup", "cups", "glass", "glasses", "piece", "pieces", "pcs",
+           "slice", "slices", "katori", "serving", "servings", "small", "medium", "large", "big", "of", "some",
+           "had", "ate", "eaten", "for", "breakfast", "lunch", "dinner", "snack", "snacks", "homemade", "a", "an"}
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", (text or "").casefold()).split())
+
+
+def trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _quantity(token: str):
+    if _NUMBER.match(token):
+        return float(token)
+    fraction = _FRACTION.match(token)
+    if fraction and int(fraction.group(2)):
+        return int(fraction.group(1)) / int(fraction.group(2))
+    return _NUMBER_WORDS.get(token)
+
+
+class FoodIndex:
+    """
+    NumPy is imported by the methods that use it, not at module level: the orchestrator
+    imports this module, and numpy would otherwise load before the server opens its port.
+    """
+    def __init__(self, data: dict):
+        import numpy as np
+        self.version = data.get("version", 1)
+        self.columns = list(data["columns"])
+        foods = data["foods"]
+        self.names = [f[0] for f in foods]
+        self.categories = np.array([f[1] for f in foods])
+        self.pieces = np.array([f[3] for f in foods], dtype=np.float32)
+        self.nutrients = np.array([f[4:4 + len(self.columns)] for f in foods], dtype=np.float32)
+
+        self.aliases = {}
+        for food, row in enumerate(foods):
+            for alias in (row[0], *row[-1]):
+                self.aliases.setdefault(_normalize(alias), food)
+        self._alias_keys = list(self.aliases)
+        self._alias_sizes = np.array([len(trigrams(a)) for a in self._alias_keys], dtype=np.int32)
+        postings = defaultdict(list)
+        for i, alias in enumerate(self._alias_keys):
+            for gram in trigrams(alias):
+                postings[gram].append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.parse = lru_cache(maxsize=FOOD_PARSE_CACHE_SIZE)(self._parse)
+        # Descriptions vary more than the phrases in them, so fuzzy lookups are cached too
+        self.match = lru_cache(maxsize=FOOD_PARSE_CACHE_SIZE)(self._match)
+
+    @classmethod
+    def from_file(cls, path: str = FOOD_COMPOSITION_PATH) -> "FoodIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _match(self, phrase: str):
+        """(food id, similarity) for a normalised phrase; food id None below the threshold."""
+        import numpy as np
+        food = self.aliases.get(phrase)
+        if food is not None:
+            return food, 1.0
+        phrase_grams = trigrams(phrase)
+        grams = [self._postings[g] for g in phrase_grams if g in self._postings]
+        if not grams:
+            return None, 0.0
+        # Dice similarity 2|A∩B| / (|A|+|B|) for every alias sharing a trigram
+        shared = np.bincount(np.concatenate(grams), minlength=len(self._alias_keys))
+        scores = 2 * shared / (len(phrase_grams) + self._alias_sizes)
+        # Transposed or dropped letters in short names break most of their trigrams, so the
+        # closest few aliases are re-scored by edit distance as well
+        best, best_score = None, 0.0
+        for i in np.argsort(-scores, kind="stable")[:FOOD_RERANK_CANDIDATES].tolist():
+            alias = self._alias_keys[i]
+            score = float(scores[i])
+            limit = allowed_distance(alias)
+            # An edit breaks at most 4 of the alias's trigrams (a transposition), and one
+            # edit scores at most 1 - 1/len, so most candidates need no distance computed
+            if (limit and abs(len(phrase) - len(alias)) <= limit and shared[i] >= self._alias_sizes[i] - 4 * limit
+                    and 1 - 1 / len(alias) > max(score, best_score)):
+                distance = edit_distance(phrase, alias, limit)
+                if distance <= limit:
+                    score = max(score, 1 - distance / len(alias))
+            if score > best_score:
+                best, best_score = i, score
+        if best is None or best_score < FOOD_MATCH_MIN_SIMILARITY:
+            return None, best_score
+        return self.aliases[self._alias_keys[best]], best_score
+
+    def _foods_in(self, words: list) -> list:
+        """
+        Best split of a run of words into food phrases. Each phrase costs a penalty, so one
+        close match for a dish ("chicken biriyani") beats exact matches for its parts.
+        """
+        n = len(words)
+        # Words inside an exact alias need no fuzzy lookup on their own: only phrases
+        # reaching an unrecognised word are scored by similarity
+        exact = {}
+        covered = [False] * n
+        for i in range(n):
+            for size in range(1, min(MAX_PHRASE_WORDS, n - i) + 1):
+                food = self.aliases.get(" ".join(words[i:i + size]))
+                if food is not None:
+                    exact[i, size] = food
+                    covered[i:i + size] = [True] * size
+
+        best = [(0.0, ())] * (n + 1)        # best[i]: (score, foods) for words[i:]
+        for i in range(n - 1, -1, -1):
+            choice = best[i + 1]            # word i is not part of a food name
+            for size in range(1, min(MAX_PHRASE_WORDS, n - i) + 1):
+                if (i, size) in exact:
+                    food, similarity = exact[i, size], 1.0
+                elif all(covered[i:i + size]):
+                    continue
+                else:
+                    food, similarity = self.match(" ".join(words[i:i + size]))
+                if food is None:
+                    continue
+                score = similarity * size - PHRASE_PENALTY + best[i + size][0]
+                if score > choice[0]:
+                    choice = (score, (food,) + best[i + size][1])
+            best[i] = choice
+        return best[0][1]
+
+    def _parse(self, description: str) -> tuple:
+        """((food id, servings), ...) for the foods mentioned in one log description."""
+        items = []
+        for segment in _SEPARATORS.split((description or "").casefold()):
+            # A quantity counts the next food in the segment ("2 idli"), or the last one
+            # when nothing follows it ("chapati 3")
+            parsed, count, run = [], None, []
+            for token in _normalize(segment).split() + [""]:
+                n = _quantity(token) if token else None
+                if token and n is None and token not in _FILLER:
+                    run.append(token)
+                    continue
+                for food in self._foods_in(run) if run else ():
+                    parsed.append([food, count])
+                    count = None
+                run = []
+                if n is not None:
+                    count = n
+            if count is not None and parsed and parsed[-1][1] is None:
+                parsed[-1][1] = count
+            for food, count in parsed:
+                pieces = float(self.pieces[food])
+                items.append((food, 1.0 if count is None else count / pieces if pieces else count))
+        return tuple(items)
+
+    def intake(self, logs: list, now_ms: float = None, window_days: int = NUTRITION_WINDOW_DAYS) -> dict:
+        """
+        Average daily intake over the days logged within the window. Logs the index cannot
+        read fall back to the calories/macros the client logged with them, if any.
+        """
+        import numpy as np
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        since = now_ms - window_days * DAY_MS
+        log_days, foods, servings, item_days = [], [], [], []
+        fallback = np.zeros(len(self.columns), dtype=np.float64)
+        matched = 0
+        for log in logs or []:
+            try:
+                ts = float(log.get("timestamp") or now_ms)
+            except (TypeError, ValueError):
+                ts = now_ms
+            if ts < since:
+                continue
+            day = int(ts // DAY_MS)
+            log_days.append(day)
+            items = self.parse(str(log.get("description") or log.get("name") or ""))
+            if items:
+                matched += 1
+                for food, qty in items:
+                    foods.append(food)
+                    servings.append(qty)
+                    item_days.append(day)
+            else:
+                for col, key in ((KCAL, "calories"), (PROTEIN, "protein"), (CARBS, "carbs"), (FAT, "fat")):
+                    try:
+                        fallback[col] += float(log.get(key) or 0)
+                    except (TypeError, ValueError):
+                        pass
+
+        days = len(set(log_days))
+        totals = fallback
+        by_category = {}
+        if foods:
+            ids = np.asarray(foods, dtype=np.intp)
+            qty = np.asarray(servings, dtype=np.float32)
+            totals = totals + qty @ self.nutrients[ids]
+            cats, inverse = np.unique(self.categories[ids], return_inverse=True)
+            by_category = dict(zip(cats.tolist(), np.bincount(inverse, weights=qty).tolist()))
+        daily = totals / max(days, 1)
+        energy = daily[PROTEIN] * 4 + daily[CARBS] * 4 + daily[FAT] * 9
+        split = {name: round(float(daily[col] * factor / energy * 100), 1) if energy else 0.0
+                 for name, col, factor in (("protein", PROTEIN, 4), ("carbs", CARBS, 4), ("fat", FAT, 9))}
+        return {
+            "logs": len(log_days),
+            "matched_logs": matched,
+            "days_logged": days,
+            "daily": {name: round(float(v), 1) for name, v in zip(self.columns, daily)},
+            "energy_split_pct": split,
+            "servings_per_day": {c: round(v / max(days, 1), 2) for c, v in by_category.items()},
+        }
+
+    def suggest(self, category: str, goal: str, limit: int = 3, exclude=()) -> list:
+        """Foods of a category ranked for a goal: protein, fibre, lighter, energy or balanced."""
+        import numpy as np
+        n = self.nutrients
+        kcal = np.maximum(n[:, KCAL], 1.0)
+        ranking = {
+            "protein": -n[:, PROTEIN] / kcal,
+            "fibre": -n[:, FIBRE] / kcal,
+            "lighter": n[:, KCAL],
+            "energy": -n[:, KCAL],
+        }.get(goal, -(n[:, PROTEIN] * 4 + n[:, FIBRE] * 8) / kcal)
+        order = np.argsort(ranking, kind="stable")
+        picks = []
+        for food in order[self.categories[order] == category]:
+            if self.names[food] not in exclude:
+                picks.append(self.names[food])
+                if len(picks) == limit:
+                    break
+        return picks
+
+    def stats(self) -> dict:
+        info, matches = self.parse.cache_info(), self.match.cache_info()
+        return {"version": self.version, "foods": len(self.names), "aliases": len(self._alias_keys),
+                "trigrams": len(self._postings), "parse_cache_hits": info.hits, "parse_cache_misses": info.misses,
+                "match_cache_hits": matches.hits, "match_cache_misses": matches.misses}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_food_index() -> FoodIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = FoodIndex.from_file()
+                print(f"[Nutrition] Food-composition index loaded: {_index.stats()}")
+    return _index
@@ -0,0 +1,302 @@
+"""
+Streaming outbreak forecaster behind the AYUSH ForecastingIntelligence.
+Symptom logs arriving with requests are classified into surveillance syndromes
+(data/symptom_syndromes.json) and counted per (district, mandal, syndrome), with
+district-wide and all-syndrome roll-ups, in fixed rings of daily counts. Each series keeps
+running sums for the recent week and the baseline weeks before it, so adding an event and
+reading a forecast (z-score against the baseline, 7/30-day outbreak risk and its
+confidence interval) are both O(1); nothing rescans history, and memory is bounded by
+FORECAST_MAX_SERIES however many events arrive.
+
+Patients resend their whole symptom history with every request, so a per-patient
+high-water mark on the log timestamp keeps each entry counted once.
+"""
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from services.emergency_matcher import AhoCorasick, normalize_text
+
+SYMPTOM_SYNDROMES_PATH = os.getenv(
+    "SYMPTOM_SYNDROMES_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "symptom_syndromes.json")
+)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+FORECAST_RECENT_DAYS   = int(os.getenv("FORECAST_RECENT_DAYS", "7"))
+FORECAST_BASELINE_DAYS = int(os.getenv("FORECAST_BASELINE_DAYS", "28"))
+FORECAST_MAX_SERIES    = int(os.getenv("FORECAST_MAX_SERIES", "50000"))
+FORECAST_MAX_PATIENTS  = int(os.getenv("FORECAST_MAX_PATIENTS", "200000"))
+# A series with fewer events than this in its window is too sparse to forecast from
+FORECAST_MIN_EVENTS    = int(os.getenv("FORECAST_MIN_EVENTS", "10"))
+# Weekly counts this many standard deviations above the baseline count as an outbreak week
+FORECAST_ALERT_Z       = float(os.getenv("FORECAST_ALERT_Z", "2.0"))
+
+DAY_MS = 86_400_000
+ALL = "*"               # roll-up over every mandal of a district, or over every syndrome
+OTHER = "other"
+
+
+def _normal_sf(x: float) -> float:
+    """P(Z > x) for a standard normal."""
+    return 0.5 * math.erfc(x / math.sqrt(2))
+
+
+def exceedance(expected: float, threshold: float) -> float:
+    """P(count > threshold) for a Poisson count with this mean (normal approximation)."""
+    if expected <= 0:
+        return 0.0
+    return _normal_sf((threshold + 0.5 - expected) / math.sqrt(expected))
+
+
+class DailySeries:
+    """
+    Daily counts for the last `recent + baseline` days in a ring, head = newest day.
+    `recent` holds the newest `recent_days` days; `base` and `base_sq` are the sum and
+    sum of squares of the daily counts over the baseline days before them.
+    """
+    __slots__ = ("counts", "head", "recent_days", "span", "recent", "base", "base_sq")
+
+    def __init__(self, recent_days: int, baseline_days: int, day: int):
+        self.recent_days = recent_days
+        self.span = recent_days + baseline_days
+        self.counts = array("q", [0]) * self.span
+        self.head = day
+        self.recent = 0
+        self.base = 0
+        self.base_sq = 0
+
+    def advance(self, day: int):
+        """Moves the head to `day`; O(days skipped), at most the ring length."""
+        if day <= self.head:
+            return
+        if day - self.head >= self.span:
+            self.counts = array("q", [0]) * self.span
+            self.recent = self.base = self.base_sq = 0
+            self.head = day
+            return
+        counts, span = self.counts, self.span
+        for h in range(self.head + 1, day + 1):
+            # The slot for day h last held day h - span, which leaves the baseline
+            slot = h % span
+            old = counts[slot]
+            self.base -= old
+            self.base_sq -= old * old
+            counts[slot] = 0
+            # Day h - recent_days leaves the recent week and joins the baseline
+            moved = counts[(h - self.recent_days) % span]
+            self.recent -= moved
+            self.base += moved
+            self.base_sq += moved * moved
+        self.head = day
+
+    def add(self, day: int, n: int = 1) -> bool:
+        """Counts n events on `day`; False if the day is already outside the window."""
+        self.advance(day)
+        age = self.head - day
+        if age >= self.span:
+            return False
+        slot = day % self.span
+        c = self.counts[slot]
+        self.counts[slot] = c + n
+        if age < self.recent_days:
+            self.recent += n
+        else:
+            self.base += n
+            self.base_sq += 2 * c * n + n * n
+        return True
+
+    def total(self) -> int:
+        return self.recent + self.base
+
+    def forecast(self) -> dict:
+        """Call after advance(today). Constant work: only the recent week is read day by day."""
+        r, b = self.recent_days, self.span - self.recent_days
+        mean = self.base / b
+        # Poisson floor: a flat or empty baseline still allows for chance variation
+        var = max(self.base_sq / b - mean * mean, mean, 1.0 / b)
+        expected7 = r * mean
+        z = (self.recent - expected7) / math.sqrt(r * var)
+
+        # The recent daily rate carries the next week; over 30 days it reverts to baseline
+        rate = self.recent / r
+        next7 = 7 * rate
+        next30 = 7 * rate + 23 * mean
+        # Risk = chance the coming 7 / 30 days are an outbreak period for this series
+        threshold7 = 7 * mean + FORECAST_ALERT_Z * math.sqrt(7 * var)
+        threshold30 = 30 * mean + FORECAST_ALERT_Z * math.sqrt(30 * var)
+        seven_day = exceedance(next7, threshold7)
+        thirty_day = exceedance(next30, threshold30)
+        # 95% interval from the uncertainty in the observed recent count
+        spread = 1.96 * math.sqrt(max(self.recent, 1)) * 7 / r
+        interval = [exceedance(max(0.0, next7 - spread), threshold7), exceedance(next7 + spread, threshold7)]
+
+        # Peak: the busiest recent day once counts are falling, else the end of the horizon
+        peak_day = None
+        if z >= FORECAST_ALERT_Z:
+            # Today is still filling up, so the trend compares the last three complete days
+            days = [(self.counts[(self.head - age) % self.span], self.head - age) for age in range(r)]
+            late = sum(c for c, _ in days[1:4]) / 3
+            early = sum(c for c, _ in days[4:]) / max(1, r - 4)
+            peak_day = max(days)[1] if late < early else self.head + 7
+
+        return {
+            "z_score": z,
+            "seven_day_risk": seven_day,
+            "thirty_day_risk": thirty_day,
+            "confidence_interval": interval,
+            "peak_day": peak_day,
+            "recent": self.recent,
+            "baseline_daily_mean": mean,
+        }
+
+
+class OutbreakForecaster:
+    """Used from the event loop only, so no locking."""
+    def __init__(self, data: dict, recent_days: int = FORECAST_RECENT_DAYS,
+                 baseline_days: int = FORECAST_BASELINE_DAYS, max_series: int = FORECAST_MAX_SERIES,
+                 max_patients: int = FORECAST_MAX_PATIENTS):
+        self.version = data.get("version", 1)
+        self.labels = dict(data.get("syndromes", {}))
+        self.recent_days, self.baseline_days = recent_days, baseline_days
+        self.max_series, self.max_patients = max_series, max_patients
+        self.automaton = AhoCorasick()
+        for language, groups in data.get("keywords", {}).items():
+            for syndrome, terms in groups.items():
+                if syndrome not in self.labels:
+                    raise ValueError(f"{language}: unknown syndrome '{syndrome}'")
+                for term in terms:
+                    key = normalize_text(term).rstrip(" ")
+                    if key.strip():
+                        self.automaton.add(key, syndrome)
+        self.automaton.build()
+
+        self.series = OrderedDict()         # (district, mandal, syndrome) -> DailySeries, LRU by update
+        self.watermarks = OrderedDict()     # patient key -> newest log timestamp counted (ms)
+        self.events = 0
+        self.stale = 0                      # older than the window when they arrived
+        self.evicted_series = 0
+
+    @classmethod
+    def from_file(cls, path: str = SYMPTOM_SYNDROMES_PATH) -> "OutbreakForecaster":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def classify(self, text: str) -> set:
+        found = {syndrome for _, syndrome in self.automaton.iter(normalize_text(text))}
+        return found or {OTHER}
+
+    def syndromes_for(self, texts) -> set:
+        """Syndromes present in a patient's complaint and recent logs ('other' excluded)."""
+        found = set()
+        for text in texts:
+            if text:
+                found |= self.classify(text)
+        found.discard(OTHER)
+        return found
+
+    def _series(self, key: tuple, day: int) -> DailySeries:
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = DailySeries(self.recent_days, self.baseline_days, day)
+            if len(self.series) > self.max_series:
+                self.series.popitem(last=False)
+                self.evicted_series += 1
+        else:
+            self.series.move_to_end(key)
+        return series
+
+    def ingest(self, patient_key: str, district: str, mandal: str, symptoms: list, now_ms: float = None) -> int:
+        """
+        Counts the symptom logs newer than this patient's high-water mark. Logs without a
+        timestamp cannot be told apart from resends and are skipped. Returns events added.
+        """
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        district, mandal = _region(district), _region(mandal)
+        if not district or not symptoms:
+            return 0
+        last = self.watermarks.get(patient_key, 0)
+        newest, added = last, 0
+        for entry in symptoms:
+            try:
+                ts = float(entry.get("timestamp"))
+            except (AttributeError, TypeError, ValueError):
+                continue
+            # A device clock running ahead must not push the watermark past now, or every
+            # real log after it would be skipped as already counted
+            ts = min(ts, now_ms)
+            if ts <= last:
+                continue
+            newest = max(newest, ts)
+            day = int(ts // DAY_MS)
+            text = entry.get("complaint") or entry.get("name") or ""
+            counted = False
+            for syndrome in self.classify(text) | {ALL}:
+                for area in (mandal, ALL):
+                    counted |= self._series((district, area, syndrome), day).add(day)
+            if counted:
+                added += 1
+            else:
+                self.stale += 1
+
+        if newest > last:
+            self.watermarks[patient_key] = newest
+            self.watermarks.move_to_end(patient_key)
+            if len(self.watermarks) > self.max_patients:
+                self.watermarks.popitem(last=False)
+        self.events += added
+        return added
+
+    def forecast(self, district: str, mandal: str, syndromes=(), now_ms: float = None) -> Optional[dict]:
+        """
+        The most anomalous of the patient's syndromes (and all syndromes together) in their
+        mandal and district, or None while every candidate series is too sparse.
+        """
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        today = int(now_ms // DAY_MS)
+        district, mandal = _region(district), _region(mandal)
+        best = None
+        for syndrome in (*syndromes, ALL):
+            for area in (mandal, ALL):
+                series = self.series.get((district, area, syndrome))
+                if series is None:
+                    continue
+                series.advance(today)
+                if series.total() < FORECAST_MIN_EVENTS:
+                    continue
+                result = series.forecast()
+                if best is None or result["z_score"] > best["z_score"]:
+                    best = dict(result, syndrome=syndrome, area=area)
+        if best is not None and best["peak_day"] is not None:
+            best["peak_date"] = (datetime(1970, 1, 1) + timedelta(days=best["peak_day"])).strftime("%Y-%m-%d")
+        return best
+
+    def stats(self) -> dict:
+        return {"version": self.version, "syndromes": len(self.labels), "series": len(self.series),
+                "patients": len(self.watermarks), "events": self.events, "stale": self.stale,
+                "evicted_series": self.evicted_series}
+
+
+def _region(name: str) -> str:
+    name = " ".join((name or "").split()).casefold()
+    return "" if name == "unknown" else name
+
+
+_forecaster = None
+_forecaster_lock = threading.Lock()
+
+
+def get_outbreak_forecaster() -> OutbreakForecaster:
+    global _forecaster
+    if _forecaster is None:
+        with _forecaster_lock:
+            if _forecaster is None:
+                _forecaster = OutbreakForecaster.from_file()
+                print(f"[Forecast] Outbreak forecaster ready: {_forecaster.stats()}")
+    return _forecaster
@@ -0,0 +1,123 @@
+"""
+Parity of batch scoring with the scalar path: score_batch / predict_batch /
+predict_many must give, row for row, exactly what predict() and get_organ_stress()
+give, on the rule-based fallback and on a trained model (sklearn and compiled forest),
+including values sitting on the .5 ties that round() and np.round resolve differently.
+"""
+import itertools
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import ml_engine
+from ml_engine import HealthRiskModel, _round_exact, profile_features, profiles_to_columns
+from models import UserProfile
+
+COLUMNS = ["Sex", "Age", "BMI", "GenHlth", "Diabetes", "HighBP", "HeartDiseaseorAttack"]
+
+
+def _profiles():
+    rng = np.random.default_rng(3)
+    flags = ["hasDiabetes", "hasHighBP", "hasHeartDisease", "hasLiverDisease", "hasKidneyDisease"]
+    profiles = []
+    for i, combo in enumerate(itertools.product([False, True], repeat=len(flags))):
+        for _ in range(6):
+            profiles.append(UserProfile(
+                name=f"p{i}", age=int(rng.integers(18, 90)), gender=str(rng.choice(["male", "female"])),
+                # Whole and half kilograms land BMI and the rule terms on rounding ties
+                weight=float(rng.integers(80, 240)) / 2, **dict(zip(flags, combo)),
+            ))
+    return profiles
+
+
+def _scalar(engine, profile):
+    record = engine.predict(profile_features(profile))
+    return record, engine.get_organ_stress(profile, record["risk_probability"])
+
+
+def _assert_parity(engine, profiles):
+    batch = engine.score_batch(profiles)
+    for i, profile in enumerate(profiles):
+        record, stress = _scalar(engine, profile)
+        assert batch["risk_probability"][i] == record["risk_probability"]
+        assert batch["risk_level"][i] == record["risk_level"]
+        assert batch["vitality_score"][i] == record["vitality_score"]
+        assert batch["confidence"][i] == record["confidence"]
+        assert batch["source"] == record["source"]
+        for organ, value in stress.items():
+            assert batch["organ_stress"][organ][i] == value, (organ, i)
+
+    # Columnar input is the same computation as the profile list
+    columnar = engine.score_batch(profiles_to_columns(profiles))
+    assert np.array_equal(columnar["risk_probability"], batch["risk_probability"])
+
+    many = engine.predict_many([profile_features(p) for p in profiles])
+    assert many == [engine.predict(profile_features(p)) for p in profiles]
+
+
+@pytest.fixture
+def trained_paths(tmp_path):
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.integers(0, 2, 800), rng.integers(18, 90, 800), rng.normal(26, 5, 800).round(1),
+        rng.integers(1, 6, 800), rng.integers(0, 2, 800), rng.integers(0, 2, 800), rng.integers(0, 2, 800),
+    ]).astype(float)
+    y = (X[:, 1] / 90 + X[:, 3] / 5 + X[:, 6] + rng.normal(0, 0.3, 800) > 1.4).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(scaler.transform(X), y)
+    paths = {}
+    for name, obj in (("model_path", model), ("scaler_path", scaler), ("columns_path", COLUMNS)):
+        path = tmp_path / f"{name}.pkl"
+        with open(path, "wb") as f:
+            pickle.dump(obj, f)
+        paths[name] = str(path)
+    return paths
+
+
+def test_rule_based_batch_matches_scalar(tmp_path):
+    engine = HealthRiskModel(model_path=str(tmp_path / "missing.pkl"))
+    assert not engine.is_loaded
+    _assert_parity(engine, _profiles())
+
+
+@pytest.mark.parametrize("compiled", [False, True], ids=["sklearn", "compiled_forest"])
+def test_model_batch_matches_scalar(trained_paths, compiled, monkeypatch):
+    monkeypatch.setattr(ml_engine, "ML_COMPILED_FOREST", compiled)
+    engine = HealthRiskModel(**trained_paths)
+    assert engine.is_loaded
+    assert (engine.compiled is not None) == compiled
+    _assert_parity(engine, _profiles())
+
+
+def test_organ_stress_batch_matches_scalar_on_ties(tmp_path):
+    engine = HealthRiskModel(model_path=str(tmp_path / "missing.pkl"))
+    profiles = _profiles()[:32]
+    # Probabilities on a 1/1000 grid put 0.15 + p * 0.25 and friends on .xx5 ties
+    risk = np.arange(0, 1001) / 1000
+    for profile in profiles:
+        columns = profiles_to_columns([profile] * len(risk))
+        batch = engine.get_organ_stress_batch(columns, risk)
+        for i, p in enumerate(risk.tolist()):
+            scalar = engine.get_organ_stress(profile, p)
+            assert {k: batch[k][i] for k in scalar} == scalar, (profile, p)
+
+
+def test_round_exact_matches_round_on_half_way_values():
+    rng = np.random.default_rng(7)
+    # x.5 at the rounding digit, built both exactly (k + 0.5) / 10**d and by arithmetic
+    values = np.concatenate([
+        (np.arange(-2000, 2000) + 0.5) / 100,
+        (np.arange(0, 20000) + 0.5) / 10000,
+        0.15 + (np.arange(0, 1001) / 1000) * 0.25,
+        rng.uniform(0, 1, 5000),
+    ])
+    for decimals in (2, 4):
+        product = values * 10.0 ** decimals
+        assert np.count_nonzero(np.abs(product - np.floor(product) - 0.5) < 1e-7) > 100
+        expected = np.array([round(v, decimals) for v in values.tolist()])
+        assert np.array_equal(_round_exact(values, decimals), expected)
+    # np.round alone disagrees somewhere, or this test would not exercise anything
+    assert not np.array_equal(np.round(values, 2), np.array([round(v, 2) for v in values.tolist()]))
@@ -0,0 +1,84 @@
+"""
+Circuit breaker transitions: closed -> open after the failure threshold, open ->
+half-open after the reset interval with a single probe, and the probe closing or
+re-opening the circuit.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def _tripped(clock) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_opens_after_consecutive_failures_only(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()                # a success resets the run
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["trips"] == 1
+
+
+def test_open_circuit_short_circuits_until_reset(clock):
+    breaker = _tripped(clock)
+    clock.now += 29.9
+    assert not breaker.allow()
+    assert not breaker.allow()
+    assert breaker.stats()["short_circuited"] == 2
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success(clock):
+    breaker = _tripped(clock)
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()              # one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    assert breaker.stats()["consecutive_failures"] == 0
+
+
+def test_failed_probe_reopens_for_another_interval(clock):
+    breaker = _tripped(clock)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["trips"] == 2
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_probe_that_never_reports_expires(clock):
+    breaker = _tripped(clock)
+    clock.now += 30
+    assert breaker.allow()                  # probe cancelled before it could report
+    clock.now += 10
+    assert not breaker.allow()
+    clock.now += 20
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
@@ -0,0 +1,80 @@
+"""
+Request deadline helpers: parsing the client header, the budget actually applied, and
+the per-call timeout capped at the time left.
+"""
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+
+from utils import deadline
+from utils.deadline import (DEADLINE_MIN_CALL_MS, REQUEST_DEADLINE_MAX_MS, REQUEST_DEADLINE_MS, applied_budget_ms,
+                            call_budget, current_budget_ms, expired, parse_deadline_ms, remaining, start_deadline)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=500.0)
+    monkeypatch.setattr(deadline, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def _in_request(fn):
+    """Runs fn in a fresh context, as each request task does."""
+    return contextvars.Context().run(fn)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2500", 2500.0), ("1500.5", 1500.5), (800, 800.0),
+    (None, None), ("", None), ("soon", None), ("0", None), ("-10", None),
+])
+def test_parse_deadline_ms(value, expected):
+    assert parse_deadline_ms(value) == expected
+
+
+def test_applied_budget_defaults_and_caps():
+    assert applied_budget_ms() == REQUEST_DEADLINE_MS
+    assert applied_budget_ms(None) == REQUEST_DEADLINE_MS
+    assert applied_budget_ms(4000) == 4000.0
+    assert applied_budget_ms(REQUEST_DEADLINE_MAX_MS * 10) == REQUEST_DEADLINE_MAX_MS
+    # An int and a float budget must key single-flights the same way
+    assert repr(applied_budget_ms(25000)) == repr(applied_budget_ms(25000.0))
+
+
+def test_outside_a_request_calls_keep_their_own_timeout():
+    def check():
+        assert remaining() is None
+        assert current_budget_ms() is None
+        assert not expired()
+        return call_budget(15.0)
+    assert _in_request(check) == 15.0
+
+
+def test_call_budget_is_capped_at_the_time_left(clock):
+    def check():
+        assert start_deadline(2000) == 2000.0
+        assert current_budget_ms() == 2000.0
+        first = call_budget(15.0)
+        clock.now += 1.5
+        second = call_budget(15.0)
+        clock.now += 0.5 - (DEADLINE_MIN_CALL_MS - 1) / 1000
+        too_late = call_budget(15.0)
+        clock.now += 1
+        return first, second, too_late, expired()
+    first, second, too_late, gone = _in_request(check)
+    assert first == pytest.approx(2.0)
+    assert second == pytest.approx(0.5)
+    assert too_late is None                 # under DEADLINE_MIN_CALL_MS left: not started
+    assert gone
+
+
+def test_call_budget_keeps_a_shorter_timeout(clock):
+    def check():
+        start_deadline(30_000)
+        return call_budget(15.0)
+    assert _in_request(check) == 15.0
+
+
+def test_deadlines_do_not_leak_between_requests(clock):
+    _in_request(lambda: start_deadline(1000))
+    assert _in_request(remaining) is None
@@ -0,0 +1,82 @@
+"""
+Parity of the compiled forest with scikit-learn's predict_proba: exact, through a save
+and a memory-mapped reload, for binary and multiclass RandomForest/ExtraTrees models and
+for inputs sitting exactly on split thresholds.
+"""
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from forest_compiler import CompiledForest, compile_forest
+
+
+def _data(n_classes: int, seed: int = 0):
+    X, y = make_classification(n_samples=600, n_features=8, n_informative=5, n_redundant=1,
+                               n_classes=n_classes, random_state=seed)
+    # A coarse grid gives many repeated values, so plenty of ties at split thresholds
+    return np.round(X, 1), y
+
+
+def _on_thresholds(model, X: np.ndarray) -> np.ndarray:
+    """Rows copied from X with one feature set exactly to a split threshold (or one ulp off)."""
+    rng = np.random.default_rng(1)
+    rows = []
+    for est in model.estimators_[:5]:
+        tree = est.tree_
+        for node in np.flatnonzero(tree.children_left != -1)[:40]:
+            t = tree.threshold[node]
+            for value in (t, np.nextafter(t, -np.inf), np.nextafter(t, np.inf), np.float32(t)):
+                row = X[rng.integers(len(X))].copy()
+                row[tree.feature[node]] = value
+                rows.append(row)
+    return np.array(rows)
+
+
+# n_jobs=None: scikit-learn then sums the trees in order, which the compiled sum matches bit for bit
+MODELS = [
+    pytest.param(RandomForestClassifier(n_estimators=30, random_state=0), 2, id="random_forest_binary"),
+    pytest.param(RandomForestClassifier(n_estimators=30, min_samples_leaf=3, random_state=0), 4,
+                 id="random_forest_multiclass"),
+    pytest.param(ExtraTreesClassifier(n_estimators=30, max_depth=6, random_state=0), 2, id="extra_trees_binary"),
+    pytest.param(ExtraTreesClassifier(n_estimators=30, max_depth=8, random_state=0), 3,
+                 id="extra_trees_multiclass"),
+]
+
+
+@pytest.mark.parametrize("model, n_classes", MODELS)
+def test_compiled_matches_predict_proba(model, n_classes, tmp_path):
+    X, y = _data(n_classes)
+    model.fit(X[:400], y[:400])
+    probe = np.vstack([X, _on_thresholds(model, X)])
+
+    compiled = compile_forest(model)
+    assert np.array_equal(compiled.predict_proba(probe), model.predict_proba(probe))
+
+    path = str(tmp_path / "model.npz")
+    compiled.save(path)
+    loaded = CompiledForest.load(path)
+    assert isinstance(loaded.value, np.memmap) and loaded.value.mode == "r"
+    assert np.array_equal(loaded.predict_proba(probe), model.predict_proba(probe))
+
+
+def test_single_row_matches_batch():
+    X, y = _data(3)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    compiled = compile_forest(model)
+    batch = compiled.predict_proba(X[:20])
+    for i in range(20):
+        assert np.array_equal(compiled.predict_proba(X[i]), batch[i:i + 1])
+
+
+def test_rejects_other_format_versions(tmp_path):
+    X, y = _data(2)
+    compiled = compile_forest(RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y))
+    path = str(tmp_path / "model.npz")
+    compiled.save(path)
+    arrays = dict(np.load(path))
+    arrays["meta"] = arrays["meta"].copy()
+    arrays["meta"][0] = 1
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError, match="unsupported compiled format"):
+        CompiledForest.load(path)
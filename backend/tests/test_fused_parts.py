@@ -0,0 +1,28 @@
+"""
+Validation of fused-mode parts: a part that would not stand in for its section's own
+call must raise, so the section falls back to that call.
+"""
+import json
+
+import pytest
+
+from orchestrator import _FUSED_PARTS
+
+EHR = {"chief_complaint": "Fever for 2 days", "hpi": "Intermittent fever with chills, no rash.",
+       "icd_10_code": "R50.9"}
+
+
+@pytest.mark.parametrize("part", [None, {}, [], "ehr", {"icd_10_code": "R50.9"},
+                                  {"chief_complaint": "Fever"}, {"chief_complaint": "", "hpi": "x"}])
+def test_ehr_part_without_core_fields_is_rejected(part):
+    with pytest.raises(Exception):
+        _FUSED_PARTS["ehr"](part)
+
+
+def test_complete_ehr_part_is_used():
+    assert json.loads(_FUSED_PARTS["ehr"](EHR)) == EHR
+
+
+def test_triage_part_must_be_an_object():
+    with pytest.raises(Exception):
+        _FUSED_PARTS["triage"]({})
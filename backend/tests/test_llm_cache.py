@@ -0,0 +1,134 @@
+"""
+LLM response cache: key canonicalisation, per-section TTLs and opt-in, LRU eviction,
+the SQLite (WAL) tier surviving a restart, and call_groq only caching the sections
+listed in LLM_CACHE_SECTIONS.
+"""
+import asyncio
+import sqlite3
+
+import httpx
+import pytest
+
+import orchestrator
+from utils import llm_cache as llm_cache_module
+from utils.http_client import http_client
+from utils.llm_cache import LLMResponseCache, cache_key
+
+
+class Clock:
+    def __init__(self, now: float = 1_800_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache_module.time, "time", clock)
+    return clock
+
+
+def test_cache_key_is_canonical():
+    key = cache_key("llama3-8b-8192", "Summarise: फीवर", 0.3, True)
+    assert key == cache_key("llama3-8b-8192", "Summarise: फीवर", 0.3, 1)
+    assert len(key) == 64
+    variants = [
+        cache_key("llama3-70b", "Summarise: फीवर", 0.3, True),
+        cache_key("llama3-8b-8192", "Summarise: फीवर ", 0.3, True),
+        cache_key("llama3-8b-8192", "Summarise: फीवर", 0.7, True),
+        cache_key("llama3-8b-8192", "Summarise: फीवर", 0.3, False),
+    ]
+    assert len({key, *variants}) == 5
+
+
+def test_entries_expire_after_their_section_ttl(clock, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_TTL_TRIAGE", "60")
+    cache = LLMResponseCache(sqlite_path="")
+    assert cache.ttl_for("triage") == 60
+    assert cache.ttl_for("ayush") == llm_cache_module.DEFAULT_TTLS["ayush"]
+    assert cache.ttl_for("unknown") == llm_cache_module.DEFAULT_TTL
+
+    async def main():
+        await cache.set("k", "triage answer", "triage")
+        clock.now += 59
+        first = await cache.get("k")
+        clock.now += 2
+        return first, await cache.get("k")
+    assert asyncio.run(main()) == ("triage answer", None)
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMResponseCache(max_entries=2, sqlite_path="")
+
+    async def main():
+        await cache.set("a", "A")
+        await cache.set("b", "B")
+        await cache.get("a")            # b is now the least recently used
+        await cache.set("c", "C")
+        return [await cache.get(k) for k in ("a", "b", "c")]
+    assert asyncio.run(main()) == ["A", None, "C"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_tier_survives_a_restart(tmp_path, clock):
+    path = str(tmp_path / "llm_cache.sqlite")
+
+    async def write():
+        cache = LLMResponseCache(sqlite_path=path)
+        await cache.set("kept", "summary text", "summary")
+        await cache.set("stale", "triage text", "triage")
+        cache.disk.close()
+    asyncio.run(write())
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    # A fresh process (or another worker) starts with an empty memory tier
+    clock.now += llm_cache_module.DEFAULT_TTLS["triage"] + 1
+    cache = LLMResponseCache(sqlite_path=path)
+
+    async def read():
+        return await cache.get("kept"), await cache.get("stale"), await cache.get("kept")
+    assert asyncio.run(read()) == ("summary text", None, "summary text")
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1          # the second read is served from memory
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    cache.disk.close()
+
+
+def test_sections_opt_in_and_out(monkeypatch):
+    cache = LLMResponseCache(sqlite_path="")
+    monkeypatch.setattr(llm_cache_module, "LLM_CACHE_SECTIONS", ["triage", "summary"])
+    assert cache.enabled_for("triage")
+    assert not cache.enabled_for("ehr")
+    assert not cache.enabled_for(None)
+    monkeypatch.setattr(llm_cache_module, "LLM_CACHE_ENABLED", False)
+    assert not cache.enabled_for("triage")
+
+
+def test_call_groq_caches_only_listed_sections(monkeypatch):
+    calls = []
+
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": f"answer {len(calls)}"}}]})
+
+    cache = LLMResponseCache(sqlite_path="")
+    monkeypatch.setattr(orchestrator, "llm_cache", cache)
+    monkeypatch.setattr(llm_cache_module, "LLM_CACHE_SECTIONS", ["triage"])
+
+    async def main():
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        engine = orchestrator.HealthIntelligenceOrchestrator()
+        try:
+            return [await engine.call_groq("Same prompt", section=s) for s in ("triage", "triage", "ehr", "ehr")]
+        finally:
+            await http_client.aclose()
+    assert asyncio.run(main()) == ["answer 1", "answer 1", "answer 2", "answer 3"]
+    assert len(calls) == 3
+    assert cache.stats()["stores"] == 1
@@ -0,0 +1,82 @@
+"""
+Single-flight sharing of identical LLM prompts in call_groq, against a mock upstream:
+requests on different deadline budgets must not share a call, since the shared call runs
+under its starter's deadline, and a call abandoned mid-flight must settle its quota.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from orchestrator import HealthIntelligenceOrchestrator
+from utils.deadline import start_deadline
+from utils.http_client import http_client
+from utils.llm_scheduler import llm_scheduler
+
+UPSTREAM_SECONDS = 1.0
+PROMPT = "Return the triage JSON for: fever and headache since 2 days."
+
+
+async def _slow_upstream(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(UPSTREAM_SECONDS)
+    return httpx.Response(200, json={"choices": [{"message": {"content": '{"triage_level": "Moderate"}'}}]})
+
+
+async def _call(orchestrator, budget_ms: float):
+    # Each caller is its own task, so it has its own request deadline, as under process()
+    start_deadline(budget_ms)
+    t0 = time.perf_counter()
+    content = await orchestrator.call_groq(PROMPT, json_mode=True, section="ehr")
+    return content, time.perf_counter() - t0
+
+
+def _run(budgets):
+    async def main():
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(_slow_upstream))
+        orchestrator = HealthIntelligenceOrchestrator()
+        try:
+            results = await asyncio.gather(*[asyncio.create_task(_call(orchestrator, b)) for b in budgets])
+        finally:
+            await http_client.aclose()
+        return results, orchestrator.llm_flights.stats()
+    return asyncio.run(main())
+
+
+def test_tight_deadline_does_not_hand_its_placeholder_to_a_patient_caller():
+    (tight, patient), flights = _run([400, 20_000])
+    assert tight[0] == "{}"
+    assert tight[1] < UPSTREAM_SECONDS
+    assert patient[0] == '{"triage_level": "Moderate"}'
+    assert patient[1] >= UPSTREAM_SECONDS
+    assert flights["coalesced"] == 0
+    assert flights["started"] == 2
+
+
+def test_same_budget_callers_share_one_call():
+    (first, second), flights = _run([20_000, 20_000])
+    assert first[0] == second[0] == '{"triage_level": "Moderate"}'
+    assert flights["coalesced"] == 1
+    assert flights["started"] == 1
+
+
+def test_abandoned_call_returns_its_token_reservation():
+    async def main():
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(_slow_upstream))
+        orchestrator = HealthIntelligenceOrchestrator()
+        # From a full bucket the refill during the call is capped, so any leak shows
+        llm_scheduler.tokens.refill(time.monotonic())
+        llm_scheduler.tokens.level = before = llm_scheduler.tokens.capacity
+        # The only waiter leaving cancels the shared upstream call mid-request
+        task = asyncio.create_task(_call(orchestrator, 20_000))
+        await asyncio.sleep(0.2)
+        assert llm_scheduler.tokens.level < before
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        await http_client.aclose()
+        return before, orchestrator.llm_flights.stats()
+    before, flights = asyncio.run(main())
+    assert flights["abandoned"] == 1
+    assert llm_scheduler.tokens.level == pytest.approx(before, abs=1)
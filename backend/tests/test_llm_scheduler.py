@@ -0,0 +1,65 @@
+"""
+Quota accounting of the LLM scheduler: a waiter that times out or is cancelled after
+being granted hands its tokens back, so the bucket does not leak quota.
+"""
+import asyncio
+
+import pytest
+
+from utils.llm_scheduler import LLMScheduler
+
+
+def _queued_scheduler():
+    # One request per minute, already spent: the next acquire has to queue
+    scheduler = LLMScheduler(rpm=1, tpm=10_000, enabled=True)
+    scheduler.requests.level = 0.0
+    return scheduler
+
+
+def _grant_head(scheduler):
+    scheduler.requests.level = 1.0
+    scheduler._dispatch()
+
+
+def test_waiter_cancelled_after_grant_returns_its_quota():
+    async def main():
+        scheduler = _queued_scheduler()
+        task = asyncio.create_task(scheduler.acquire("triage", 500))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["waiting_by_lane"][0] == 1
+
+        _grant_head(scheduler)
+        assert scheduler.tokens.level == pytest.approx(9_500, abs=1)
+        task.cancel()       # before the waiter resumes to take its grant
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return scheduler
+    scheduler = asyncio.run(main())
+    assert scheduler.tokens.level == pytest.approx(10_000, abs=1)
+    assert scheduler.requests.level == pytest.approx(1.0, abs=0.01)
+    assert scheduler.granted == 0
+
+
+def test_waiter_cancelled_while_queued_takes_nothing():
+    async def main():
+        scheduler = _queued_scheduler()
+        task = asyncio.create_task(scheduler.acquire("ayush", 500, timeout=5))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        _grant_head(scheduler)
+        return scheduler
+    scheduler = asyncio.run(main())
+    assert scheduler.tokens.level == pytest.approx(10_000, abs=1)
+    assert scheduler.granted == 0
+
+
+def test_timed_out_waiter_returns_none():
+    async def main():
+        scheduler = _queued_scheduler()
+        return scheduler, await scheduler.acquire("summary", 500, timeout=0.05)
+    scheduler, waited = asyncio.run(main())
+    assert waited is None
+    assert scheduler.timed_out == 1
+    assert scheduler.tokens.level == pytest.approx(10_000, abs=1)
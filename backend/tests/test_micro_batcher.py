@@ -0,0 +1,72 @@
+"""
+Micro-batcher: concurrent submits share one batch call and each get their own result,
+errors reach every caller in the batch, and a batch in progress stays referenced.
+"""
+import asyncio
+import gc
+
+from utils.micro_batcher import MicroBatcher
+
+
+def test_concurrent_submits_share_one_batch():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(batch_fn, window_ms=5, max_batch_size=64, enabled=True)
+        return await asyncio.gather(*[batcher.submit(i) for i in range(10)]), batcher
+    results, batcher = asyncio.run(main())
+    assert results == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))]
+    assert batcher.stats()["batches"] == 1
+
+
+def test_full_batch_flushes_without_waiting_for_the_window():
+    async def batch_fn(items):
+        return items
+
+    async def main():
+        batcher = MicroBatcher(batch_fn, window_ms=10_000, max_batch_size=4, enabled=True)
+        return await asyncio.wait_for(asyncio.gather(*[batcher.submit(i) for i in range(8)]), 1), batcher
+    results, batcher = asyncio.run(main())
+    assert results == list(range(8))
+    assert batcher.stats()["batches"] == 2
+
+
+def test_batch_error_reaches_every_caller():
+    def batch_fn(items):
+        raise RuntimeError("model offline")
+
+    async def main():
+        batcher = MicroBatcher(batch_fn, window_ms=1, enabled=True)
+        return await asyncio.gather(*[batcher.submit(i) for i in range(3)], return_exceptions=True), batcher
+    results, batcher = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.stats()["errors"] == 1
+
+
+def test_running_batch_is_held_until_it_settles():
+    release = None
+
+    async def batch_fn(items):
+        await release.wait()
+        return items
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        batcher = MicroBatcher(batch_fn, window_ms=1, enabled=True)
+        waiter = asyncio.ensure_future(batcher.submit("row"))
+        await asyncio.sleep(0.02)
+        assert len(batcher._running) == 1
+        gc.collect()
+        release.set()
+        result = await asyncio.wait_for(waiter, 1)
+        await asyncio.sleep(0)
+        return result, batcher
+    result, batcher = asyncio.run(main())
+    assert result == "row"
+    assert not batcher._running
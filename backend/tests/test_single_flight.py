@@ -0,0 +1,112 @@
+"""
+Single-flight coalescing: concurrent callers share one task and its result or error,
+a waiter leaving does not cancel the work for the others, the task is abandoned once
+every waiter has left, and nothing is kept after it settles.
+"""
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight, canonical_hash
+
+
+class Work:
+    def __init__(self, seconds=0.05, error=None):
+        self.seconds, self.error = seconds, error
+        self.started = self.finished = self.cancelled = 0
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        self.finished += 1
+        return {"answer": 42}
+
+
+def test_canonical_hash_ignores_key_order():
+    assert canonical_hash({"a": 1, "b": [1, {"x": 2, "y": 3}]}) == canonical_hash({"b": [1, {"y": 3, "x": 2}], "a": 1})
+    assert canonical_hash({"a": 1}) != canonical_hash({"a": 2})
+
+
+def test_concurrent_callers_share_one_run():
+    flights, work = SingleFlight("test", enabled=True), Work()
+
+    async def main():
+        return await asyncio.gather(*[flights.do("k", work) for _ in range(5)])
+    results = asyncio.run(main())
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+    assert work.started == 1
+    assert flights.stats() == {"enabled": True, "in_flight": 0, "started": 1, "coalesced": 4, "abandoned": 0}
+
+
+def test_errors_reach_every_waiter():
+    flights, work = SingleFlight("test", enabled=True), Work(error=RuntimeError("upstream down"))
+
+    async def main():
+        return await asyncio.gather(*[flights.do("k", work) for _ in range(3)], return_exceptions=True)
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert work.started == 1
+
+
+def test_settled_flights_are_not_cached():
+    flights, work = SingleFlight("test", enabled=True), Work(seconds=0)
+
+    async def main():
+        await flights.do("k", work)
+        await flights.do("k", work)
+    asyncio.run(main())
+    assert work.started == 2
+    assert flights.stats()["coalesced"] == 0
+
+
+def test_disabled_runs_every_call():
+    flights, work = SingleFlight("test", enabled=False), Work()
+
+    async def main():
+        return await asyncio.gather(*[flights.do("k", work) for _ in range(3)])
+    assert [shared for _, shared in asyncio.run(main())] == [False, False, False]
+    assert work.started == 3
+
+
+def test_a_waiter_leaving_does_not_cancel_the_others():
+    flights, work = SingleFlight("test", enabled=True), Work(seconds=0.1)
+
+    async def main():
+        leaver = asyncio.create_task(flights.do("k", work))
+        stayer = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0.02)
+        leaver.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return await stayer
+    result, shared = asyncio.run(main())
+    assert result == {"answer": 42} and shared
+    assert work.cancelled == 0 and work.finished == 1
+    assert flights.stats()["abandoned"] == 0
+
+
+def test_task_is_abandoned_when_the_last_waiter_leaves():
+    flights, work = SingleFlight("test", enabled=True), Work(seconds=1)
+
+    async def main():
+        waiters = [asyncio.create_task(flights.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        # The key is free again: a new caller starts fresh work
+        return await flights.do("k", Work(seconds=0))
+    result, shared = asyncio.run(main())
+    assert not shared
+    assert work.cancelled == 1 and work.finished == 0
+    stats = flights.stats()
+    assert stats["abandoned"] == 1
+    assert stats["in_flight"] == 0
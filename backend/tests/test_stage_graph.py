@@ -0,0 +1,121 @@
+"""
+Stage graph: construction errors (duplicates, missing inputs, cycles), stages starting
+as soon as their inputs settle, skipped and failed stages, and the critical path.
+"""
+import asyncio
+
+import pytest
+
+from utils.stage_graph import Stage, StageGraph
+
+
+def _stage(name, inputs=(), seconds=0.0, result=None, when=None, log=None):
+    async def run(request, results):
+        if log is not None:
+            log.append(("start", name, {d: results.get(d) for d in inputs}))
+        await asyncio.sleep(seconds)
+        if isinstance(result, Exception):
+            raise result
+        return name if result is None else result
+    return Stage(name, run, inputs, when)
+
+
+def test_duplicate_stage_names_are_rejected():
+    with pytest.raises(ValueError, match="Duplicate"):
+        StageGraph([_stage("a"), _stage("a")])
+
+
+def test_missing_input_is_rejected():
+    with pytest.raises(ValueError, match="unknown stage 'bio'"):
+        StageGraph([_stage("triage", ["bio"])])
+
+
+@pytest.mark.parametrize("stages", [
+    [_stage("a", ["a"])],
+    [_stage("a", ["c"]), _stage("b", ["a"]), _stage("c", ["b"])],
+])
+def test_cycles_are_rejected(stages):
+    with pytest.raises(ValueError, match="Cycle"):
+        StageGraph(stages)
+
+
+def test_inputs_come_before_their_dependents():
+    graph = StageGraph([_stage("summary", ["ehr", "triage"]), _stage("ehr", ["bio"]),
+                        _stage("triage", ["bio"]), _stage("bio")])
+    order = graph.order
+    assert order.index("bio") < order.index("ehr") < order.index("summary")
+    assert order.index("triage") < order.index("summary")
+
+
+def test_independent_stages_overlap_and_see_their_inputs():
+    log = []
+    graph = StageGraph([
+        _stage("bio", seconds=0.02, log=log),
+        _stage("ehr", ["bio"], seconds=0.1, log=log),
+        _stage("triage", ["bio"], seconds=0.1, log=log),
+        _stage("summary", ["ehr", "triage"], log=log),
+    ])
+    run = asyncio.run(graph.run(request=None))
+    assert run.results == {"bio": "bio", "ehr": "ehr", "triage": "triage", "summary": "summary"}
+    assert ("start", "summary", {"ehr": "ehr", "triage": "triage"}) in log
+    # ehr and triage ran side by side, not one after the other
+    assert run.total_ms < 200
+    assert run.timings["triage"]["start_ms"] < run.timings["ehr"]["end_ms"]
+
+
+def test_skipped_and_failed_stages_give_none_to_dependents():
+    log = []
+    graph = StageGraph([
+        _stage("vision", when=lambda request: request.get("image")),
+        _stage("bio", result=RuntimeError("model offline")),
+        _stage("summary", ["vision", "bio"], log=log),
+    ])
+    completed = []
+    run = asyncio.run(graph.run({"image": None}, on_complete=lambda name, result: completed.append((name, result))))
+    assert run.skipped == ["vision"]
+    assert isinstance(run.errors["bio"], RuntimeError)
+    assert log == [("start", "summary", {"vision": None, "bio": None})]
+    assert sorted(completed) == [("bio", None), ("summary", "summary")]
+
+
+def test_async_on_complete_is_awaited():
+    seen = []
+
+    async def on_complete(name, result):
+        await asyncio.sleep(0)
+        seen.append(name)
+    asyncio.run(StageGraph([_stage("a"), _stage("b", ["a"])]).run(None, on_complete=on_complete))
+    assert seen == ["a", "b"]
+
+
+def test_critical_path_follows_the_input_that_released_each_stage():
+    graph = StageGraph([
+        _stage("bio", seconds=0.01),
+        _stage("nutrition", seconds=0.01),
+        _stage("ehr", ["bio"], seconds=0.12),
+        _stage("triage", ["bio"], seconds=0.02),
+        _stage("summary", ["ehr", "triage", "nutrition"], seconds=0.01),
+    ])
+    run = asyncio.run(graph.run(None))
+    assert run.critical_path == ["bio", "ehr", "summary"]
+    assert run.duration_ms("ehr") >= 100
+    assert run.duration_ms("missing") == 0.0
+
+
+def test_cancelling_the_run_cancels_its_stages():
+    started, finished = [], []
+
+    async def slow(request, results):
+        started.append("slow")
+        await asyncio.sleep(1)
+        finished.append("slow")
+
+    async def main():
+        task = asyncio.create_task(StageGraph([Stage("slow", slow)]).run(None))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+    asyncio.run(main())
+    assert started == ["slow"] and finished == []
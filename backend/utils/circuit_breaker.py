@@ -0,0 +1,75 @@
+"""
+Circuit breaker for the Groq upstream.
+After CIRCUIT_FAILURE_THRESHOLD consecutive failures or timeouts the circuit opens and
+call_groq returns its placeholder at once, so sections take their rule-based fallbacks
+instead of each waiting out a timeout. After CIRCUIT_RESET_SECONDS one probe call is let
+through (half-open); it closes the circuit on success or re-opens it on failure.
+"""
+import os
+import time
+
+# ── Config ────────────────────────────────────────────────────────────────────
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS     = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Used from the event loop only, so no locking."""
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_started = None
+
+        self.trips = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        """True if a call may go upstream now. A False is counted as short-circuited."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            self._probe_started = None
+        if self.state == HALF_OPEN:
+            # One probe at a time; a probe that never reported (cancelled) expires
+            if self._probe_started is None or now - self._probe_started >= self.reset_seconds:
+                self._probe_started = now
+                return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            print(f"[Circuit] {self.name} closed after a successful probe")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probe_started = None
+            self.trips += 1
+            print(f"[Circuit] {self.name} opened after {self.consecutive_failures} consecutive failures; "
+                  f"retrying in {self.reset_seconds:g}s")
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+        }
+
+
+groq_breaker = CircuitBreaker("groq")
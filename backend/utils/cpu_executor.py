@@ -0,0 +1,138 @@
+"""
+Executor for CPU-bound work (model inference, large JSON parsing, pydantic validation)
+so it stops stalling in-flight Groq awaits on the event loop.
+
+CPU_EXECUTOR=thread   thread pool (default; numpy/pydantic-core release the GIL for much of the work)
+CPU_EXECUTOR=process  process pool; each worker loads HealthRiskModel once and keeps it
+CPU_EXECUTOR=inline   run on the loop (debugging / single-core boxes)
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# ── Config ────────────────────────────────────────────────────────────────────
+CPU_EXECUTOR_MODE     = os.getenv("CPU_EXECUTOR", "thread").lower()
+CPU_EXECUTOR_WORKERS  = int(os.getenv("CPU_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Payloads below this size are cheaper to handle inline than to hand off
+CPU_OFFLOAD_MIN_BYTES = int(os.getenv("CPU_OFFLOAD_MIN_BYTES", "32768"))
+
+
+# ── Worker-side functions (top level so the process pool can pickle them) ─────
+_WORKER_MODEL = None
+
+
+def _worker_model():
+    global _WORKER_MODEL
+    if _WORKER_MODEL is None:
+        from ml_engine import HealthRiskModel
+        _WORKER_MODEL = HealthRiskModel()
+    return _WORKER_MODEL
+
+
+def _init_worker():
+    _worker_model()
+
+
+def worker_predict_many(features_list: list) -> list:
+    return _worker_model().predict_many(features_list)
+
+
+def worker_score_batch(data) -> dict:
+    return _worker_model().score_batch(data)
+
+
+def worker_ping() -> int:
+    _worker_model()
+    return os.getpid()
+
+
+def validate_json(model_cls, raw):
+    return model_cls.model_validate_json(raw)
+
+
+def parse_json_model(model_cls, raw: str):
+    return model_cls(**json.loads(raw))
+
+
+class CPUExecutor:
+    def __init__(self, mode: str = CPU_EXECUTOR_MODE, workers: int = CPU_EXECUTOR_WORKERS):
+        if mode not in ("thread", "process", "inline"):
+            print(f"[Executor] Unknown CPU_EXECUTOR '{mode}', using 'thread'")
+            mode = "thread"
+        self.mode = mode
+        self.workers = max(1, workers)
+        self._pool = None
+
+        self.tasks = 0
+        self.inline_tasks = 0
+        self.in_flight = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        if self._pool is not None or self.mode == "inline":
+            return
+        if self.mode == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cpu")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn, *args):
+        """Runs fn(*args) on the configured executor. In process mode fn and args must pickle."""
+        if self.mode == "inline":
+            self.inline_tasks += 1
+            return fn(*args)
+        self.start()
+        self.tasks += 1
+        self.in_flight += 1
+        t0 = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.busy_seconds += time.perf_counter() - t0
+
+    async def run_sized(self, size: int, fn, *args):
+        """Offloads only when the payload is big enough to be worth the hand-off."""
+        if size < CPU_OFFLOAD_MIN_BYTES:
+            self.inline_tasks += 1
+            return fn(*args)
+        return await self.run(fn, *args)
+
+    async def loads(self, raw: str):
+        return await self.run_sized(len(raw or ""), json.loads, raw)
+
+    async def parse_model(self, model_cls, raw: str):
+        return await self.run_sized(len(raw or ""), parse_json_model, model_cls, raw)
+
+    async def validate(self, model_cls, raw: bytes):
+        return await self.run_sized(len(raw), validate_json, model_cls, raw)
+
+    async def warm(self):
+        """Starts the process workers (each loads the model in its initializer) ahead of traffic."""
+        if self.mode != "process":
+            return "skipped"
+        self.start()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self._pool, worker_ping) for _ in range(self.workers)))
+        return {"workers": sorted(set(pids))}
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "offload_min_bytes": CPU_OFFLOAD_MIN_BYTES,
+            "tasks": self.tasks,
+            "inline_tasks": self.inline_tasks,
+            "in_flight": self.in_flight,
+            "avg_task_ms": round(self.busy_seconds / self.tasks * 1000, 3) if self.tasks else 0.0,
+        }
+
+
+cpu_executor = CPUExecutor()
@@ -0,0 +1,71 @@
+"""
+End-to-end request deadline.
+process() sets an absolute deadline in a context variable (like the RequestTrace); stage
+tasks inherit it, so every call_groq is capped at the time the request has left instead
+of a fixed per-call timeout, and calls that could not finish in time are not started.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# ── Config ────────────────────────────────────────────────────────────────────
+REQUEST_DEADLINE_MS     = float(os.getenv("REQUEST_DEADLINE_MS", "25000"))
+REQUEST_DEADLINE_MAX_MS = float(os.getenv("REQUEST_DEADLINE_MAX_MS", "60000"))
+# An LLM call is not started with less than this left; the section falls back instead
+DEADLINE_MIN_CALL_MS    = float(os.getenv("DEADLINE_MIN_CALL_MS", "300"))
+DEADLINE_HEADER         = "X-Request-Deadline-Ms"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+_budget_ms: ContextVar[Optional[float]] = ContextVar("request_budget_ms", default=None)
+
+
+def parse_deadline_ms(value) -> Optional[float]:
+    """Client-supplied budget in ms (header value), or None when absent or malformed."""
+    try:
+        ms = float(value)
+    except (TypeError, ValueError):
+        return None
+    return ms if ms > 0 else None
+
+
+def applied_budget_ms(budget_ms: float = None) -> float:
+    """The budget a request asking for `budget_ms` actually gets (default, capped)."""
+    return float(min(budget_ms or REQUEST_DEADLINE_MS, REQUEST_DEADLINE_MAX_MS))
+
+
+def start_deadline(budget_ms: float = None) -> float:
+    """Starts the current request's clock; returns the budget in ms actually applied."""
+    budget_ms = applied_budget_ms(budget_ms)
+    _deadline.set(time.monotonic() + budget_ms / 1000)
+    _budget_ms.set(budget_ms)
+    return budget_ms
+
+
+def current_budget_ms() -> Optional[float]:
+    """Budget in ms applied to the current request, or None outside one."""
+    return _budget_ms.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (may be negative), or None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def call_budget(timeout: float) -> Optional[float]:
+    """
+    Timeout for one upstream call: `timeout` capped at the time left, or None when too
+    little is left to be worth starting it.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left * 1000 < DEADLINE_MIN_CALL_MS:
+        return None
+    return min(timeout, left)
@@ -0,0 +1,166 @@
+"""
+Shared outbound HTTP client.
+One pooled httpx.AsyncClient per process, opened and closed by the FastAPI lifespan
+so Groq chat and Whisper calls reuse warm TLS connections instead of handshaking per prompt.
+"""
+import os
+import time
+import httpx
+
+# ── Config ────────────────────────────────────────────────────────────────────
+HTTP_MAX_CONNECTIONS     = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE       = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY    = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT     = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_POOL_TIMEOUT        = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+HTTP_DEFAULT_TIMEOUT     = float(os.getenv("HTTP_DEFAULT_TIMEOUT", "15"))
+HTTP_ENABLE_HTTP2        = os.getenv("HTTP_ENABLE_HTTP2", "0") == "1"
+# Time to get a connection (new or pooled) above which a request counts as a pool wait;
+# below it the gap is event-loop scheduling and request building, not the pool
+HTTP_POOL_WAIT_MS        = float(os.getenv("HTTP_POOL_WAIT_MS", "10"))
+
+
+class SharedHTTPClient:
+    """
+    Process-wide connection pool with usage counters.
+    `start()` / `aclose()` are driven by the app lifespan; `get()` opens lazily so the
+    orchestrator still works when used outside the server (scripts, notebooks).
+    """
+    def __init__(self):
+        self._client = None
+        self.http2 = False
+        self.requests_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.pool_waits = 0
+        self.pool_wait_ms_total = 0.0
+        self.errors = 0
+
+    def start(self) -> httpx.AsyncClient:
+        if self._client is not None:
+            return self._client
+
+        self.http2 = HTTP_ENABLE_HTTP2
+        if self.http2:
+            try:
+                import h2  # noqa: F401  (optional: pip install httpx[http2])
+            except ImportError:
+                print("[HTTP] HTTP/2 requested but 'h2' is not installed — falling back to HTTP/1.1")
+                self.http2 = False
+
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                HTTP_DEFAULT_TIMEOUT,
+                connect=HTTP_CONNECT_TIMEOUT,
+                pool=HTTP_POOL_TIMEOUT,
+            ),
+        )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get(self) -> httpx.AsyncClient:
+        return self._client or self.start()
+
+    async def request(self, method: str, url: str, timeout: float = None, timings: dict = None,
+                      **kwargs) -> httpx.Response:
+        """
+        Sends through the shared pool. `timeout` overrides the read/write budget for
+        this call only; connect and pool-acquire limits stay at the pool defaults.
+        `timings`, when given, is filled with queue_ms (waiting for a pooled connection),
+        connect_ms (TCP/TLS setup, 0 on a reused connection) and network_ms (request out
+        to body in), from httpcore's trace events. The same queue_ms feeds `pool_waits`,
+        so it counts requests that actually waited for a connection (keepalive and HTTP/2
+        streams included), not requests that merely arrived while many were in flight.
+        """
+        client = self.get()
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_POOL_TIMEOUT)
+
+        events = {}
+
+        async def trace(name, info):
+            events.setdefault(name, time.perf_counter())
+        kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": trace}
+
+        self.requests_total += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        t0 = time.perf_counter()
+        try:
+            return await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            split = _split_timings(events, t0, time.perf_counter())
+            # A request that opened its own connection got a slot at once (its queue_ms is
+            # first-use setup); one that waited is handed a freed connection to reuse.
+            # Transports without trace events (mocks) report nothing
+            waited = events and "connection.connect_tcp.started" not in events
+            if waited and split["queue_ms"] >= HTTP_POOL_WAIT_MS:
+                self.pool_waits += 1
+                self.pool_wait_ms_total += split["queue_ms"]
+            if timings is not None:
+                timings.update(split)
+
+    async def post(self, url: str, timeout: float = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, timeout=timeout, **kwargs)
+
+    def stats(self) -> dict:
+        active = idle = 0
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        for conn in getattr(pool, "connections", []) if pool is not None else []:
+            try:
+                if conn.is_idle():
+                    idle += 1
+                else:
+                    active += 1
+            except Exception:
+                continue
+
+        return {
+            "open": self._client is not None,
+            "http2": self.http2,
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive": HTTP_MAX_KEEPALIVE,
+            "connections_in_use": active,
+            "connections_idle": idle,
+            "requests_in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "pool_waits": self.pool_waits,
+            "pool_wait_ms_total": round(self.pool_wait_ms_total, 1),
+            "requests_total": self.requests_total,
+            "errors": self.errors,
+            "sampled_at": time.time(),
+        }
+
+
+def _split_timings(events: dict, t0: float, t_end: float) -> dict:
+    """
+    Transports that emit no trace events (mocks, custom transports) report the whole
+    call as network time.
+    """
+    connect = events.get("connection.connect_tcp.started")
+    send = events.get("http11.send_request_headers.started") or events.get("http2.send_request_headers.started")
+    first = connect or send or t0
+    sent = send or first
+    return {
+        "queue_ms": round((first - t0) * 1000, 2),
+        "connect_ms": round((sent - first) * 1000, 2) if connect else 0.0,
+        "network_ms": round((t_end - sent) * 1000, 2),
+        "total_ms": round((t_end - t0) * 1000, 2),
+    }
+
+
+http_client = SharedHTTPClient()
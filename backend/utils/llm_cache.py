@@ -0,0 +1,178 @@
+"""
+Content-addressed cache for LLM completions.
+Entries are keyed by a hash of (model, prompt, temperature, json_mode) and live in a
+bounded in-memory LRU with per-section TTLs, optionally backed by a SQLite file that
+survives restarts and is shared by every uvicorn worker on the host.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ── Config ────────────────────────────────────────────────────────────────────
+LLM_CACHE_ENABLED      = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_ENTRIES  = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_SQLITE_PATH  = os.getenv("LLM_CACHE_SQLITE_PATH", "")
+LLM_CACHE_DISK_MAX_ROWS = int(os.getenv("LLM_CACHE_DISK_MAX_ROWS", "50000"))
+LLM_CACHE_SECTIONS     = [s.strip() for s in os.getenv("LLM_CACHE_SECTIONS", "med_safety,triage,ayush,summary").split(",") if s.strip()]
+
+# Seconds an answer stays valid, per orchestrator section. Override with LLM_CACHE_TTL_<SECTION>.
+DEFAULT_TTLS = {
+    "med_safety": 6 * 3600,
+    "triage":     15 * 60,
+    "ayush":      24 * 3600,
+    "ehr":        5 * 60,
+    "summary":    30 * 60,
+}
+DEFAULT_TTL = 10 * 60
+
+
+def cache_key(model: str, prompt: str, temperature: float, json_mode: bool) -> str:
+    raw = json.dumps([model, prompt, temperature, bool(json_mode)], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _SQLiteTier:
+    """Disk tier. WAL mode lets several worker processes read while one writes."""
+    PRUNE_EVERY = 500
+
+    def __init__(self, path: str, max_rows: int):
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)")
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0], row[1]
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune()
+
+    def _prune(self):
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, sqlite_path: str = LLM_CACHE_SQLITE_PATH):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (value, expires_at)
+        self.disk = None
+        if sqlite_path:
+            try:
+                self.disk = _SQLiteTier(sqlite_path, LLM_CACHE_DISK_MAX_ROWS)
+            except Exception as e:
+                print(f"[Cache] SQLite tier disabled ({sqlite_path}): {e}")
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stores = 0
+
+    # ── Policy ────────────────────────────────────────────────────────────────
+    def enabled_for(self, section: str = None) -> bool:
+        return LLM_CACHE_ENABLED and section in LLM_CACHE_SECTIONS
+
+    def ttl_for(self, section: str = None) -> float:
+        default = DEFAULT_TTLS.get(section, DEFAULT_TTL)
+        return float(os.getenv(f"LLM_CACHE_TTL_{(section or '').upper()}", default))
+
+    # ── Lookups ───────────────────────────────────────────────────────────────
+    async def get(self, key: str):
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._entries[key]
+            self.expirations += 1
+
+        if self.disk is not None:
+            try:
+                row = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                print(f"[Cache] SQLite read failed: {e}")
+                row = None
+            if row is not None:
+                self._put_memory(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, section: str = None):
+        expires_at = time.time() + self.ttl_for(section)
+        self._put_memory(key, value, expires_at)
+        self.stores += 1
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value, expires_at)
+            except Exception as e:
+                print(f"[Cache] SQLite write failed: {e}")
+
+    def _put_memory(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "sections": LLM_CACHE_SECTIONS,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_tier": self.disk.path if self.disk is not None else None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stores": self.stores,
+        }
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,197 @@
+"""
+Outbound scheduler for LLM calls.
+Two token buckets, sized to the Groq requests-per-minute and tokens-per-minute quotas,
+gate every call_groq. When either bucket is short, callers queue in priority lanes and
+are released lane by lane (FIFO within a lane) as the buckets refill, so triage and EHR
+go ahead of AYUSH and summary generation. A 429 pauses every lane for its Retry-After
+plus jitter, and Groq's x-ratelimit-remaining-tokens header pulls the token bucket down
+to what the upstream actually has left.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+
+# ── Config ────────────────────────────────────────────────────────────────────
+LLM_RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT_ENABLED", "1") == "1"
+GROQ_RPM               = float(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM               = float(os.getenv("GROQ_TPM", "20000"))
+LLM_MAX_RETRIES        = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_S     = float(os.getenv("LLM_BACKOFF_BASE_S", "0.5"))
+LLM_BACKOFF_MAX_S      = float(os.getenv("LLM_BACKOFF_MAX_S", "10"))
+# Completion tokens reserved up front; the reservation is settled against `usage` afterwards
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "350"))
+
+# Lane per orchestrator section; lane 0 is served first
+SECTION_LANES = {"triage": 0, "ehr": 0, "med_safety": 1, "fused": 1, "ayush": 2, "summary": 2}
+DEFAULT_LANE = 1
+LANES = 3
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (after refill)."""
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+class LLMScheduler:
+    def __init__(self, rpm: float = GROQ_RPM, tpm: float = GROQ_TPM, enabled: bool = LLM_RATE_LIMIT_ENABLED):
+        self.enabled = enabled
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+
+        self._waiters = []          # heap of (lane, seq, tokens, future)
+        self._seq = itertools.count()
+        self._timer = None
+
+        self.granted = 0
+        self.queued = 0
+        self.timed_out = 0
+        self.rate_limited = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def lane_for(self, section: str) -> int:
+        return SECTION_LANES.get(section, DEFAULT_LANE)
+
+    def _delay(self, tokens: float, now: float) -> float:
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return max(self.paused_until - now, self.requests.wait_for(1), self.tokens.wait_for(tokens))
+
+    def _take(self, tokens: float):
+        self.requests.level -= 1
+        self.tokens.level -= tokens
+        self.granted += 1
+
+    async def acquire(self, section: str, tokens: float, timeout: float = None):
+        """
+        Waits for quota for one call of ~`tokens` tokens. Returns the ms spent waiting, or
+        None if `timeout` seconds ran out first (the caller should fall back).
+        """
+        if not self.enabled:
+            return 0.0
+        tokens = min(tokens, self.tokens.capacity)
+        if not self._waiters and self._delay(tokens, time.monotonic()) <= 0:
+            self._take(tokens)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self.lane_for(section), next(self._seq), tokens, future))
+        self.queued += 1
+        self._dispatch()
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._refund(future, tokens)
+            self.timed_out += 1
+            return None
+        except asyncio.CancelledError:
+            self._refund(future, tokens)
+            raise
+        waited_ms = (time.perf_counter() - t0) * 1000
+        self.wait_ms_total += waited_ms
+        self.wait_ms_max = max(self.wait_ms_max, waited_ms)
+        return round(waited_ms, 2)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        while self._waiters:
+            lane, seq, tokens, future = self._waiters[0]
+            if future.done():           # timed out or cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay(tokens, now)
+            if delay > 0:
+                # Strict lanes: nothing behind the head goes first, so a lower lane never
+                # spends quota a queued triage call is waiting for
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._take(tokens)
+            future.set_result(None)
+
+    def _refund(self, future, tokens: float):
+        """Returns the quota of a waiter granted just as it timed out or was cancelled."""
+        if future.done() and not future.cancelled():
+            self.requests.level = min(self.requests.capacity, self.requests.level + 1)
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + tokens)
+            self.granted -= 1
+            self._dispatch()
+
+    def settle(self, reserved: float, used: float):
+        """Corrects the token bucket once the real usage of a call is known (0 if never sent)."""
+        if self.enabled:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved - used)
+
+    def observe(self, headers):
+        # x-ratelimit-*-requests are per day on Groq; only the token figures are per minute
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        if not self.enabled or remaining is None:
+            return
+        try:
+            self.tokens.refill(time.monotonic())
+            self.tokens.level = min(self.tokens.level, float(remaining))
+        except ValueError:
+            pass
+
+    def on_rate_limited(self, retry_after, attempt: int) -> float:
+        """
+        Records a 429 and pauses every lane. Honors Retry-After (seconds) when given, else
+        exponential backoff; either way with jitter so queued calls do not retry in step.
+        Returns the pause in seconds.
+        """
+        self.rate_limited += 1
+        try:
+            base = float(retry_after)
+        except (TypeError, ValueError):
+            base = LLM_BACKOFF_BASE_S * (2 ** attempt)
+        delay = min(LLM_BACKOFF_MAX_S, base) * random.uniform(1.0, 1.25)
+        if self.enabled:
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        waiting = [0] * LANES
+        for lane, _, _, future in self._waiters:
+            if not future.done():
+                waiting[min(lane, LANES - 1)] += 1
+        served = self.queued - self.timed_out - sum(waiting)
+        return {
+            "enabled": self.enabled,
+            "rpm": self.requests.capacity,
+            "tpm": self.tokens.capacity,
+            "requests_available": round(self.requests.level, 2),
+            "tokens_available": round(self.tokens.level, 1),
+            "paused_for_s": round(max(0.0, self.paused_until - now), 2),
+            "waiting_by_lane": waiting,
+            "granted": self.granted,
+            "queued": self.queued,
+            "timed_out": self.timed_out,
+            "rate_limited": self.rate_limited,
+            "avg_wait_ms": round(self.wait_ms_total / served, 2) if served else 0.0,
+            "max_wait_ms": round(self.wait_ms_max, 2),
+        }
+
+
+llm_scheduler = LLMScheduler()
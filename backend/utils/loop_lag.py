@@ -0,0 +1,63 @@
+"""
+Event-loop lag monitor.
+A background task sleeps for a fixed interval and records how late it wakes up; that
+overshoot is the time some callback held the loop (CPU work, blocking I/O).
+"""
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+LOOP_LAG_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_ms: float = LOOP_LAG_INTERVAL_MS, window: int = 600):
+        self.interval = interval_ms / 1000.0
+        self.recent = deque(maxlen=window)
+        self.histogram = [0] * (len(LOOP_LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, (time.perf_counter() - expected) * 1000))
+
+    def record(self, lag_ms: float):
+        self.samples += 1
+        self.total_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+        self.recent.append(lag_ms)
+        self.histogram[bisect_left(LOOP_LAG_BUCKETS_MS, lag_ms)] += 1
+
+    def stats(self) -> dict:
+        recent = sorted(self.recent)
+        pick = lambda q: round(recent[min(len(recent) - 1, int(q * len(recent)))], 3) if recent else 0.0
+        labels = [f"<={b}" for b in LOOP_LAG_BUCKETS_MS] + [f">{LOOP_LAG_BUCKETS_MS[-1]}"]
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "avg_ms": round(self.total_ms / self.samples, 3) if self.samples else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "recent_p50_ms": pick(0.50),
+            "recent_p99_ms": pick(0.99),
+            "histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+loop_lag = LoopLagMonitor()
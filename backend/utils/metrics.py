@@ -0,0 +1,182 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format (0.0.4).
+Deliberately tiny — counters, labelled histograms and sampled gauges — so /metrics needs
+no client library. Everything is updated from the event loop thread, so no locking.
+"""
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def lines(self):
+        for key, value in sorted(self.values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}   # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def lines(self):
+        for key, series in sorted(self.series.items()):
+            for i, bound in enumerate(self.buckets):
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {series[i]}"
+            count = series[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """
+        fn() -> [(name, kind, help, [(labels_dict, value), ...]), ...], sampled at scrape
+        time; used to export the counters components already keep in their stats().
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        out = []
+        for metric in self._metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines())
+        for fn in self._collectors:
+            try:
+                families = fn()
+            except Exception as e:
+                print(f"[Metrics] Collector {getattr(fn, '__name__', fn)} failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                out.append(f"# HELP {name} {help}")
+                out.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    names = tuple(labels)
+                    out.append(f"{name}{_labels(names, [labels[n] for n in names])} {_number(value)}")
+        out.append(f"hi_metrics_rendered_timestamp_seconds {time.time():.3f}")
+        return "\n".join(out) + "\n"
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI (not BaseHTTPMiddleware) so streamed responses are timed to their last
+    chunk rather than to the headers. Labelled by route template, never the raw path.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, method=scope.get("method", ""),
+                                    route=getattr(route, "path", "unmatched"), status=status["code"])
+
+
+metrics = MetricsRegistry()
+
+# ── Application metrics ───────────────────────────────────────────────────────
+REQUEST_SECONDS = metrics.histogram(
+    "hi_http_request_duration_seconds", "Wall time per HTTP request, until the last body byte.",
+    ["method", "route", "status"])
+STAGE_SECONDS = metrics.histogram(
+    "hi_stage_duration_seconds", "Wall time per orchestration stage.", ["stage"])
+STAGE_ERRORS = metrics.counter(
+    "hi_stage_errors_total", "Orchestration stages that raised.", ["stage"])
+PIPELINE_SECONDS = metrics.histogram(
+    "hi_pipeline_duration_seconds", "Wall time of one orchestration pipeline run (process()).")
+SERIALIZATION_SECONDS = metrics.histogram(
+    "hi_serialization_duration_seconds", "Time spent encoding responses to JSON.", ["endpoint"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25))
+LLM_PHASE_SECONDS = metrics.histogram(
+    "hi_llm_phase_duration_seconds",
+    "LLM call time split into rate_wait (queued for Groq quota), queue (waiting for a pooled connection), "
+    "connect and network.",
+    ["section", "phase"])
+LLM_CALLS = metrics.counter(
+    "hi_llm_calls_total",
+    "LLM calls by section and outcome (ok, error, cache_hit, deadline, short_circuit, rate_limited, coalesced).",
+    ["section", "outcome"])
+LLM_CACHE_LOOKUPS = metrics.counter(
+    "hi_llm_cache_lookups_total", "LLM cache outcomes by section (hit, miss, bypass).", ["section", "result"])
+CONTEXT_TOKENS = metrics.counter(
+    "hi_context_tokens_total", "Estimated patient-history prompt tokens, sent vs saved by compaction.",
+    ["section", "kind"])
+LLM_FUSED_SECTIONS = metrics.counter(
+    "hi_llm_fused_sections_total", "Fused-mode sections answered by the single completion vs their own call.",
+    ["section", "outcome"])
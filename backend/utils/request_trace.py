@@ -0,0 +1,91 @@
+"""
+Per-request latency breakdown.
+process() opens a RequestTrace in a context variable; stage tasks inherit it, so call_groq
+can attach its LLM timings without threading a handle through every stage. The summary
+feeds GovernanceMetrics, and every sample also lands in the /metrics histograms.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from utils.metrics import (
+    CONTEXT_TOKENS, LLM_CACHE_LOOKUPS, LLM_CALLS, LLM_PHASE_SECONDS, STAGE_ERRORS, STAGE_SECONDS,
+)
+
+_current: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}      # name -> wall ms
+        self.llm_calls = []   # one dict per call_groq
+        self.context = {}     # section -> {"in", "out"} estimated history tokens
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+    def record_stage(self, name: str, duration_ms: float, failed: bool = False):
+        self.stages[name] = duration_ms
+        STAGE_SECONDS.observe(duration_ms / 1000, stage=name)
+        if failed:
+            STAGE_ERRORS.inc(stage=name)
+
+    def record_context(self, section: str, tokens_in: int, tokens_out: int):
+        self.context[section] = {"in": tokens_in, "out": tokens_out}
+        CONTEXT_TOKENS.inc(tokens_in - tokens_out, section=section, kind="saved")
+        CONTEXT_TOKENS.inc(tokens_out, section=section, kind="sent")
+
+    def summary(self) -> dict:
+        calls = self.llm_calls
+        return {
+            "stage_latency_ms": dict(self.stages),
+            "llm_calls": list(calls),
+            "llm_queue_ms": round(sum(c["queue_ms"] for c in calls), 2),
+            "llm_network_ms": round(sum(c["network_ms"] for c in calls), 2),
+            "llm_rate_wait_ms": round(sum(c["rate_wait_ms"] for c in calls), 2),
+            "cache_hits": sum(1 for c in calls if c["cache"] == "hit"),
+            "cache_misses": sum(1 for c in calls if c["cache"] == "miss"),
+            "context_tokens": dict(self.context),
+            "context_tokens_saved": sum(c["in"] - c["out"] for c in self.context.values()),
+        }
+
+
+def start_trace() -> RequestTrace:
+    trace = RequestTrace()
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+def record_llm_call(section: Optional[str], cache: str, status: str, timings: dict = None):
+    """
+    cache: hit | miss | bypass.
+    status: ok | error | cache_hit | deadline | short_circuit | rate_limited | coalesced.
+    timings: as filled in by http_client.request (queue_ms / connect_ms / network_ms), plus
+    rate_wait_ms (waiting on the LLM scheduler's quota) and retries from call_groq.
+    """
+    section = section or "default"
+    timings = timings or {}
+    call = {
+        "section": section,
+        "cache": cache,
+        "status": status,
+        "queue_ms": timings.get("queue_ms", 0.0),
+        "connect_ms": timings.get("connect_ms", 0.0),
+        "network_ms": timings.get("network_ms", 0.0),
+        "rate_wait_ms": round(timings.get("rate_wait_ms", 0.0), 2),
+        "retries": timings.get("retries", 0),
+    }
+    LLM_CACHE_LOOKUPS.inc(section=section, result=cache)
+    LLM_CALLS.inc(section=section, outcome=status)
+    if status in ("ok", "error", "rate_limited"):
+        for phase in ("rate_wait", "queue", "connect", "network"):
+            LLM_PHASE_SECONDS.observe(call[f"{phase}_ms"] / 1000, section=section, phase=phase)
+    trace = _current.get()
+    if trace is not None:
+        trace.llm_calls.append(call)
+    return call
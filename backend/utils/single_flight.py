@@ -0,0 +1,84 @@
+"""
+Single-flight coalescing of identical in-flight work.
+Concurrent callers with the same key share one task: the first starts it, the rest wait
+on the same result (or exception). Each waiter is shielded, so one caller disconnecting
+does not cancel the work for the others; the shared task is cancelled only once every
+waiter has gone. Nothing is kept after the task settles, so this is not a cache.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+# ── Config ────────────────────────────────────────────────────────────────────
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "1") == "1"
+
+
+def canonical_hash(payload: Any) -> str:
+    """Key for JSON-able data, independent of dict key order."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str, enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self._flights: Dict[str, _Flight] = {}
+
+        self.started = 0
+        self.coalesced = 0
+        self.abandoned = 0      # shared tasks cancelled because every waiter left
+
+    async def do(self, key: str, run: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Returns (result, shared): shared is True when this caller joined a flight another
+        caller had already started. The task copies the starting caller's context.
+        """
+        if not self.enabled:
+            return await run(), False
+
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            flight = _Flight(asyncio.create_task(run()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task, key=key: self._settled(key, task))
+            self.started += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self.abandoned += 1
+                flight.task.cancel()
+
+    def _settled(self, key: str, task: asyncio.Task):
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        # Marks the exception retrieved when every waiter had already left
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
@@ -0,0 +1,137 @@
+"""
+Declarative stage graph for the orchestration pipeline.
+Each stage names the stages it reads from; the scheduler starts a stage the moment
+all of its inputs have settled, so independent LLM calls overlap instead of queueing.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+
+class Stage:
+    def __init__(self, name: str, run: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+                 inputs: Sequence[str] = (), when: Optional[Callable[[Any], bool]] = None):
+        """
+        run(request, results) -> awaitable result. `results` holds every upstream stage
+        output by name (None when that stage was skipped or failed).
+        when(request) -> bool decides whether the stage takes part in this request.
+        """
+        self.name = name
+        self.run = run
+        self.inputs = tuple(inputs)
+        self.when = when
+
+    def enabled(self, request) -> bool:
+        return self.when is None or bool(self.when(request))
+
+
+class StageRun:
+    """Outcome of one pass through the graph."""
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}   # name -> {"start_ms", "end_ms"}
+        self.skipped: List[str] = []
+        self.critical_path: List[str] = []
+        self.total_ms: float = 0.0
+
+    def duration_ms(self, name: str) -> float:
+        t = self.timings.get(name)
+        return round(t["end_ms"] - t["start_ms"], 2) if t else 0.0
+
+
+class StageGraph:
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages = {s.name: s for s in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage names in pipeline")
+        for s in stages:
+            for dep in s.inputs:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{s.name}' depends on unknown stage '{dep}'")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, state = [], {}
+
+        def visit(name: str):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline at stage '{name}'")
+            state[name] = "visiting"
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self, request, on_complete: Optional[Callable[[str, Any], Any]] = None) -> StageRun:
+        """
+        Runs every enabled stage as early as its inputs allow.
+        on_complete(name, result) fires as each stage settles (result is None on failure);
+        it may be sync or async.
+        """
+        run = StageRun()
+        t0 = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(stage: Stage):
+            deps = [tasks[d] for d in stage.inputs if d in tasks]
+            if deps:
+                await asyncio.wait(deps)
+
+            start = (time.perf_counter() - t0) * 1000
+            try:
+                result = await stage.run(request, run.results)
+            except Exception as e:
+                print(f"[Orchestrator] Stage '{stage.name}' error: {e}")
+                run.errors[stage.name] = e
+                result = None
+            end = (time.perf_counter() - t0) * 1000
+
+            run.timings[stage.name] = {"start_ms": round(start, 2), "end_ms": round(end, 2)}
+            run.results[stage.name] = result
+            if on_complete is not None:
+                maybe = on_complete(stage.name, result)
+                if asyncio.iscoroutine(maybe):
+                    await maybe
+            return result
+
+        for name in self.order:
+            stage = self.stages[name]
+            if stage.enabled(request):
+                tasks[name] = asyncio.create_task(execute(stage))
+            else:
+                run.skipped.append(name)
+                run.results[name] = None
+
+        try:
+            if tasks:
+                await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        run.total_ms = round((time.perf_counter() - t0) * 1000, 2)
+        run.critical_path = self._critical_path(run)
+        return run
+
+    def _critical_path(self, run: StageRun) -> List[str]:
+        if not run.timings:
+            return []
+        # Walk back from the last stage to finish through whichever input released it
+        current = max(run.timings, key=lambda n: run.timings[n]["end_ms"])
+        path = [current]
+        while True:
+            deps = [d for d in self.stages[current].inputs if d in run.timings]
+            if not deps:
+                break
+            current = max(deps, key=lambda n: run.timings[n]["end_ms"])
+            path.append(current)
+        path.reverse()
+        return path
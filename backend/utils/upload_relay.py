@@ -0,0 +1,167 @@
+"""
+Streaming multipart relay for the /transcribe proxy.
+The browser's upload is parsed incrementally as it arrives and its audio part is re-framed,
+chunk by chunk, as the `file` field of the multipart body sent upstream. Nothing is
+spooled or held beyond the chunk in hand, so memory per transcription stays flat however
+long the recording. Size and upload-time limits are enforced while relaying: an upload
+past either limit aborts the upstream request at that point.
+"""
+import asyncio
+import os
+import time
+import uuid
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# ── Config ────────────────────────────────────────────────────────────────────
+# Whisper on Groq accepts up to 25 MB per file
+TRANSCRIBE_MAX_BYTES          = int(os.getenv("TRANSCRIBE_MAX_BYTES", str(25 * 1024 * 1024)))
+# Wall-clock budget for receiving the upload; a client trickling bytes would otherwise
+# hold a worker slot and an upstream connection open indefinitely
+TRANSCRIBE_MAX_UPLOAD_SECONDS = float(os.getenv("TRANSCRIBE_MAX_UPLOAD_SECONDS", "30"))
+# Text fields (language, ...) are small; anything larger is not a form we expect
+MAX_FIELD_BYTES = 1024
+
+
+class UploadRejected(Exception):
+    """Upload refused; `status` is the HTTP status to answer with."""
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def check_declared_size(content_length: str, max_bytes: int = TRANSCRIBE_MAX_BYTES):
+    """Refuses before any body is read when the declared length is already over the limit."""
+    try:
+        declared = int(content_length) if content_length else None
+    except ValueError:
+        raise UploadRejected(400, "Invalid Content-Length")
+    # Form overhead (boundaries, part headers, the language field) is a few hundred bytes
+    if declared is not None and declared > max_bytes + 16 * 1024:
+        raise UploadRejected(413, f"Audio upload exceeds {max_bytes // (1024 * 1024)} MB")
+
+
+class MultipartRelay:
+    """
+    Re-frames one file field of an incoming multipart stream as the `upstream_field` of a
+    new multipart body, preceded by `fields`. Iterate `body()` as the upstream request
+    content; `fields_seen` holds the small text fields of the incoming form once done.
+    """
+    def __init__(self, content_type: str, source, file_field: str, upstream_field: str, fields: dict,
+                 max_bytes: int = TRANSCRIBE_MAX_BYTES, max_seconds: float = TRANSCRIBE_MAX_UPLOAD_SECONDS):
+        ctype, params = parse_options_header(content_type or "")
+        boundary = params.get(b"boundary")
+        if ctype != b"multipart/form-data" or not boundary:
+            raise UploadRejected(400, "Expected a multipart/form-data upload")
+        self.source = source
+        self.file_field, self.upstream_field = file_field, upstream_field
+        self.fields = fields
+        self.max_bytes, self.max_seconds = max_bytes, max_seconds
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.fields_seen = {}
+        self.file_bytes = 0
+        self.received_bytes = 0
+
+        self._out = []
+        self._header_field = self._header_value = b""
+        self._headers = {}
+        self._part = None           # text field name, None before headers finish or in the file
+        self._in_file = False
+        self._value = bytearray()
+        self._file_done = False
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    # ── Parser callbacks ──────────────────────────────────────────────────────
+    def _on_part_begin(self):
+        self._headers, self._part, self._in_file = {}, None, False
+        self._value = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = params.get(b"name", b"").decode("utf-8", "replace")
+        if name != self.file_field:
+            self._part = name
+            return
+        if self._file_done:
+            raise UploadRejected(400, f"More than one '{self.file_field}' part")
+        self._in_file = True
+        filename = params.get(b"filename", b"audio.webm").decode("utf-8", "replace").replace('"', "")
+        content_type = self._headers.get(b"content-type", b"audio/webm").decode("latin-1")
+        self._out.append(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{self.upstream_field}"; '
+            f'filename="{filename or "audio.webm"}"\r\nContent-Type: {content_type}\r\n\r\n'.encode()
+        )
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.file_bytes += end - start
+            if self.file_bytes > self.max_bytes:
+                raise UploadRejected(413, f"Audio upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+            self._out.append(data[start:end])
+        elif self._part is not None:
+            if len(self._value) + end - start > MAX_FIELD_BYTES:
+                raise UploadRejected(400, f"Form field '{self._part}' is too large")
+            self._value += data[start:end]
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._out.append(b"\r\n")
+            self._file_done = True
+            self._in_file = False
+        elif self._part is not None:
+            self.fields_seen[self._part] = self._value.decode("utf-8", "replace")
+        self._part = None
+
+    # ── Upstream body ─────────────────────────────────────────────────────────
+    def _preamble(self) -> bytes:
+        return b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            for name, value in self.fields.items()
+        )
+
+    async def body(self):
+        deadline = time.monotonic() + self.max_seconds
+        yield self._preamble()
+        chunks = self.source.__aiter__()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise UploadRejected(408, f"Audio upload took longer than {self.max_seconds:g}s")
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                raise UploadRejected(408, f"Audio upload took longer than {self.max_seconds:g}s")
+            self.received_bytes += len(chunk)
+            self._parser.write(chunk)
+            if self._out:
+                out, self._out = self._out, []
+                yield b"".join(out)
+        self._parser.finalize()
+        if not self._file_done:
+            raise UploadRejected(400, f"Missing '{self.file_field}' file part")
+        yield f"--{self.boundary}--\r\n".encode()
@@ -0,0 +1,125 @@
+"""
+Background warm-up and readiness tracking.
+The app answers /health as soon as uvicorn binds; heavy imports, artifact loading,
+a dummy inference and an LLM connection pre-warm run afterwards in a background task
+and report per-component status to /ready.
+"""
+import asyncio
+import importlib
+import os
+import time
+import traceback
+
+PROCESS_STARTED = time.monotonic()
+
+# Components that must be ready before /ready returns 200; the rest are best-effort
+REQUIRED_COMPONENTS = ("ml_libraries", "ml_model")
+
+
+class Readiness:
+    def __init__(self):
+        self.components = {}
+        self._events = {}
+
+    def _event(self, name: str) -> asyncio.Event:
+        if name not in self._events:
+            self._events[name] = asyncio.Event()
+        return self._events[name]
+
+    def register(self, *names: str):
+        for name in names:
+            self.components.setdefault(name, {"status": "pending", "seconds": None, "detail": None})
+
+    async def run(self, name: str, fn, *args, in_thread: bool = True):
+        """Runs one warm-up step, recording its outcome and wall time."""
+        self.register(name)
+        self.components[name]["status"] = "running"
+        t0 = time.perf_counter()
+        try:
+            if in_thread:
+                detail = await asyncio.to_thread(fn, *args)
+            else:
+                detail = await fn(*args)
+            status = "skipped" if detail == "skipped" else "ready"
+            self.components[name].update(status=status, detail=None if status == "skipped" else detail)
+        except asyncio.CancelledError:
+            self.components[name].update(status="cancelled")
+            raise
+        except Exception as e:
+            print(f"[Warmup] {name} failed: {e}")
+            traceback.print_exc()
+            self.components[name].update(status="failed", detail=str(e))
+        finally:
+            self.components[name]["seconds"] = round(time.perf_counter() - t0, 4)
+            self.components[name]["ready_at_s"] = round(time.monotonic() - PROCESS_STARTED, 4)
+            self._event(name).set()
+
+    async def wait(self, name: str, timeout: float = None):
+        await asyncio.wait_for(self._event(name).wait(), timeout)
+
+    @property
+    def ready(self) -> bool:
+        return all(self.components.get(n, {}).get("status") == "ready" for n in REQUIRED_COMPONENTS)
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "uptime_s": round(time.monotonic() - PROCESS_STARTED, 3),
+            "required": list(REQUIRED_COMPONENTS),
+            "components": self.components,
+        }
+
+
+readiness = Readiness()
+
+
+def _import_ml_libraries():
+    loaded = {}
+    for module in ("numpy", "pandas", "sklearn"):
+        try:
+            mod = importlib.import_module(module)
+            loaded[module] = getattr(mod, "__version__", "unknown")
+        except ImportError:
+            # pandas/sklearn are only needed when trained artifacts are present
+            if module == "numpy":
+                raise
+            loaded[module] = None
+    return loaded
+
+
+def _load_and_probe_model(orchestrator):
+    engine = orchestrator.load_ml_engine()
+    # Exercise both the scalar and the vectorised path once so first requests hit warm code
+    from ml_engine import FEATURE_DEFAULTS
+    engine.predict(dict(FEATURE_DEFAULTS))
+    engine.predict_many([dict(FEATURE_DEFAULTS)])
+    return {"artifacts_loaded": engine.is_loaded, "compiled": engine.compiled is not None}
+
+
+async def warm_up(orchestrator):
+    from utils.cpu_executor import cpu_executor
+    from services.drug_interactions import get_interaction_graph
+    from services.emergency_matcher import get_emergency_matcher
+    from services.ayush_table import get_ayush_table
+    from services.outbreak_forecaster import get_outbreak_forecaster
+    from services.food_index import get_food_index
+    readiness.register("ml_libraries", "ml_model", "cpu_executor", "interaction_graph", "emergency_matcher",
+                       "ayush_table", "outbreak_forecaster", "food_index", "llm_connection")
+
+    async def ml_chain():
+        await readiness.run("ml_libraries", _import_ml_libraries)
+        await readiness.run("ml_model", _load_and_probe_model, orchestrator)
+        await readiness.run("cpu_executor", cpu_executor.warm, in_thread=False)
+
+    await asyncio.gather(
+        ml_chain(),
+        readiness.run("interaction_graph", lambda: get_interaction_graph().stats()),
+        readiness.run("emergency_matcher", lambda: get_emergency_matcher().stats()),
+        # No table built: AYUSH stays on the per-request LLM path
+        readiness.run("ayush_table", lambda: get_ayush_table().stats() if get_ayush_table() else "skipped"),
+        readiness.run("outbreak_forecaster", lambda: get_outbreak_forecaster().stats()),
+        readiness.run("food_index", lambda: get_food_index().stats()),
+        readiness.run("llm_connection", orchestrator.prewarm_llm, in_thread=False),
+    )
+    print(f"[Warmup] Complete in {time.monotonic() - PROCESS_STARTED:.2f}s since process start "
+          f"(ready={readiness.ready}, pid={os.getpid()})")